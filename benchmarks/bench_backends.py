@@ -0,0 +1,74 @@
+"""
+Сравнение задержки операций SQLiteDatabaseManager и InMemoryDatabaseManager.
+
+Запуск: python -m benchmarks.bench_backends --users 100 --ops 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from bot.database.base import DatabaseManager
+from bot.database.memory import InMemoryDatabaseManager
+from bot.database.sqlite import SQLiteDatabaseManager
+
+
+async def measure(db: DatabaseManager, users: int, ops: int) -> Dict[str, List[float]]:
+    """Последовательная смешанная нагрузка, задержки в микросекундах по операциям."""
+    rng = random.Random(42)
+    latencies: Dict[str, List[float]] = {"add": [], "list": [], "count": [], "done": []}
+    known: Dict[int, List[int]] = {}
+
+    for _ in range(ops):
+        user_id = rng.randrange(1, users + 1)
+        op = rng.choice(("add", "add", "list", "list", "count", "done"))
+        started = time.perf_counter()
+        if op == "add":
+            known.setdefault(user_id, []).append(await db.add_task(user_id, "Benchmark task"))
+        elif op == "list":
+            await db.get_tasks_after(user_id, 0, 10)
+        elif op == "count":
+            await db.count_tasks(user_id)
+        elif known.get(user_id):
+            await db.mark_task_done(user_id, rng.choice(known[user_id]), True)
+        else:
+            continue
+        latencies[op].append((time.perf_counter() - started) * 1_000_000)
+    return latencies
+
+
+def report(name: str, latencies: Dict[str, List[float]]) -> None:
+    for op, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(f"{name:>8} {op:>6}: mean {statistics.fmean(values):9.1f} us, "
+              f"p50 {statistics.median(values):9.1f} us, p99 {p99:9.1f} us")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "sqlite": SQLiteDatabaseManager(os.path.join(tmp, "bench.db")),
+            "memory": InMemoryDatabaseManager(os.path.join(tmp, "bench.oplog")),
+        }
+        for name, db in backends.items():
+            await db.init()
+            try:
+                report(name, await measure(db, args.users, args.ops))
+            finally:
+                await db.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
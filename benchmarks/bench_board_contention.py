@@ -0,0 +1,133 @@
+"""
+Пропускная способность общей доски при росте числа одновременных редакторов.
+
+Каждый редактор в цикле читает случайную задачу доски и увеличивает число в
+ее описании записью с проверкой версии (update_board_task); при конфликте
+задача перечитывается и запись повторяется. Для каждого числа редакторов
+берется новое хранилище, в конце проверяется, что сумма счетчиков равна
+числу успешных записей (ни одно обновление не потеряно).
+
+С --processes редакторы делятся между процессами, у каждого свое
+соединение с общим файлом SQLite, как у процессов кластера.
+
+Запуск: python -m benchmarks.bench_board_contention --editors 1,2,4,8,16,32,64 --seconds 3
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+from bot.database.base import DatabaseManager
+from bot.database.memory import InMemoryDatabaseManager
+from bot.database.sqlite import SQLiteDatabaseManager
+
+BOARD_ID = 500
+
+# (успешные записи, конфликты, задержки успешных записей в мс)
+EditorResult = Tuple[int, int, List[float]]
+
+
+def open_backend(backend: str, path: str) -> DatabaseManager:
+    if backend == "memory":
+        return InMemoryDatabaseManager(path + ".oplog")
+    # Режим, рекомендуемый для нагрузки: групповой коммит и чтения из пула WAL
+    return SQLiteDatabaseManager(path, group_commit=True, wal=True, read_pool_size=8)
+
+
+async def edit(db: DatabaseManager, editor_id: int, task_ids: List[int], deadline: float) -> EditorResult:
+    """Цикл одного редактора до deadline."""
+    rng = random.Random(editor_id)
+    updates = conflicts = 0
+    latencies = []
+    while time.perf_counter() < deadline:
+        task_id = rng.choice(task_ids)
+        started = time.perf_counter()
+        while True:
+            task = await db.get_board_task(BOARD_ID, task_id)
+            if await db.update_board_task(BOARD_ID, task_id, task.version, editor_id,
+                                          description=str(int(task.description) + 1)):
+                break
+            conflicts += 1
+        updates += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+    return updates, conflicts, latencies
+
+
+async def run_editors(backend: str, path: str, first_editor: int, editors: int,
+                      task_ids: List[int], start_at: float, seconds: float) -> EditorResult:
+    """Редакторы одного процесса на общем хранилище."""
+    db = open_backend(backend, path)
+    await db.init()
+    try:
+        await asyncio.sleep(max(0.0, start_at - time.time()))
+        deadline = time.perf_counter() + seconds
+        results = await asyncio.gather(*(
+            edit(db, editor_id, task_ids, deadline) for editor_id in range(first_editor, first_editor + editors)
+        ))
+    finally:
+        await db.close()
+    return (sum(result[0] for result in results), sum(result[1] for result in results),
+            [latency for result in results for latency in result[2]])
+
+
+def run_process(args: tuple) -> EditorResult:
+    return asyncio.run(run_editors(*args))
+
+
+async def measure(backend: str, path: str, editors: int, tasks: int, seconds: float, processes: int) -> None:
+    db = open_backend(backend, path)
+    await db.init()
+    task_ids = [await db.add_board_task(BOARD_ID, 1, "0") for _ in range(tasks)]
+    if processes > 1:
+        await db.close()
+        start_at = time.time() + 1.0
+        share = [editors // processes + (index < editors % processes) for index in range(processes)]
+        jobs = [(backend, path, 1 + sum(share[:index]), count, task_ids, start_at, seconds)
+                for index, count in enumerate(share) if count]
+        with multiprocessing.Pool(len(jobs)) as pool:
+            results = await asyncio.to_thread(pool.map, run_process, jobs)
+        updates = sum(result[0] for result in results)
+        conflicts = sum(result[1] for result in results)
+        latencies = [latency for result in results for latency in result[2]]
+        await db.init()
+    else:
+        await db.close()
+        updates, conflicts, latencies = await run_editors(backend, path, 1, editors, task_ids, 0, seconds)
+        await db.init()
+    try:
+        total = sum(int(task.description) for task in await db.get_board_tasks(BOARD_ID, tasks))
+    finally:
+        await db.close()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{backend:>7} {editors:>4} editors: {updates / seconds:8.0f} updates/s, "
+          f"{conflicts / max(updates, 1):5.2f} conflicts/update, "
+          f"p50 {statistics.median(latencies):7.2f} ms, p99 {p99:7.2f} ms, lost {updates - total}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--editors", default="1,2,4,8,16,32,64", help="числа одновременных редакторов через запятую")
+    parser.add_argument("--tasks", type=int, default=1, help="задач на доске, между которыми выбирают редакторы")
+    parser.add_argument("--seconds", type=float, default=3.0, help="длительность каждого замера")
+    parser.add_argument("--backend", choices=("sqlite", "memory", "all"), default="all")
+    parser.add_argument("--processes", type=int, default=1, help="процессов с редакторами (только sqlite)")
+    args = parser.parse_args()
+
+    backends = ("sqlite", "memory") if args.backend == "all" else (args.backend,)
+    if args.processes > 1:
+        backends = tuple(backend for backend in backends if backend == "sqlite")
+    for backend in backends:
+        for editors in (int(count) for count in args.editors.split(',')):
+            with tempfile.TemporaryDirectory() as tmp:
+                await measure(backend, os.path.join(tmp, "board.db"), editors, args.tasks, args.seconds, args.processes)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""
+Бенчмарк пропускной способности записи с групповым коммитом и без него.
+
+Запуск: python -m benchmarks.bench_group_commit --writers 50 --writes 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from bot.database.sqlite import SQLiteDatabaseManager
+
+
+async def run_writes(db: SQLiteDatabaseManager, writers: int, writes_per_writer: int) -> float:
+    """Конкурентная запись задач, возвращает число записей в секунду."""
+    async def writer(user_id: int) -> None:
+        for i in range(writes_per_writer):
+            task_id = await db.add_task(user_id, f"Task {i}")
+            if i % 2:
+                await db.mark_task_done(user_id, task_id, True)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(user_id) for user_id in range(1, writers + 1)))
+    elapsed = time.perf_counter() - started
+
+    total = writers * (writes_per_writer + writes_per_writer // 2)
+    return total / elapsed
+
+
+async def bench(group_commit: bool, writers: int, writes_per_writer: int) -> float:
+    """Прогон одного режима на временной базе данных."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SQLiteDatabaseManager(os.path.join(tmp, "bench.db"), group_commit=group_commit)
+        await db.init()
+        try:
+            return await run_writes(db, writers, writes_per_writer)
+        finally:
+            await db.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=20, help="add_task на одного писателя")
+    args = parser.parse_args()
+
+    for group_commit in (False, True):
+        rate = await bench(group_commit, args.writers, args.writes)
+        mode = "group commit" if group_commit else "commit per write"
+        print(f"{mode:>18}: {rate:10.1f} writes/sec")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Бенчмарк компактной схемы задач: размер файла и время чтения списка до и после миграции.
+
+База исходной схемы (версия 0) заполняется задачами вперемешку от многих
+пользователей, затем переводится на компактную схему (MigrationRunner). До и
+после миграции файл перестраивается VACUUM, чтобы сравнивать только данные.
+
+Запуск: python -m benchmarks.bench_migration --rows 200000 --users 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import List, Tuple
+
+from bot.database.sqlite import SQLiteDatabaseManager
+
+
+def create_legacy_database(path: str, rows: int, users: int) -> None:
+    """База исходной схемы с текстовым created_at и BOOLEAN status."""
+    connection = sqlite3.connect(path)
+    connection.execute('''CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        status BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    connection.executemany(
+        "INSERT INTO tasks (user_id, description, status) VALUES (?, ?, ?)",
+        ((random.randrange(users), f"Task description number {i}", i % 2) for i in range(rows))
+    )
+    connection.commit()
+    connection.close()
+
+
+async def measure(db: SQLiteDatabaseManager, path: str, users: int, reads: int) -> Tuple[int, List[float]]:
+    """Размер файла после VACUUM и время чтения первой страницы списка (мс)."""
+    await db.vacuum()
+    await db.checkpoint()
+    size = os.path.getsize(path)
+
+    latencies = []
+    for _ in range(reads):
+        user_id = random.randrange(users)
+        started = time.perf_counter()
+        await db.get_tasks(user_id)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return size, latencies
+
+
+def report(name: str, size: int, latencies: List[float]) -> None:
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)]
+    print(f"{name:>8}: {size / 1024 / 1024:8.2f} MiB, list p50 {statistics.median(latencies):6.3f} ms, p95 {p95:6.3f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=2000, help="чтений списка на каждую схему")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_legacy_database(path, args.rows, args.users)
+        db = SQLiteDatabaseManager(path, migrate_on_start=False)
+        await db.init()
+        try:
+            report("before", *await measure(db, path, args.users, args.reads))
+            started = time.perf_counter()
+            await db.migrate()
+            print(f"migrated {args.rows} rows in {time.perf_counter() - started:.1f}s")
+            report("after", *await measure(db, path, args.users, args.reads))
+        finally:
+            await db.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""
+Микробенчмарк разбора строк таблицы tasks в объекты Task.
+
+Сравнивает прежний путь (sqlite3.Row -> dict -> dataclass с немедленным
+разбором created_at) с текущим (кортеж -> Task.from_row с ленивым created_at).
+
+Запуск: python -m benchmarks.bench_task_decode --rows 100000
+"""
+import argparse
+import gc
+import sqlite3
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from bot.database.models import Task, TASK_COLUMNS
+
+
+@dataclass
+class LegacyTask:
+    """Модель задачи в прежнем виде."""
+    id: int
+    user_id: int
+    description: str
+    status: bool
+    created_at: datetime
+
+    @classmethod
+    def from_db_row(cls, row: Dict[str, Any]) -> 'LegacyTask':
+        return cls(
+            id=row['id'],
+            user_id=row['user_id'],
+            description=row['description'],
+            status=bool(row['status']),
+            created_at=datetime.fromisoformat(row['created_at'])
+        )
+
+
+def create_database(rows: int) -> sqlite3.Connection:
+    """База данных в памяти с заданным числом задач."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute('''CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        description TEXT NOT NULL,
+        status BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    connection.executemany(
+        "INSERT INTO tasks (user_id, description, status) VALUES (?, ?, ?)",
+        ((i % 1000, f"Task description number {i}", i % 2) for i in range(rows))
+    )
+    return connection
+
+
+def legacy_decode(connection: sqlite3.Connection) -> List[LegacyTask]:
+    connection.row_factory = sqlite3.Row
+    rows = connection.execute("SELECT * FROM tasks ORDER BY id").fetchall()
+    return [LegacyTask.from_db_row(dict(row)) for row in rows]
+
+
+def current_decode(connection: sqlite3.Connection) -> List[Task]:
+    connection.row_factory = None
+    rows = connection.execute(f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY id").fetchall()
+    return [Task.from_row(row) for row in rows]
+
+
+def measure(decode: Callable[[sqlite3.Connection], list], connection: sqlite3.Connection) -> tuple:
+    """Время и пиковая память одного прогона."""
+    gc.collect()
+    started = time.perf_counter()
+    decode(connection)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    tracemalloc.start()
+    result = decode(connection)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    connection = create_database(args.rows)
+    for name, decode in (("dict + eager datetime", legacy_decode), ("tuple + slots + lazy", current_decode)):
+        elapsed, peak = measure(decode, connection)
+        print(f"{name:>22}: {elapsed * 1000:8.1f} ms, peak {peak / 1024 / 1024:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
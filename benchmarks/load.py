@@ -0,0 +1,197 @@
+"""
+Нагрузочный тест обработчиков команд.
+
+Вызывает TaskCommandHandler напрямую через CommandContext с записывающим
+send на выбранной реализации DatabaseManager и выводит пропускную
+способность и перцентили задержки по командам в JSON.
+
+Запуск: python -m benchmarks.load --backend sqlite --workload mixed --users 5000 --concurrency 64 --ops 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from bot import __version__
+from bot.commands.base import CommandContext
+from bot.commands.task import TaskCommandHandler
+from bot.database.base import DatabaseManager
+from bot.database.cached import CachedDatabaseManager
+from bot.database.memory import InMemoryDatabaseManager
+from bot.database.sharded import ShardedSQLiteDatabaseManager, shard_paths
+from bot.database.sqlite import SQLiteDatabaseManager
+
+# Доли команд в каждом профиле нагрузки
+WORKLOADS: Dict[str, Dict[str, int]] = {
+    "add-heavy": {"add": 70, "list": 20, "done": 10},
+    "list-heavy": {"list": 80, "add": 15, "done": 5},
+    "mixed": {"add": 35, "list": 35, "done": 15, "undone": 5, "delete": 10},
+}
+
+BACKENDS = ("sqlite", "sqlite-wal", "sqlite-group", "sharded", "memory")
+
+ADDED_TASK_ID = re.compile(r"ID #(\d+)")
+
+
+class ReplyRecorder:
+    """Подмена ctx.send, запоминающая ответы."""
+
+    def __init__(self):
+        self.replies: List[str] = []
+
+    async def send(self, content: Optional[str] = None, **kwargs: Any) -> None:
+        self.replies.append(content or "")
+
+
+def create_backend(name: str, directory: str, cache: bool = False) -> DatabaseManager:
+    """Создание проверяемой реализации DatabaseManager во временном каталоге."""
+    path = os.path.join(directory, "load.db")
+    if name == "sqlite":
+        db: DatabaseManager = SQLiteDatabaseManager(path)
+    elif name == "sqlite-wal":
+        db = SQLiteDatabaseManager(path, wal=True)
+    elif name == "sqlite-group":
+        db = SQLiteDatabaseManager(path, wal=True, group_commit=True)
+    elif name == "sharded":
+        db = ShardedSQLiteDatabaseManager(shard_paths(path), wal=True)
+    elif name == "memory":
+        db = InMemoryDatabaseManager(os.path.join(directory, "load.oplog"))
+    else:
+        raise ValueError(f"Unknown backend: {name}")
+    return CachedDatabaseManager(db) if cache else db
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Перцентиль отсортированного списка (ближайший ранг)."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_load(
+    db: DatabaseManager,
+    workload: Dict[str, int],
+    users: int,
+    concurrency: int,
+    operations: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Прогон нагрузки. Возвращает сводку по командам."""
+    logger = logging.getLogger("benchmarks.load")
+    logger.setLevel(logging.CRITICAL)
+    handler = TaskCommandHandler(db, logger)
+    rng = random.Random(seed)
+    commands = list(workload)
+    weights = [workload[command] for command in commands]
+
+    known_ids: Dict[int, List[int]] = {}
+    latencies: Dict[str, List[float]] = {command: [] for command in commands}
+    errors: Dict[str, int] = {command: 0 for command in commands}
+    remaining = operations
+
+    async def execute(user_id: int, command: str) -> None:
+        recorder = ReplyRecorder()
+        ctx = CommandContext(user_id, None, recorder.send, logger)
+        ids = known_ids.get(user_id)
+        if command in ("done", "undone", "delete") and not ids:
+            command = "add"
+
+        started = time.perf_counter()
+        if command == "add":
+            await handler.add_task(ctx, f"Load test task {rng.random():.6f}")
+        elif command == "list":
+            await handler.list_tasks(ctx, rng.randint(1, 3))
+        elif command == "delete":
+            await handler.delete_task(ctx, str(ids.pop(rng.randrange(len(ids)))))
+        else:
+            await handler.mark_task_status(ctx, str(rng.choice(ids)), command == "done")
+        latencies.setdefault(command, []).append(time.perf_counter() - started)
+
+        reply = recorder.replies[-1] if recorder.replies else ""
+        if command == "add":
+            match = ADDED_TASK_ID.search(reply)
+            if match:
+                known_ids.setdefault(user_id, []).append(int(match.group(1)))
+        if reply.startswith("❌") and command != "list":
+            errors[command] = errors.get(command, 0) + 1
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await execute(rng.randint(1, users), rng.choices(commands, weights)[0])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    per_command = {}
+    for command, values in latencies.items():
+        values.sort()
+        per_command[command] = {
+            "count": len(values),
+            "errors": errors.get(command, 0),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    return {
+        "operations": operations,
+        "elapsed_s": elapsed,
+        "throughput_ops": operations / elapsed if elapsed else 0.0,
+        "commands": per_command,
+    }
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=BACKENDS, default="sqlite")
+    parser.add_argument("--cache", action="store_true", help="обернуть базу в CachedDatabaseManager")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="файл для JSON-отчета (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = create_backend(args.backend, directory, args.cache)
+        await db.init()
+        try:
+            result = await run_load(db, WORKLOADS[args.workload], args.users, args.concurrency, args.ops, args.seed)
+        finally:
+            await db.close()
+
+    report = {
+        "version": __version__,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "backend": args.backend,
+        "cache": args.cache,
+        "workload": args.workload,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        **result,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,14 @@
+from typing import Any, Dict
+from .base import BaseCommandHandler, CommandContext
+from ..utils.memory import format_memory_report
+
+class AdminCommandHandler(BaseCommandHandler):
+    """Обработчик служебных команд владельца бота."""
+
+    def __init__(self, logger=None):
+        super().__init__(db=None, logger=logger)
+
+    async def show_memory(self, ctx: CommandContext, report: Dict[str, Any]) -> None:
+        """Показать отчет о памяти процесса."""
+        await ctx.send(f"🧠 {format_memory_report(report)}")
+        self.logger.info(f"Memory report requested by {ctx.user_id}: {format_memory_report(report)}")
@@ -1,9 +1,11 @@
 from dataclasses import dataclass
 from typing import Callable, Any
+import asyncio
 import discord
 import logging
 import traceback
 from ..database.base import DatabaseManager, DatabaseError
+from ..utils.metrics import HANDLER_ERRORS
 
 @dataclass
 class CommandContext:
@@ -17,6 +19,17 @@ class CommandContext:
         """Удобный метод для ответа в канал."""
         await self.send(message, **kwargs)
 
+    async def deliver(self, message: str, **kwargs) -> Any:
+        """Отправка с ожиданием доставки; возвращает отправленное сообщение.
+
+        send может только поставить сообщение в очередь и вернуть Future
+        (см. OutboundDispatcher) - тогда ждем его результата.
+        """
+        result = await self.send(message, **kwargs)
+        if isinstance(result, asyncio.Future):
+            return await result
+        return result
+
 class BaseCommandHandler:
     """Базовый класс для обработчиков команд."""
 
@@ -38,6 +51,7 @@ class BaseCommandHandler:
 
     async def _handle_database_error(self, ctx: CommandContext, error: Exception, operation: str):
         """Обработка ошибок базы данных."""
+        HANDLER_ERRORS.inc(type(error).__name__)
         if isinstance(error, DatabaseError):
             await ctx.send(f"❌ Ошибка базы данных при {operation}: {str(error)}")
             self.logger.error(f"Database error in {operation}: {error}")
@@ -50,5 +64,6 @@ class BaseCommandHandler:
         if isinstance(error, DatabaseError):
             await self._handle_database_error(ctx, error, operation)
         else:
+            HANDLER_ERRORS.inc(type(error).__name__)
             await ctx.send(f"❌ Ошибка при {operation}: {str(error)}")
             self.logger.error(f"Error in {operation}: {error}\n{traceback.format_exc()}")
\ No newline at end of file
@@ -0,0 +1,185 @@
+from typing import Any, Awaitable, Callable, Optional
+
+from .base import BaseCommandHandler, CommandContext
+from ..config.settings import CommandConstants
+from ..database.models import BoardTask
+from ..utils.metrics import BOARD_CONFLICTS
+
+BOARD_USAGE = (
+    "📌 Общая доска задач: `!board [страница]`, `!board add <описание>`, `!board done <id>`, "
+    "`!board undone <id>`, `!board edit <id> <описание>`, `!board delete <id>`. "
+    "С `--server` перед действием - доска всего сервера."
+)
+
+def format_board_line(task: BoardTask) -> str:
+    """Строка задачи доски: ID, описание и статус."""
+    return f"#{task.id}: {task.description} ({'✓' if task.status else '✗'})"
+
+class BoardCommandHandler(BaseCommandHandler):
+    """Обработчик команды !board: общие доски задач канала или сервера.
+
+    Задачу доски могут менять многие участники одновременно, поэтому каждая
+    запись сравнивает версию строки (compare-and-swap) вместо блокировки.
+    Если задачу изменили между чтением и записью, команда перечитывает ее
+    и повторяет попытку; правку описания или удаление, которые перебила
+    чужая правка описания, команда не применяет, а сообщает о конфликте.
+    """
+
+    async def run(self, ctx: CommandContext, board_id: int, args: str, scope: str = "канала") -> None:
+        """Разбор действия !board для доски board_id (ID канала или сервера)."""
+        action, _, rest = args.strip().partition(' ')
+        action = action.lower()
+        rest = rest.strip()
+        if action in ('', 'list') or action.isdigit():
+            page = action if action.isdigit() else rest or '1'
+            if not page.isdigit():
+                await ctx.send("❌ Номер страницы должен быть числом.")
+                return
+            await self.list_tasks(ctx, board_id, int(page), scope)
+        elif action == 'add':
+            await self.add_task(ctx, board_id, rest)
+        elif action in ('done', 'undone'):
+            await self.set_status(ctx, board_id, rest, action == 'done')
+        elif action == 'edit':
+            task_id, _, description = rest.partition(' ')
+            await self.edit_task(ctx, board_id, task_id, description.strip())
+        elif action == 'delete':
+            await self.delete_task(ctx, board_id, rest)
+        else:
+            await ctx.send(BOARD_USAGE)
+
+    async def _parse_task_id(self, ctx: CommandContext, task_id: str) -> Optional[int]:
+        """Номер задачи доски."""
+        if not task_id.isdigit() or int(task_id) <= 0:
+            await ctx.send("❌ ID задачи должен быть положительным целым числом.")
+            return None
+        return int(task_id)
+
+    async def _write_task(self, ctx: CommandContext, board_id: int, task_id: int, action: str,
+                          write: Callable[[BoardTask], Awaitable[Any]], keep_description: bool) -> Optional[BoardTask]:
+        """Запись задачи доски с повтором при конфликте версий.
+
+        write получает прочитанную задачу и возвращает ложное значение, если
+        ее версия устарела. С keep_description повтор прекращается, когда
+        описание успели поменять после первого чтения. Возвращает задачу,
+        по которой запись прошла, или None, если команда уже ответила.
+        """
+        first: Optional[BoardTask] = None
+        for _ in range(CommandConstants.BOARD_WRITE_RETRIES):
+            task = await self.db.get_board_task(board_id, task_id)
+            if task is None:
+                await ctx.send(f"❌ Задача #{task_id} на доске не найдена.")
+                return None
+            if first is None:
+                first = task
+            elif keep_description and task.description != first.description:
+                await ctx.send(
+                    f"⚠️ Задачу #{task_id} только что изменил другой участник: {task.description}\n"
+                    f"Проверьте ее и повторите команду, если изменение еще нужно."
+                )
+                return None
+            if await write(task):
+                return task
+            BOARD_CONFLICTS.inc(action)
+        await ctx.send(f"⚠️ Задачу #{task_id} сейчас меняют другие участники, попробуйте еще раз.")
+        self.logger.warning(f"Board {board_id} task {task_id}: {action} gave up after version conflicts")
+        return None
+
+    async def list_tasks(self, ctx: CommandContext, board_id: int, page: int = 1, scope: str = "канала") -> None:
+        """Вывод задач доски с пагинацией."""
+        if page < 1:
+            await ctx.send("❌ Номер страницы должен быть не менее 1.")
+            return
+
+        per_page = CommandConstants.TASKS_PER_PAGE
+        try:
+            tasks = await self.db.get_board_tasks(board_id, per_page, (page - 1) * per_page)
+            total_tasks = await self.db.count_board_tasks(board_id)
+            if not tasks:
+                if page == 1:
+                    await ctx.send(f"📌 На доске {scope} пока нет задач. Добавьте: `!board add <описание>`")
+                else:
+                    await ctx.send(f"❌ Страница {page} не существует. Всего на доске {total_tasks} задач.")
+                return
+
+            total_pages = (total_tasks + per_page - 1) // per_page
+            response = f"📌 Доска {scope} (Страница {page}/{total_pages}, всего {total_tasks}):\n"
+            response += '\n'.join(format_board_line(task) for task in tasks)
+            if page < total_pages:
+                response += f"\n\nИспользуйте `!board {page + 1}` для просмотра следующих задач."
+            await ctx.send(response)
+            self.logger.info(f"User {ctx.user_id} listed board {board_id} (page {page})")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "выводе доски")
+
+    async def add_task(self, ctx: CommandContext, board_id: int, description: str) -> None:
+        """Добавление задачи на доску."""
+        if not description or description.isspace():
+            await ctx.send("❌ Описание задачи не может быть пустым.")
+            return
+
+        try:
+            if await self.db.count_board_tasks(board_id) >= CommandConstants.MAX_BOARD_TASKS:
+                await ctx.send(f"❌ На доске уже {CommandConstants.MAX_BOARD_TASKS} задач, удалите ненужные.")
+                return
+            task_id = await self.db.add_board_task(board_id, ctx.user_id, description)
+            await ctx.send(f"✅ Задача добавлена на доску с ID #{task_id}: {description}")
+            self.logger.info(f"User {ctx.user_id} added task {task_id} to board {board_id}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "добавлении задачи на доску")
+
+    async def set_status(self, ctx: CommandContext, board_id: int, task_id: str, status: bool) -> None:
+        """Отметка задачи доски; отметка идемпотентна, поэтому повторяется при любом конфликте."""
+        task_id = await self._parse_task_id(ctx, task_id)
+        if task_id is None:
+            return
+
+        async def write(task: BoardTask) -> bool:
+            if task.status == status:
+                return True
+            return await self.db.update_board_task(board_id, task_id, task.version, ctx.user_id, status=status) is not None
+
+        try:
+            if await self._write_task(ctx, board_id, task_id, 'status', write, keep_description=False):
+                status_text = "выполнена" if status else "не выполнена"
+                await ctx.send(f"✅ Задача #{task_id} на доске помечена как {status_text}!")
+                self.logger.info(f"User {ctx.user_id} marked board {board_id} task {task_id} as {status_text}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "изменении задачи на доске")
+
+    async def edit_task(self, ctx: CommandContext, board_id: int, task_id: str, description: str) -> None:
+        """Изменение описания задачи доски."""
+        task_id = await self._parse_task_id(ctx, task_id)
+        if task_id is None:
+            return
+        if not description:
+            await ctx.send("❌ Описание задачи не может быть пустым.")
+            return
+
+        async def write(task: BoardTask) -> bool:
+            return await self.db.update_board_task(
+                board_id, task_id, task.version, ctx.user_id, description=description
+            ) is not None
+
+        try:
+            if await self._write_task(ctx, board_id, task_id, 'edit', write, keep_description=True):
+                await ctx.send(f"✅ Задача #{task_id} на доске изменена: {description}")
+                self.logger.info(f"User {ctx.user_id} edited board {board_id} task {task_id}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "изменении задачи на доске")
+
+    async def delete_task(self, ctx: CommandContext, board_id: int, task_id: str) -> None:
+        """Удаление задачи доски."""
+        task_id = await self._parse_task_id(ctx, task_id)
+        if task_id is None:
+            return
+
+        async def write(task: BoardTask) -> bool:
+            return await self.db.delete_board_task(board_id, task_id, task.version)
+
+        try:
+            if await self._write_task(ctx, board_id, task_id, 'delete', write, keep_description=True):
+                await ctx.send(f"🗑️ Задача #{task_id} удалена с доски.")
+                self.logger.info(f"User {ctx.user_id} deleted board {board_id} task {task_id}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "удалении задачи с доски")
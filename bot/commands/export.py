@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import logging
+import tempfile
+from contextlib import aclosing
+from typing import IO, List
+
+import discord
+
+from .base import BaseCommandHandler, CommandContext
+from ..config.settings import CommandConstants, DatabaseConstants
+from ..database.base import DatabaseManager
+from ..database.models import Task
+
+EXPORT_FIELDS = ('id', 'description', 'status', 'created_at')
+
+class CsvTaskWriter:
+    """Запись задач в CSV по мере поступления порций."""
+
+    extension = 'csv'
+
+    def __init__(self, fp: IO[bytes]):
+        self.fp = fp
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._writer.writerow(EXPORT_FIELDS)
+
+    def write(self, tasks: List[Task]) -> None:
+        for task in tasks:
+            created_at = task.created_at
+            self._writer.writerow((
+                task.id, task.description, int(bool(task.status)),
+                created_at.isoformat() if created_at is not None else ''
+            ))
+        self.fp.write(self._buffer.getvalue().encode('utf-8'))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def finish(self) -> None:
+        self.write([])
+
+class JsonTaskWriter:
+    """Запись задач в JSON-массив по мере поступления порций."""
+
+    extension = 'json'
+
+    def __init__(self, fp: IO[bytes]):
+        self.fp = fp
+        self._first = True
+        self.fp.write(b'[')
+
+    def write(self, tasks: List[Task]) -> None:
+        parts = []
+        for task in tasks:
+            entry = task.to_dict()
+            parts.append(json.dumps({field: entry[field] for field in EXPORT_FIELDS}, ensure_ascii=False))
+        if parts:
+            prefix = '\n' if self._first else ',\n'
+            self._first = False
+            self.fp.write((prefix + ',\n'.join(parts)).encode('utf-8'))
+
+    def finish(self) -> None:
+        self.fp.write(b'\n]\n' if not self._first else b']\n')
+
+EXPORT_WRITERS = {'csv': CsvTaskWriter, 'json': JsonTaskWriter}
+
+class ExportCommandHandler(BaseCommandHandler):
+    """Обработчик команды экспорта задач в файл."""
+
+    def __init__(self, db: DatabaseManager = None, logger: logging.Logger = None):
+        super().__init__(db=db, logger=logger)
+
+    async def export_tasks(self, ctx: CommandContext, fmt: str = 'csv') -> None:
+        """Выгрузка всех задач пользователя вложением.
+
+        Задачи читаются порциями через iter_tasks и сразу кодируются во
+        временный файл, который остается в памяти только до
+        EXPORT_SPOOL_MAX_BYTES, поэтому память не растет с числом задач.
+        """
+        writer_class = EXPORT_WRITERS.get(fmt.lower())
+        if writer_class is None:
+            await ctx.send(f"❌ Неизвестный формат. Доступны: {', '.join(EXPORT_WRITERS)}.")
+            return
+
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=CommandConstants.EXPORT_SPOOL_MAX_BYTES) as fp:
+                writer = writer_class(fp)
+                count = 0
+                async with aclosing(self.db.iter_tasks(ctx.user_id, DatabaseConstants.EXPORT_CHUNK_SIZE)) as chunks:
+                    async for tasks in chunks:
+                        writer.write(tasks)
+                        count += len(tasks)
+                        if fp.tell() > CommandConstants.EXPORT_MAX_BYTES:
+                            await ctx.send("❌ Слишком много задач для одного файла.")
+                            return
+                writer.finish()
+
+                if count == 0:
+                    await ctx.send("📋 У вас нет задач!")
+                    return
+
+                fp.seek(0)
+                filename = f"tasks_{ctx.user_id}.{writer_class.extension}"
+                # Файл должен оставаться открытым до фактической отправки
+                await ctx.deliver(f"📦 Экспортировано задач: {count}", file=discord.File(fp, filename=filename))
+                self.logger.info(f"User {ctx.user_id} exported {count} tasks as {writer_class.extension}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "экспорте задач")
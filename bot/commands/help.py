@@ -8,11 +8,19 @@ class HelpCommandHandler(BaseCommandHandler):
     def __init__(self, logger=None):
         super().__init__(db=None, logger=logger)
         self.commands: List[Tuple[str, str]] = [
-            ("!add <описание>", "Добавить новую задачу"),
+            ("!add <описание>", "Добавить новую задачу (несколько строк - несколько задач)"),
             ("!list [страница]", "Показать ваши задачи (с опциональной пагинацией)"),
-            ("!done <id>", "Отметить задачу как выполненную"),
-            ("!undone <id>", "Отметить задачу как не выполненную"),
-            ("!delete <id>", "Удалить задачу"),
+            ("!list --archived [страница]", "Показать старые выполненные задачи из архива"),
+            ("!search <слова> [--page N]", "Найти задачи по словам описания"),
+            ("!export [csv|json]", "Выгрузить все задачи файлом"),
+            ("!import + файл", "Загрузить задачи из прикрепленного .csv, .json или .txt"),
+            ("!done <id> [id ...]", "Отметить задачи как выполненные (можно диапазоны: 7-12)"),
+            ("!undone <id> [id ...]", "Отметить задачи как не выполненные"),
+            ("!delete <id> [id ...]", "Удалить задачи"),
+            ("!due <id> <время|off>", "Срок задачи с напоминанием (30m, 2h, 1d, 2025-12-31 18:00 UTC); без аргументов - ближайшие сроки"),
+            ("!remind <id> <время|off>", "Напомнить о задаче в этом канале"),
+            ("!stats", "Статистика: выполнено задач, по дням и по неделям"),
+            ("!board [--server] [add|done|undone|edit|delete ...]", "Общая доска задач канала или сервера"),
             ("!help", "Показать эту справку")
         ]
 
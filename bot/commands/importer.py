@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, AsyncIterator, IO, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+from .base import BaseCommandHandler, CommandContext
+from .task import CHECKLIST_MARKER
+from ..config.settings import CommandConstants, DatabaseConstants
+from ..database.base import DatabaseManager
+
+# Строка файла импорта: описание и отметка о выполнении
+ImportRow = Tuple[str, bool]
+
+DONE_VALUES = frozenset(('1', 'true', 'yes', 'y', 'x', 'done', '✓', 'да'))
+READ_BLOCK = 64 * 1024
+
+def _is_done(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().casefold() in DONE_VALUES
+
+def iter_text_rows(stream: IO[str]) -> Iterator[ImportRow]:
+    """Строки текстового файла; маркеры списков и чек-листов отбрасываются."""
+    for line in stream:
+        marker = CHECKLIST_MARKER.match(line).group(0)
+        yield line[len(marker):].strip(), '[x]' in marker.lower()
+
+def iter_csv_rows(stream: IO[str]) -> Iterator[ImportRow]:
+    """Строки CSV: столбец description (или первый столбец) и необязательный status."""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [column.strip().casefold() for column in header]
+    if 'description' in columns:
+        description_index = columns.index('description')
+        status_index = columns.index('status') if 'status' in columns else None
+    else:
+        # Без заголовка: первая строка - уже задача
+        description_index, status_index = 0, None
+        yield header[0].strip(), False
+    for row in reader:
+        if len(row) <= description_index:
+            yield '', False
+            continue
+        done = status_index is not None and len(row) > status_index and _is_done(row[status_index])
+        yield row[description_index].strip(), done
+
+def iter_json_rows(stream: IO[str]) -> Iterator[ImportRow]:
+    """Элементы JSON-массива строк или объектов с полями description и status.
+
+    Массив разбирается по одному элементу, в памяти только текущий элемент.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    exhausted = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, exhausted
+        block = stream.read(READ_BLOCK)
+        if not block:
+            exhausted = True
+            return False
+        buffer = buffer[position:] + block
+        position = 0
+        return True
+
+    def skip_whitespace() -> Optional[str]:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return None
+
+    if skip_whitespace() != '[':
+        raise ValueError("JSON file must contain an array of tasks")
+    position += 1
+    expect_item = True
+    while True:
+        char = skip_whitespace()
+        if char is None:
+            raise ValueError("Unexpected end of JSON file")
+        if char == ']':
+            return
+        if not expect_item:
+            if char != ',':
+                raise ValueError("Expected ',' between JSON array items")
+            position += 1
+            expect_item = True
+            continue
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # Число или литерал могли оборваться на границе блока
+                if end == len(buffer) and not exhausted and fill():
+                    continue
+                break
+            except json.JSONDecodeError:
+                if exhausted or not fill():
+                    raise ValueError("Invalid JSON item in import file")
+        position = end
+        expect_item = False
+        if isinstance(item, dict):
+            yield str(item.get('description') or '').strip(), _is_done(item.get('status', False))
+        else:
+            yield str(item).strip(), False
+
+IMPORT_PARSERS = {'.csv': iter_csv_rows, '.json': iter_json_rows, '.txt': iter_text_rows}
+
+async def iter_attachment(url: str) -> AsyncIterator[bytes]:
+    """Скачивание вложения блоками без чтения файла целиком."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            async for block in response.content.iter_chunked(READ_BLOCK):
+                yield block
+
+class ImportCommandHandler(BaseCommandHandler):
+    """Обработчик команды импорта задач из файла."""
+
+    def __init__(self, db: DatabaseManager = None, logger: logging.Logger = None):
+        super().__init__(db=db, logger=logger)
+
+    async def _insert(self, user_id: int, rows: List[ImportRow]) -> None:
+        """Вставка одной пачки вместе со статусами: executemany в транзакции add_tasks."""
+        await self.db.add_tasks(user_id, [description for description, _ in rows], [done for _, done in rows])
+
+    async def import_attachment(self, ctx: CommandContext, attachment: Optional[Any]) -> None:
+        """Импорт из вложения сообщения с командой."""
+        if attachment is None:
+            await ctx.send("❌ Прикрепите к команде файл .csv, .json или .txt с задачами.")
+            return
+        await self.import_tasks(ctx, attachment.filename, attachment.size, iter_attachment(attachment.url))
+
+    async def import_tasks(self, ctx: CommandContext, filename: str, size: int, blocks: AsyncIterator[bytes]) -> None:
+        """Импорт задач из CSV, JSON или текстового файла.
+
+        Файл скачивается во временный файл (на диск сверх
+        EXPORT_SPOOL_MAX_BYTES) и разбирается построчно; задачи вставляются
+        пачками по IMPORT_CHUNK_SIZE, ход импорта показывается правкой одного
+        сообщения.
+        """
+        parser = IMPORT_PARSERS.get(os.path.splitext(filename)[1].lower(), iter_text_rows)
+        if size > CommandConstants.IMPORT_MAX_BYTES:
+            await ctx.send(f"❌ Файл слишком большой (максимум {CommandConstants.IMPORT_MAX_BYTES // (1024 * 1024)} МБ).")
+            return
+
+        try:
+            existing = await self.db.count_tasks(ctx.user_id)
+            quota = CommandConstants.MAX_TASKS_PER_USER - existing
+            if quota <= 0:
+                await ctx.send(f"❌ Достигнут лимит задач ({CommandConstants.MAX_TASKS_PER_USER}).")
+                return
+
+            progress = await ctx.deliver(f"⏳ Импорт из {filename}...")
+            imported = too_long = 0
+            over_quota = False
+            last_update = time.monotonic()
+            max_length = DatabaseConstants.MAX_DESCRIPTION_LENGTH
+
+            with tempfile.SpooledTemporaryFile(max_size=CommandConstants.EXPORT_SPOOL_MAX_BYTES) as fp:
+                received = 0
+                async for block in blocks:
+                    received += len(block)
+                    if received > CommandConstants.IMPORT_MAX_BYTES:
+                        await progress.edit(content="❌ Файл больше допустимого размера.")
+                        return
+                    fp.write(block)
+                fp.seek(0)
+
+                stream = io.TextIOWrapper(fp, encoding='utf-8-sig', errors='replace', newline='')
+                try:
+                    chunk: List[ImportRow] = []
+                    for description, done in parser(stream):
+                        if not description:
+                            continue
+                        if len(description) > max_length:
+                            too_long += 1
+                            continue
+                        if imported + len(chunk) >= quota:
+                            over_quota = True
+                            break
+                        chunk.append((description, done))
+                        if len(chunk) >= CommandConstants.IMPORT_CHUNK_SIZE:
+                            await self._insert(ctx.user_id, chunk)
+                            imported += len(chunk)
+                            chunk = []
+                            if time.monotonic() - last_update >= CommandConstants.IMPORT_PROGRESS_INTERVAL:
+                                last_update = time.monotonic()
+                                await progress.edit(content=f"⏳ Импорт из {filename}: добавлено {imported} задач...")
+                    if chunk:
+                        await self._insert(ctx.user_id, chunk)
+                        imported += len(chunk)
+                except (ValueError, csv.Error) as e:
+                    await progress.edit(
+                        content=f"❌ Ошибка в файле: {e}. Добавлено задач до ошибки: {imported}."
+                    )
+                    self.logger.warning(f"User {ctx.user_id} import stopped after {imported} tasks: {e}")
+                    return
+                finally:
+                    stream.detach()
+
+            summary = f"✅ Импорт из {filename} завершен: добавлено задач: {imported}."
+            if too_long:
+                summary += f"\nПропущено слишком длинных (больше {max_length} символов): {too_long}."
+            if over_quota:
+                summary += f"\n⚠️ Достигнут лимит задач ({CommandConstants.MAX_TASKS_PER_USER}), остаток файла пропущен."
+            await progress.edit(content=summary)
+            self.logger.info(f"User {ctx.user_id} imported {imported} tasks from {filename}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "импорте задач")
@@ -0,0 +1,67 @@
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from .base import BaseCommandHandler, CommandContext
+from ..config.settings import CommandConstants
+from ..database.models import SECONDS_PER_DAY, TaskStats
+
+def _day_label(day: int) -> str:
+    """Сутки UTC в виде дд.мм."""
+    return datetime.fromtimestamp(day * SECONDS_PER_DAY, timezone.utc).strftime("%d.%m")
+
+def format_stats(title: str, stats: TaskStats, today: int,
+                 days: int = CommandConstants.STATS_DAYS, weeks: int = CommandConstants.STATS_WEEKS) -> str:
+    """Текст статистики: итоги, выполненные задачи по дням и по неделям (последние 7 суток - одна неделя)."""
+    completed = {day: done for day, _, done in stats.daily}
+    created = {day: count for day, count, _ in stats.daily}
+
+    lines = [title]
+    if stats.users is not None:
+        lines.append(f"Пользователей с задачами: {stats.users}")
+    lines.append(f"Задач: {stats.total}, выполнено: {stats.done} ({stats.completion_rate:.0%})")
+    recent = range(today - days + 1, today + 1)
+    lines.append(
+        f"За {days} дн. создано: {sum(created.get(day, 0) for day in recent)}, "
+        f"выполнено: {sum(completed.get(day, 0) for day in recent)}"
+    )
+    lines.append("По дням: " + " · ".join(f"{_day_label(day)}: {completed.get(day, 0)}" for day in recent))
+
+    by_week: List[str] = []
+    for week in range(weeks - 1, -1, -1):
+        last = today - 7 * week
+        done = sum(completed.get(day, 0) for day in range(last - 6, last + 1))
+        by_week.append(f"{_day_label(last - 6)}–{_day_label(last)}: {done}")
+    lines.append("По неделям: " + " · ".join(by_week))
+    return "\n".join(lines)
+
+class StatsCommandHandler(BaseCommandHandler):
+    """Обработчик команды !stats.
+
+    Статистика читается из агрегатов, которые база обновляет при каждой
+    записи, поэтому запрос не перебирает задачи.
+    """
+
+    def _since(self, today: int) -> int:
+        """Первые сутки, нужные для разбивки по дням и неделям."""
+        return today - max(CommandConstants.STATS_DAYS, 7 * CommandConstants.STATS_WEEKS) + 1
+
+    async def show_user_stats(self, ctx: CommandContext) -> None:
+        """Статистика задач пользователя."""
+        today = int(time.time()) // SECONDS_PER_DAY
+        try:
+            stats = await self.db.get_user_stats(ctx.user_id, self._since(today))
+            await ctx.send(format_stats("📊 Ваша статистика задач", stats, today))
+            self.logger.info(f"User {ctx.user_id} requested task stats")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "получении статистики")
+
+    async def show_global_stats(self, ctx: CommandContext) -> None:
+        """Статистика по всем пользователям (для владельца бота)."""
+        today = int(time.time()) // SECONDS_PER_DAY
+        try:
+            stats = await self.db.get_global_stats(self._since(today))
+            await ctx.send(format_stats("📊 Статистика бота", stats, today))
+            self.logger.info(f"Global task stats requested by {ctx.user_id}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "получении статистики")
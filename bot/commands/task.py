@@ -1,12 +1,100 @@
-from typing import Optional, List
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, List, Dict, Sequence
 
 from .base import BaseCommandHandler, CommandContext
 from ..config.settings import CommandConstants
-from ..database.models import Task
+from ..database.base import DatabaseManager
+from ..database.models import Reminder, Task
+from ..utils.timeparse import format_when, parse_when
+
+# Маркеры списков, которые остаются в строках при вставке чек-листа
+CHECKLIST_MARKER = re.compile(r'^\s*(?:[-*•]\s+|\d+[.)]\s+)?(?:\[[ xX]?\]\s*)?')
+TASK_ID_RANGE = re.compile(r'^(\d+)-(\d+)$')
+# Номер страницы в конце поискового запроса: "!search отчет --page 2"
+SEARCH_PAGE = re.compile(r'\s+--page\s+(\d+)\s*$')
+# Слова, снимающие срок или напоминание
+CLEAR_WORDS = ('off', 'none', 'нет')
+WHEN_EXAMPLES = "`30m`, `2h`, `1d12h`, `2025-12-31 18:00` (UTC)"
+
+def format_task_line(task: Task) -> str:
+    """Строка задачи в списках: ID, описание, статус и срок."""
+    status_icon = '✓' if task.status else '✗'
+    line = f"#{task.id}: {task.description} ({status_icon})"
+    if task.due_at is not None:
+        line += f" 🗓️ {format_when(task.due_at)}"
+    return line
+
+def format_task_ids(task_ids: Sequence[int]) -> str:
+    """Компактная запись ID задач: #3, #5, #7–#12."""
+    parts = []
+    ids = sorted(task_ids)
+    start = previous = None
+    for task_id in ids + [None]:
+        if start is not None and task_id == previous + 1:
+            previous = task_id
+            continue
+        if start is not None:
+            parts.append(f"#{start}" if start == previous else f"#{start}–#{previous}")
+        start = previous = task_id
+    return ", ".join(parts)
 
 class TaskCommandHandler(BaseCommandHandler):
     """Обработчик команд для управления задачами."""
 
+    def __init__(
+        self,
+        db: DatabaseManager = None,
+        logger: logging.Logger = None,
+        page_cursor_cache_size: int = CommandConstants.PAGE_CURSOR_CACHE_SIZE,
+        on_reminder: Optional[Callable[[Reminder], None]] = None,
+    ):
+        super().__init__(db=db, logger=logger)
+        # Вызывается после сохранения напоминания (ReminderScheduler.schedule)
+        self.on_reminder = on_reminder
+        # user_id -> {номер страницы: ID последней задачи предыдущей страницы}
+        self._page_cursors: OrderedDict[int, Dict[int, int]] = OrderedDict()
+        self._page_cursor_cache_size = page_cursor_cache_size
+
+    def _get_page_cursor(self, user_id: int, page: int) -> Optional[int]:
+        """Известная граница страницы или None."""
+        if page == 1:
+            return 0
+        cursors = self._page_cursors.get(user_id)
+        if cursors is None:
+            return None
+        self._page_cursors.move_to_end(user_id)
+        return cursors.get(page)
+
+    def _remember_page_cursor(self, user_id: int, page: int, after_id: int) -> None:
+        """Запоминание границы страницы с вытеснением давно неактивных пользователей."""
+        cursors = self._page_cursors.setdefault(user_id, {})
+        cursors[page] = after_id
+        self._page_cursors.move_to_end(user_id)
+        while len(self._page_cursors) > self._page_cursor_cache_size:
+            self._page_cursors.popitem(last=False)
+
+    def _forget_page_cursors(self, user_id: int, removed_id: Optional[int] = None) -> None:
+        """Сброс границ страниц, сдвинутых удалением задачи.
+
+        Новые задачи получают наибольший ID и границ не сдвигают, поэтому
+        сбрасываются только границы не меньше удаленного ID.
+        """
+        cursors = self._page_cursors.get(user_id)
+        if cursors is None:
+            return
+        if removed_id is None:
+            del self._page_cursors[user_id]
+            return
+        for page in [page for page, after_id in cursors.items() if after_id >= removed_id]:
+            del cursors[page]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Сброс границ страниц пользователя после изменений в обход обработчика (перенос в архив)."""
+        self._forget_page_cursors(user_id)
+
     async def _validate_task_id(self, ctx: CommandContext, task_id: str) -> Optional[int]:
         """Валидация ID задачи."""
         if not task_id.isdigit():
@@ -20,11 +108,45 @@ class TaskCommandHandler(BaseCommandHandler):
             
         return task_id
 
+    async def _parse_task_ids(self, ctx: CommandContext, specs: Sequence[str]) -> Optional[List[int]]:
+        """Разбор списка ID и диапазонов вида `3 5 7-12`."""
+        task_ids: List[int] = []
+        for spec in specs:
+            for token in spec.replace(',', ' ').split():
+                match = TASK_ID_RANGE.match(token)
+                if match:
+                    start, end = int(match.group(1)), int(match.group(2))
+                    if start <= 0 or end < start:
+                        await ctx.send(f"❌ Некорректный диапазон задач: {token}")
+                        return None
+                    if end - start + 1 > CommandConstants.MAX_BULK_TASKS:
+                        await ctx.send(f"❌ Можно указать не более {CommandConstants.MAX_BULK_TASKS} задач за раз.")
+                        return None
+                    task_ids.extend(range(start, end + 1))
+                elif token.isdigit() and int(token) > 0:
+                    task_ids.append(int(token))
+                else:
+                    await ctx.send("❌ ID задачи должен быть положительным целым числом.")
+                    return None
+
+        task_ids = list(dict.fromkeys(task_ids))
+        if not task_ids:
+            await ctx.send("❌ Укажите ID задачи.")
+            return None
+        if len(task_ids) > CommandConstants.MAX_BULK_TASKS:
+            await ctx.send(f"❌ Можно указать не более {CommandConstants.MAX_BULK_TASKS} задач за раз.")
+            return None
+        return task_ids
+
     async def add_task(self, ctx: CommandContext, description: str) -> None:
         """Добавление новой задачи."""
         if not description or description.isspace():
             await ctx.send("❌ Описание задачи не может быть пустым.")
             return
+
+        if '\n' in description.strip():
+            await self.add_tasks(ctx, description)
+            return
             
         try:
             task_id = await self.db.add_task(ctx.user_id, description)
@@ -33,16 +155,42 @@ class TaskCommandHandler(BaseCommandHandler):
         except Exception as e:
             await self._handle_database_error(ctx, e, "добавлении задачи")
 
+    async def add_tasks(self, ctx: CommandContext, text: str) -> None:
+        """Добавление задач из многострочного текста, по одной на строку."""
+        descriptions = [CHECKLIST_MARKER.sub('', line).strip() for line in text.splitlines()]
+        descriptions = [description for description in descriptions if description]
+        if not descriptions:
+            await ctx.send("❌ Описание задачи не может быть пустым.")
+            return
+        if len(descriptions) > CommandConstants.MAX_BULK_TASKS:
+            await ctx.send(f"❌ Можно добавить не более {CommandConstants.MAX_BULK_TASKS} задач за раз.")
+            return
+
+        try:
+            task_ids = await self.db.add_tasks(ctx.user_id, descriptions)
+            await ctx.send(f"✅ Добавлено задач: {len(task_ids)} ({format_task_ids(task_ids)})")
+            self.logger.info(f"User {ctx.user_id} added {len(task_ids)} tasks")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "добавлении задач")
+
     async def list_tasks(self, ctx: CommandContext, page: int = 1) -> None:
         """Вывод списка задач с пагинацией."""
         if page < 1:
             await ctx.send("❌ Номер страницы должен быть не менее 1.")
             return
             
-        offset = (page - 1) * CommandConstants.TASKS_PER_PAGE
-        
+        per_page = CommandConstants.TASKS_PER_PAGE
+
         try:
-            tasks: List[Task] = await self.db.get_tasks(ctx.user_id, CommandConstants.TASKS_PER_PAGE, offset)
+            after_id = self._get_page_cursor(ctx.user_id, page)
+            if after_id is not None:
+                tasks: List[Task] = await self.db.get_tasks_after(ctx.user_id, after_id, per_page)
+            else:
+                # Граница еще неизвестна: один раз проходим по OFFSET
+                tasks = await self.db.get_tasks(ctx.user_id, per_page, (page - 1) * per_page)
+            if len(tasks) == per_page:
+                self._remember_page_cursor(ctx.user_id, page + 1, tasks[-1].id)
+
             total_tasks = await self.db.count_tasks(ctx.user_id)
             
             if not tasks:
@@ -55,10 +203,7 @@ class TaskCommandHandler(BaseCommandHandler):
             total_pages = (total_tasks + CommandConstants.TASKS_PER_PAGE - 1) // CommandConstants.TASKS_PER_PAGE
             header = f"📋 Задачи (Страница {page}/{total_pages}, всего {total_tasks}):\n"
             
-            task_lines = []
-            for task in tasks:
-                status_icon = '✓' if task.status else '✗'
-                task_lines.append(f"#{task.id}: {task.description} ({status_icon})")
+            task_lines = [format_task_line(task) for task in tasks]
             
             response = header + '\n'.join(task_lines)
             
@@ -70,6 +215,70 @@ class TaskCommandHandler(BaseCommandHandler):
         except Exception as e:
             await self._handle_database_error(ctx, e, "выводе списка задач")
 
+    async def list_archived_tasks(self, ctx: CommandContext, page: int = 1) -> None:
+        """Вывод задач, перенесенных в архив."""
+        if page < 1:
+            await ctx.send("❌ Номер страницы должен быть не менее 1.")
+            return
+
+        per_page = CommandConstants.TASKS_PER_PAGE
+        try:
+            tasks = await self.db.get_archived_tasks(ctx.user_id, per_page, (page - 1) * per_page)
+            total_tasks = await self.db.count_archived_tasks(ctx.user_id)
+            if not tasks:
+                if page == 1:
+                    await ctx.send("🗄️ В архиве нет задач.")
+                else:
+                    await ctx.send(f"❌ Страница {page} не существует. Всего в архиве {total_tasks} задач.")
+                return
+
+            total_pages = (total_tasks + per_page - 1) // per_page
+            response = f"🗄️ Архив (Страница {page}/{total_pages}, всего {total_tasks}):\n"
+            response += '\n'.join(format_task_line(task) for task in tasks)
+            if page < total_pages:
+                response += f"\n\nИспользуйте `!list --archived {page + 1}` для просмотра следующих задач."
+
+            await ctx.send(response)
+            self.logger.info(f"User {ctx.user_id} listed archived tasks (page {page})")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "выводе архива задач")
+
+    async def search_tasks(self, ctx: CommandContext, query: str) -> None:
+        """Поиск задач по словам описания с постраничным выводом."""
+        page = 1
+        match = SEARCH_PAGE.search(query)
+        if match:
+            page = int(match.group(1))
+            query = query[:match.start()]
+        query = query.strip()
+        if not query:
+            await ctx.send("❌ Укажите, что искать: `!search <слова> [--page N]`.")
+            return
+        if page < 1:
+            await ctx.send("❌ Номер страницы должен быть не менее 1.")
+            return
+
+        per_page = CommandConstants.TASKS_PER_PAGE
+        try:
+            # Лишняя задача показывает, есть ли следующая страница
+            tasks = await self.db.search_tasks(ctx.user_id, query, per_page + 1, (page - 1) * per_page)
+            if not tasks:
+                if page == 1:
+                    await ctx.send(f"🔍 По запросу «{query}» ничего не найдено.")
+                else:
+                    await ctx.send(f"❌ Страница {page} не существует.")
+                return
+
+            task_lines = [format_task_line(task) for task in tasks[:per_page]]
+            response = f"🔍 Результаты по запросу «{query}» (Страница {page}):\n" + '\n'.join(task_lines)
+            if len(tasks) > per_page:
+                response += f"\n\nИспользуйте `!search {query} --page {page + 1}` для просмотра следующих результатов."
+
+            await ctx.send(response)
+            self.logger.info(f"User {ctx.user_id} searched tasks (page {page})")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "поиске задач")
+
     async def mark_task_status(self, ctx: CommandContext, task_id: str, status: bool) -> None:
         """Изменение статуса задачи."""
         task_id = await self._validate_task_id(ctx, task_id)
@@ -88,6 +297,29 @@ class TaskCommandHandler(BaseCommandHandler):
         except Exception as e:
             await self._handle_database_error(ctx, e, "изменении статуса задачи")
 
+    async def mark_tasks_status(self, ctx: CommandContext, task_ids: Sequence[str], status: bool) -> None:
+        """Изменение статуса одной или нескольких задач."""
+        if len(task_ids) == 1 and task_ids[0].isdigit():
+            await self.mark_task_status(ctx, task_ids[0], status)
+            return
+
+        parsed_ids = await self._parse_task_ids(ctx, task_ids)
+        if parsed_ids is None:
+            return
+
+        try:
+            found = await self.db.set_status_many(ctx.user_id, parsed_ids, status)
+            status_text = "выполненные" if status else "не выполненные"
+            response = (f"✅ Помечено как {status_text}: {format_task_ids(found)}"
+                        if found else "❌ Ни одна из задач не найдена.")
+            missing = sorted(set(parsed_ids) - set(found))
+            if found and missing:
+                response += f"\nНе найдены: {format_task_ids(missing)}"
+            await ctx.send(response)
+            self.logger.info(f"User {ctx.user_id} marked {len(found)} tasks as {status_text}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "изменении статуса задач")
+
     async def delete_task(self, ctx: CommandContext, task_id: str) -> None:
         """Удаление задачи."""
         task_id = await self._validate_task_id(ctx, task_id)
@@ -97,10 +329,122 @@ class TaskCommandHandler(BaseCommandHandler):
         try:
             success = await self.db.delete_task(ctx.user_id, task_id)
             if success:
+                self._forget_page_cursors(ctx.user_id, task_id)
                 await ctx.send(f"🗑️ Задача #{task_id} удалена!")
                 self.logger.info(f"User {ctx.user_id} deleted task {task_id}")
             else:
                 await ctx.send(f"❌ Задача #{task_id} не найдена или у вас нет прав на её удаление.")
                 self.logger.warning(f"User {ctx.user_id} attempted to delete non-existent task {task_id}")
         except Exception as e:
-            await self._handle_database_error(ctx, e, "удалении задачи") 
\ No newline at end of file
+            await self._handle_database_error(ctx, e, "удалении задачи")
+
+    async def delete_tasks(self, ctx: CommandContext, task_ids: Sequence[str]) -> None:
+        """Удаление одной или нескольких задач."""
+        if len(task_ids) == 1 and task_ids[0].isdigit():
+            await self.delete_task(ctx, task_ids[0])
+            return
+
+        parsed_ids = await self._parse_task_ids(ctx, task_ids)
+        if parsed_ids is None:
+            return
+
+        try:
+            deleted = await self.db.delete_many(ctx.user_id, parsed_ids)
+            if deleted:
+                self._forget_page_cursors(ctx.user_id, min(deleted))
+            response = (f"🗑️ Удалены задачи: {format_task_ids(deleted)}"
+                        if deleted else "❌ Ни одна из задач не найдена.")
+            missing = sorted(set(parsed_ids) - set(deleted))
+            if deleted and missing:
+                response += f"\nНе найдены: {format_task_ids(missing)}"
+            await ctx.send(response)
+            self.logger.info(f"User {ctx.user_id} deleted {len(deleted)} tasks")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "удалении задач")
+
+    async def _parse_future_time(self, ctx: CommandContext, when: str, usage: str) -> Optional[int]:
+        """Разбор времени из команды; None - ошибка уже сообщена."""
+        if not when.strip():
+            await ctx.send(f"❌ Укажите время: `{usage}`. Например: {WHEN_EXAMPLES}.")
+            return None
+        now = time.time()
+        moment = parse_when(when, now)
+        if moment is None:
+            await ctx.send(f"❌ Не удалось разобрать время. Примеры: {WHEN_EXAMPLES}.")
+            return None
+        if moment <= now:
+            await ctx.send("❌ Это время уже прошло.")
+            return None
+        return moment
+
+    def _schedule_reminder(self, ctx: CommandContext, task_id: int, remind_at: int) -> None:
+        """Передача сохраненного напоминания планировщику."""
+        if self.on_reminder is not None:
+            self.on_reminder(Reminder(remind_at, ctx.user_id, task_id, ctx.channel.id))
+
+    async def set_due_date(self, ctx: CommandContext, task_id: str, when: str) -> None:
+        """Установка срока задачи с напоминанием в этот канал или снятие срока."""
+        task_id = await self._validate_task_id(ctx, task_id)
+        if task_id is None:
+            return
+        due_at = None
+        if when.strip().lower() not in CLEAR_WORDS:
+            due_at = await self._parse_future_time(ctx, when, "!due <ID> <время|off>")
+            if due_at is None:
+                return
+
+        try:
+            success = await self.db.set_due_date(ctx.user_id, task_id, due_at, ctx.channel.id)
+            if not success:
+                await ctx.send(f"❌ Задача #{task_id} не найдена или у вас нет прав на её изменение.")
+                return
+            if due_at is None:
+                await ctx.send(f"🗓️ Срок задачи #{task_id} снят.")
+            else:
+                self._schedule_reminder(ctx, task_id, due_at)
+                await ctx.send(f"🗓️ Срок задачи #{task_id}: {format_when(due_at)}. Напомню в этом канале.")
+            self.logger.info(f"User {ctx.user_id} set due date of task {task_id} to {due_at}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "установке срока задачи")
+
+    async def set_reminder(self, ctx: CommandContext, task_id: str, when: str) -> None:
+        """Установка напоминания о задаче в этот канал или его отмена."""
+        task_id = await self._validate_task_id(ctx, task_id)
+        if task_id is None:
+            return
+        remind_at = None
+        if when.strip().lower() not in CLEAR_WORDS:
+            remind_at = await self._parse_future_time(ctx, when, "!remind <ID> <время|off>")
+            if remind_at is None:
+                return
+
+        try:
+            success = await self.db.set_reminder(ctx.user_id, task_id, remind_at, ctx.channel.id)
+            if not success:
+                await ctx.send(f"❌ Задача #{task_id} не найдена или у вас нет прав на её изменение.")
+                return
+            if remind_at is None:
+                await ctx.send(f"🔕 Напоминание о задаче #{task_id} отменено.")
+            else:
+                self._schedule_reminder(ctx, task_id, remind_at)
+                await ctx.send(f"⏰ Напомню о задаче #{task_id} {format_when(remind_at)}.")
+            self.logger.info(f"User {ctx.user_id} set reminder for task {task_id} to {remind_at}")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "установке напоминания")
+
+    async def list_due_tasks(self, ctx: CommandContext) -> None:
+        """Невыполненные задачи с ближайшими сроками."""
+        try:
+            tasks = await self.db.get_due_tasks(ctx.user_id, CommandConstants.TASKS_PER_PAGE)
+            if not tasks:
+                await ctx.send("🗓️ У вас нет невыполненных задач со сроком.")
+                return
+            now = time.time()
+            task_lines = []
+            for task in tasks:
+                overdue = " ⚠️ просрочена" if task.due_at <= now else ""
+                task_lines.append(f"#{task.id}: {task.description} — {format_when(task.due_at)}{overdue}")
+            await ctx.send("🗓️ Ближайшие сроки:\n" + '\n'.join(task_lines))
+            self.logger.info(f"User {ctx.user_id} listed due tasks")
+        except Exception as e:
+            await self._handle_database_error(ctx, e, "выводе сроков задач")
@@ -1,7 +1,46 @@
 from dataclasses import dataclass
 import os
+from typing import List, Optional
 from dotenv import load_dotenv
 
+class BotConstants:
+    """Константы бота."""
+    DEFAULT_PREFIX: str = '!'
+    LOG_LEVEL: int = 20  # logging.INFO
+    LOG_FORMAT: str = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    LOG_FILE: str = "discord_bot.log"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024  # ротация по размеру
+    LOG_ROTATE_WHEN: str = ''  # 'midnight', 'H' и т.п. - ротация по времени вместо размера
+    LOG_BACKUP_COUNT: int = 5
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_POLICY: str = 'drop'  # drop или block при переполнении очереди
+    METRICS_HOST: str = '127.0.0.1'  # метрики доступны только локально
+    MESSAGE_MAX_LENGTH: int = 2000  # ограничение Discord на длину сообщения
+    OUTBOUND_CHANNEL_RATE: int = 5  # сообщений в канал за OUTBOUND_CHANNEL_PER секунд
+    OUTBOUND_CHANNEL_PER: float = 5.0
+    OUTBOUND_GLOBAL_RATE: int = 50  # сообщений бота за OUTBOUND_GLOBAL_PER секунд
+    OUTBOUND_GLOBAL_PER: float = 1.0
+    OUTBOUND_MAX_PENDING: int = 100  # очередь канала, сверх нее ответы отбрасываются
+    OUTBOUND_MAX_RETRIES: int = 3  # повторы при 429 и 5xx
+    OUTBOUND_COALESCE: bool = True  # склеивать подряд идущие текстовые ответы
+    OUTBOUND_CLOSE_TIMEOUT: float = 10.0
+    REMINDER_WINDOW: float = 3600.0  # напоминания ближайшего часа держатся в памяти
+    REMINDER_MAX_PENDING: int = 10000  # не больше стольких напоминаний в куче
+    REMINDER_REFILL_INTERVAL: float = 60.0  # перечитывать окно из базы не реже, чем раз в столько секунд
+    REMINDER_LEASE: int = 120  # захваченное, но не подтвержденное напоминание повторяется через столько секунд
+    CLUSTER_RESTART_DELAY: float = 5.0  # первая пауза перед перезапуском упавшего кластера
+    CLUSTER_MAX_RESTART_DELAY: float = 300.0
+    CLUSTER_STABLE_AFTER: float = 60.0  # после стольких секунд работы пауза сбрасывается
+    CLUSTER_STOP_TIMEOUT: float = 30.0  # ожидание завершения кластеров перед kill
+    WORKER_SOCKET_PATH: str = 'bot_workers.sock'  # Unix-сокет между шлюзом и процессами-обработчиками
+    WORKER_MAX_IN_FLIGHT: int = 32  # заданий, отправленных процессу-обработчику и еще не выполненных
+    WORKER_MAX_PENDING: int = 1000  # очередь шлюза на процесс-обработчик, сверх нее команды отклоняются
+    WORKER_FRAME_LIMIT: int = 1024 * 1024  # наибольший кадр протокола (строка JSON)
+    WORKER_RESTART_DELAY: float = 1.0  # первая пауза перед перезапуском упавшего обработчика
+    WORKER_MAX_RESTART_DELAY: float = 60.0
+    WORKER_STABLE_AFTER: float = 60.0  # после стольких секунд работы пауза сбрасывается
+    WORKER_STOP_TIMEOUT: float = 10.0  # ожидание завершения обработчиков перед kill
+
 @dataclass
 class BotConfig:
     """Конфигурация бота."""
@@ -10,25 +49,87 @@ class BotConfig:
     log_level: int
     log_format: str
     log_file: str
-
-class BotConstants:
-    """Константы бота."""
-    DEFAULT_PREFIX: str = '!'
-    LOG_LEVEL: int = 20  # logging.INFO
-    LOG_FORMAT: str = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-    LOG_FILE: str = "discord_bot.log"
+    log_json: bool = False
+    metrics_port: Optional[int] = None
+    metrics_host: str = BotConstants.METRICS_HOST
+    lean_cache: bool = False  # минимальные интенты и кэши клиента Discord
+    sharded: bool = False  # AutoShardedBot вместо Bot
+    shard_count: Optional[int] = None  # None - число шардов выбирает Discord
+    shard_ids: Optional[List[int]] = None  # шарды этого процесса, None - все
+    cluster_id: Optional[int] = None  # номер кластера при запуске через лаунчер
+    worker_socket: str = BotConstants.WORKER_SOCKET_PATH  # сокет процессов-обработчиков (--workers)
 
 class DatabaseConstants:
     """Константы базы данных."""
     DEFAULT_TASK_LIMIT: int = 10
     MAX_DESCRIPTION_LENGTH: int = 500
     DB_PATH: str = 'tasks.db'
+    BACKEND: str = 'sqlite'  # sqlite, sharded или memory
+    SHARD_COUNT: int = 4
+    SHARD_PATH_TEMPLATE: str = '{base}.shard{index}{ext}'
+    # Групповой коммит: записи копятся в очереди и фиксируются одной транзакцией
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_WINDOW: float = 0.005  # секунды ожидания попутных записей
+    GROUP_COMMIT_MAX_BATCH: int = 64
+    # WAL-режим: одно соединение для записи и пул соединений только для чтения
+    WAL_ENABLED: bool = False
+    READ_POOL_SIZE: int = 4
+    BUSY_TIMEOUT_MS: int = 5000
+    WAL_AUTOCHECKPOINT: int = 1000  # страниц WAL до автоматического checkpoint, 0 - отключить
+    CHECKPOINT_INTERVAL: float = 0  # секунды между фоновыми checkpoint, 0 - отключить
+    CHECKPOINT_MODE: str = 'PASSIVE'  # PASSIVE, FULL, RESTART или TRUNCATE
+    # Хранилище в памяти с журналом операций и снимками
+    MEMORY_LOG_PATH: str = 'tasks.oplog'
+    MEMORY_SNAPSHOT_EVERY: int = 10000  # операций журнала между снимками
+    MEMORY_FSYNC_INTERVAL: float = 0  # секунды между fsync журнала, 0 - fsync перед ответом на каждую запись
+    EXPORT_CHUNK_SIZE: int = 500  # задач за один fetchmany при экспорте
+    # Миграции схемы: по умолчанию старую базу переводит команда
+    # maintenance migrate; MIGRATE_ON_START запускает миграцию в фоне при старте
+    MIGRATE_ON_START: bool = False
+    MIGRATION_BATCH_SIZE: int = 1000  # строк в одной транзакции копирования
+    MIGRATION_BATCH_PAUSE: float = 0.05  # пауза между пачками, чтобы не занимать запись надолго
+    # Архив: выполненные задачи старше ARCHIVE_AFTER_DAYS переносятся в отдельный файл
+    ARCHIVE_PATH_TEMPLATE: str = '{base}.archive{ext}'
+    ARCHIVE_AFTER_DAYS: float = 30  # 0 - не переносить
+    ARCHIVE_BATCH_SIZE: int = 500  # задач в одной транзакции переноса
+    ARCHIVE_BATCH_PAUSE: float = 0.5  # пауза между пачками, чтобы не занимать запись надолго
+    ARCHIVE_INTERVAL: float = 3600.0  # секунды между фоновыми проходами
+    ARCHIVE_VACUUM_PAGES: int = 1000  # свободных страниц, возвращаемых ОС за проход
+    # Кэш страниц и счетчиков задач в памяти процесса
+    CACHE_ENABLED: bool = False
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_MAX_BYTES: int = 32 * 1024 * 1024
 
 class CommandConstants:
     """Константы команд."""
-    COOLDOWN_SECONDS: int = 5
-    COOLDOWN_RATE: int = 1
+    RATE_LIMIT_CAPACITY: float = 6.0  # токенов у пользователя (размер всплеска)
+    RATE_LIMIT_REFILL_RATE: float = 1.0  # токенов в секунду
+    RATE_LIMIT_WEIGHTS = {'help': 0.5, 'export': 3, 'import': 5}  # стоимость команд, по умолчанию 1 токен
+    RATE_LIMIT_MAX_BUCKETS: int = 100000  # пользователей с неполным ведром
+    RATE_LIMIT_STATE_PATH: str = ''  # файл для сохранения ведер между перезапусками, '' - не сохранять
     TASKS_PER_PAGE: int = 10
+    MAX_BULK_TASKS: int = 100  # задач в одной массовой команде
+    PAGE_CURSOR_CACHE_SIZE: int = 10000  # пользователей с запомненными границами страниц
+    EXPORT_SPOOL_MAX_BYTES: int = 1024 * 1024  # больше - файл экспорта переносится на диск
+    EXPORT_MAX_BYTES: int = 10 * 1024 * 1024  # ограничение Discord на размер вложения
+    IMPORT_MAX_BYTES: int = 8 * 1024 * 1024
+    IMPORT_CHUNK_SIZE: int = 500  # задач в одной транзакции импорта
+    IMPORT_PROGRESS_INTERVAL: float = 2.0  # не чаще стольких секунд правим сообщение о ходе импорта
+    MAX_TASKS_PER_USER: int = 10000  # квота задач пользователя при импорте
+    STATS_DAYS: int = 7  # суток в разбивке !stats по дням
+    STATS_WEEKS: int = 4  # недель в разбивке !stats по неделям
+    MAX_BOARD_TASKS: int = 1000  # задач на одной общей доске
+    BOARD_WRITE_RETRIES: int = 5  # попыток записи задачи доски при конфликте версий
+
+def parse_shard_ids(value: str) -> List[int]:
+    """Разбор списка шардов вида "0,1,2" или "0-3,8"."""
+    shard_ids: List[int] = []
+    for part in value.split(','):
+        first, _, last = part.strip().partition('-')
+        if not first.isdigit() or (last and not last.isdigit()):
+            raise ValueError(f"Invalid shard id list: {value}")
+        shard_ids.extend(range(int(first), int(last or first) + 1))
+    return shard_ids
 
 def create_config() -> BotConfig:
     """Создание конфигурации бота."""
@@ -44,10 +145,47 @@ def create_config() -> BotConfig:
             "3. Get your bot token from https://discord.com/developers/applications"
         )
         
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port is not None and not metrics_port.isdigit():
+        raise ValueError("METRICS_PORT must be a port number")
+        
+    shard_count = os.getenv("SHARD_COUNT")
+    if shard_count is not None and shard_count != "auto" and not shard_count.isdigit():
+        raise ValueError("SHARD_COUNT must be a number or 'auto'")
+    shard_ids = parse_shard_ids(os.environ["SHARD_IDS"]) if os.getenv("SHARD_IDS") else None
+    if shard_ids is not None:
+        if shard_count is None or shard_count == "auto":
+            raise ValueError("SHARD_IDS requires an explicit SHARD_COUNT")
+        if max(shard_ids) >= int(shard_count):
+            raise ValueError("SHARD_IDS must be lower than SHARD_COUNT")
+        
+    cluster_id = os.getenv("CLUSTER_ID")
+    if cluster_id is not None and not cluster_id.isdigit():
+        raise ValueError("CLUSTER_ID must be a number")
+    log_file = BotConstants.LOG_FILE
+    worker_socket = BotConstants.WORKER_SOCKET_PATH
+    if cluster_id is not None:
+        # У каждого процесса свой файл: ротация общего файла из нескольких процессов небезопасна
+        base, ext = os.path.splitext(log_file)
+        log_file = f"{base}.cluster{cluster_id}{ext}"
+        base, ext = os.path.splitext(worker_socket)
+        worker_socket = f"{base}.cluster{cluster_id}{ext}"
+        if metrics_port is not None:
+            metrics_port = str(int(metrics_port) + int(cluster_id))
+        
     return BotConfig(
         token=token,
         prefix=os.getenv("COMMAND_PREFIX", BotConstants.DEFAULT_PREFIX),
         log_level=BotConstants.LOG_LEVEL,
         log_format=BotConstants.LOG_FORMAT,
-        log_file=BotConstants.LOG_FILE
+        log_file=log_file,
+        log_json=os.getenv("LOG_JSON", "").lower() in ("1", "true", "yes"),
+        metrics_port=int(metrics_port) if metrics_port is not None else None,
+        metrics_host=os.getenv("METRICS_HOST", BotConstants.METRICS_HOST),
+        lean_cache=os.getenv("LEAN_CACHE", "").lower() in ("1", "true", "yes"),
+        sharded=shard_count is not None,
+        shard_count=int(shard_count) if shard_count not in (None, "auto") else None,
+        shard_ids=shard_ids,
+        cluster_id=int(cluster_id) if cluster_id is not None else None,
+        worker_socket=worker_socket
     ) 
\ No newline at end of file
@@ -2,14 +2,34 @@ import discord
 from discord.ext import commands
 import asyncio
 import signal
+import time
 from typing import Optional
 
-from ..config.settings import BotConfig
+from ..config.settings import BotConfig, CommandConstants
 from ..database.base import DatabaseManager
+from .dispatcher import OutboundDispatcher
+from .scheduler import ReminderScheduler
+from .workers import WorkerPool
 from .logging import LoggingManager
 from ..commands.task import TaskCommandHandler
 from ..commands.help import HelpCommandHandler
+from ..commands.admin import AdminCommandHandler
+from ..commands.export import ExportCommandHandler
+from ..commands.importer import ImportCommandHandler
+from ..commands.stats import StatsCommandHandler
+from ..commands.board import BoardCommandHandler
 from ..commands.base import CommandContext
+from ..database.models import Reminder
+from ..utils.memory import format_memory_report, memory_report, resident_memory_bytes
+from ..utils.ratelimit import RateLimiter
+from ..utils.metrics import METRICS, COMMAND_LATENCY, COMMAND_ERRORS, MetricsServer
+
+class RateLimited(commands.CheckFailure):
+    """Команда отклонена ограничителем частоты."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
 
 class BotManager:
     """Менеджер бота."""
@@ -22,14 +42,57 @@ class BotManager:
         self.loop: Optional[asyncio.AbstractEventLoop] = None
         self.task_handler: Optional[TaskCommandHandler] = None
         self.help_handler: Optional[HelpCommandHandler] = None
+        self.admin_handler: Optional[AdminCommandHandler] = None
+        self.export_handler: Optional[ExportCommandHandler] = None
+        self.import_handler: Optional[ImportCommandHandler] = None
+        self.stats_handler: Optional[StatsCommandHandler] = None
+        self.board_handler: Optional[BoardCommandHandler] = None
+        self.metrics_server: Optional[MetricsServer] = None
+        self.dispatcher: Optional[OutboundDispatcher] = None
+        self.scheduler: Optional[ReminderScheduler] = None
+        self.workers: Optional[WorkerPool] = None
+        self.rate_limiter = RateLimiter(
+            CommandConstants.RATE_LIMIT_CAPACITY,
+            CommandConstants.RATE_LIMIT_REFILL_RATE,
+            CommandConstants.RATE_LIMIT_WEIGHTS,
+            max_buckets=CommandConstants.RATE_LIMIT_MAX_BUCKETS
+        )
+        METRICS.callback(
+            'discord_bot_resident_memory_bytes', 'Resident memory of the process', lambda: resident_memory_bytes() or 0
+        )
+        METRICS.callback(
+            'discord_bot_rate_limit_buckets', 'Users tracked by the rate limiter', lambda: len(self.rate_limiter)
+        )
+        METRICS.callback(
+            'discord_bot_reminders_pending', 'Reminders held in the scheduler window',
+            lambda: len(self.scheduler) if self.scheduler else 0
+        )
+        METRICS.callback(
+            'discord_bot_worker_pending_jobs', 'Commands queued for or running in worker processes',
+            lambda: self.workers.pending() if self.workers else 0
+        )
 
     async def initialize(self) -> None:
         """Инициализация бота."""
         self.logger.info("Starting bot initialization")
         
         # Настройка интентов
-        intents = discord.Intents.default()
-        intents.guilds = True
+        options = {}
+        if self.config.lean_cache:
+            # Только то, что нужно для префиксных команд: без участников,
+            # присутствия, кэша сообщений и загрузки участников при старте
+            intents = discord.Intents.none()
+            intents.guilds = True
+            intents.guild_messages = True
+            intents.dm_messages = True
+            options.update(
+                max_messages=None,
+                chunk_guilds_at_startup=False,
+                member_cache_flags=discord.MemberCacheFlags.none()
+            )
+        else:
+            intents = discord.Intents.default()
+            intents.guilds = True
         intents.message_content = True  # Это привилегированный интент!
         
         # Сообщение с инструкцией по включению интентов
@@ -50,8 +113,39 @@ class BotManager:
 """
         
         # Создание экземпляров
-        self.bot = commands.Bot(command_prefix=self.config.prefix, intents=intents, help_command=None)
+        if self.config.sharded:
+            self.bot = commands.AutoShardedBot(
+                command_prefix=self.config.prefix,
+                intents=intents,
+                help_command=None,
+                shard_count=self.config.shard_count,
+                shard_ids=self.config.shard_ids,
+                **options
+            )
+        else:
+            self.bot = commands.Bot(command_prefix=self.config.prefix, intents=intents, help_command=None, **options)
         self.loop = asyncio.get_event_loop()
+        self.dispatcher = OutboundDispatcher(self.logger)
+        self.scheduler = ReminderScheduler(self.db, self.send_reminder, self.logger)
+        if self.task_handler is not None:
+            self.task_handler.on_reminder = self.scheduler.schedule
+
+    async def send_reminder(self, reminder: Reminder, description: str) -> None:
+        """Отправка напоминания в канал, где оно было установлено (без канала - в ЛС).
+
+        Ошибка доставки оставляет напоминание в базе для повтора; если канал
+        удален или недоступен, напоминание отбрасывается.
+        """
+        try:
+            if reminder.channel_id is not None:
+                channel = self.bot.get_partial_messageable(reminder.channel_id)
+            else:
+                channel = self.bot.get_user(reminder.user_id) or await self.bot.fetch_user(reminder.user_id)
+            await self.dispatcher.send(
+                channel, f"⏰ <@{reminder.user_id}>, напоминание о задаче #{reminder.task_id}: {description}"
+            )
+        except (discord.Forbidden, discord.NotFound) as e:
+            self.logger.warning(f"Dropping reminder for task {reminder.task_id}: channel {reminder.channel_id} unavailable ({e})")
 
     async def setup_signal_handlers(self) -> None:
         """Настройка обработчиков сигналов."""
@@ -68,72 +162,192 @@ class BotManager:
             """Обработка успешного запуска бота."""
             self.logger.info(f"Bot connected as {self.bot.user}")
             self.logger.info(f"Connected to {len(self.bot.guilds)} guilds")
+            self.logger.info(f"Memory: {format_memory_report(memory_report(self.bot))}")
+            if self.config.sharded:
+                self.logger.info(f"Running shards {sorted(self.bot.shards)} of {self.bot.shard_count}")
+            # on_ready повторяется после переподключений; планировщик запускается один раз
+            self.scheduler.start()
             await self.bot.change_presence(
                 activity=discord.Game(name=f"Type {self.config.prefix}help")
             )
 
+        @self.bot.event
+        async def on_shard_ready(shard_id):
+            """Готовность отдельного шарда (только для AutoShardedBot)."""
+            self.logger.info(f"Shard {shard_id} ready")
+
+        @self.bot.before_invoke
+        async def start_command_timer(ctx):
+            """Засекаем время начала обработки команды."""
+            ctx.started_at = time.perf_counter()
+
+        @self.bot.after_invoke
+        async def observe_command_latency(ctx):
+            """Учет времени обработки команды в метриках."""
+            started_at = getattr(ctx, 'started_at', None)
+            if started_at is not None and ctx.command is not None:
+                COMMAND_LATENCY.observe(time.perf_counter() - started_at, ctx.command.qualified_name)
+
         @self.bot.event
         async def on_command_error(ctx, error):
             """Обработка ошибок команд."""
-            if isinstance(error, commands.CommandOnCooldown):
-                await ctx.send(f"⏱️ Подождите! Попробуйте снова через {error.retry_after:.1f} секунд.")
-                self.logger.warning(f"User {ctx.author.id} hit cooldown for {ctx.command}")
+            command = ctx.command.qualified_name if ctx.command else 'unknown'
+            if isinstance(error, RateLimited):
+                self.dispatcher.send(ctx.channel, f"⏱️ Подождите! Попробуйте снова через {error.retry_after:.1f} секунд.")
+                self.logger.warning(f"User {ctx.author.id} hit rate limit for {ctx.command}")
             else:
-                await ctx.send("❌ Произошла ошибка при обработке команды.")
+                COMMAND_ERRORS.inc(command, type(error).__name__)
+                self.dispatcher.send(ctx.channel, "❌ Произошла ошибка при обработке команды.")
                 self.logger.error(f"Command error: {error}")
 
     async def setup_commands(self) -> None:
         """Настройка команд бота."""
-        from ..config.settings import CommandConstants
-        
+        @self.bot.check
+        async def rate_limit(ctx):
+            """Общий для всех команд лимит частоты на пользователя."""
+            retry_after = self.rate_limiter.check(ctx.author.id, ctx.command.qualified_name)
+            if retry_after:
+                raise RateLimited(retry_after)
+            return True
+
         @self.bot.command()
-        @commands.cooldown(CommandConstants.COOLDOWN_RATE, CommandConstants.COOLDOWN_SECONDS, commands.BucketType.user)
         async def add(ctx, *, task_desc):
-            """Добавление новой задачи."""
-            command_ctx = CommandContext(ctx.author.id, ctx.channel, ctx.send, self.logger)
+            """Добавление новой задачи или нескольких задач построчно."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
             await self.task_handler.add_task(command_ctx, task_desc)
 
         @self.bot.command()
-        @commands.cooldown(CommandConstants.COOLDOWN_RATE, CommandConstants.COOLDOWN_SECONDS, commands.BucketType.user)
-        async def list(ctx, page: int = 1):
-            """Вывод списка задач с пагинацией."""
-            command_ctx = CommandContext(ctx.author.id, ctx.channel, ctx.send, self.logger)
-            await self.task_handler.list_tasks(command_ctx, page)
+        async def list(ctx, *options: str):
+            """Вывод списка задач с пагинацией, с --archived - задач из архива."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            archived = '--archived' in options
+            pages = [option for option in options if option != '--archived']
+            try:
+                page = int(pages[0]) if pages else 1
+            except ValueError:
+                await command_ctx.send("❌ Номер страницы должен быть числом.")
+                return
+            if archived:
+                await self.task_handler.list_archived_tasks(command_ctx, page)
+            else:
+                await self.task_handler.list_tasks(command_ctx, page)
+
+        @self.bot.command()
+        async def search(ctx, *, query: str = ""):
+            """Поиск задач по словам описания."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.task_handler.search_tasks(command_ctx, query)
+
+        @self.bot.command()
+        async def due(ctx, task_id: str = "", *, when: str = ""):
+            """Срок задачи с напоминанием или список ближайших сроков."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            if task_id:
+                await self.task_handler.set_due_date(command_ctx, task_id, when)
+            else:
+                await self.task_handler.list_due_tasks(command_ctx)
+
+        @self.bot.command()
+        async def remind(ctx, task_id: str = "", *, when: str = ""):
+            """Напоминание о задаче."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.task_handler.set_reminder(command_ctx, task_id, when)
+
+        @self.bot.command()
+        async def export(ctx, fmt: str = 'csv'):
+            """Выгрузка всех задач файлом (csv или json)."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.export_handler.export_tasks(command_ctx, fmt)
+
+        @self.bot.command(name='import')
+        async def import_(ctx):
+            """Импорт задач из прикрепленного файла."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            attachment = ctx.message.attachments[0] if ctx.message.attachments else None
+            await self.import_handler.import_attachment(command_ctx, attachment)
 
         @self.bot.command()
-        @commands.cooldown(CommandConstants.COOLDOWN_RATE, CommandConstants.COOLDOWN_SECONDS, commands.BucketType.user)
-        async def done(ctx, task_id: str):
-            """Отметить задачу как выполненную."""
-            command_ctx = CommandContext(ctx.author.id, ctx.channel, ctx.send, self.logger)
-            await self.task_handler.mark_task_status(command_ctx, task_id, True)
+        async def done(ctx, *task_ids: str):
+            """Отметить задачи как выполненные."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.task_handler.mark_tasks_status(command_ctx, task_ids, True)
 
         @self.bot.command()
-        @commands.cooldown(CommandConstants.COOLDOWN_RATE, CommandConstants.COOLDOWN_SECONDS, commands.BucketType.user)
-        async def undone(ctx, task_id: str):
-            """Отметить задачу как не выполненную."""
-            command_ctx = CommandContext(ctx.author.id, ctx.channel, ctx.send, self.logger)
-            await self.task_handler.mark_task_status(command_ctx, task_id, False)
+        async def undone(ctx, *task_ids: str):
+            """Отметить задачи как не выполненные."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.task_handler.mark_tasks_status(command_ctx, task_ids, False)
 
         @self.bot.command()
-        @commands.cooldown(CommandConstants.COOLDOWN_RATE, CommandConstants.COOLDOWN_SECONDS, commands.BucketType.user)
-        async def delete(ctx, task_id: str):
-            """Удаление задачи."""
-            command_ctx = CommandContext(ctx.author.id, ctx.channel, ctx.send, self.logger)
-            await self.task_handler.delete_task(command_ctx, task_id)
+        async def delete(ctx, *task_ids: str):
+            """Удаление задач."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.task_handler.delete_tasks(command_ctx, task_ids)
+
+        @self.bot.command()
+        async def stats(ctx, scope: str = ""):
+            """Статистика задач; !stats --all - по всем пользователям (только для владельца бота)."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            if scope != '--all':
+                await self.stats_handler.show_user_stats(command_ctx)
+            elif await self.bot.is_owner(ctx.author):
+                await self.stats_handler.show_global_stats(command_ctx)
+            else:
+                await command_ctx.send("❌ Статистика по всем пользователям доступна только владельцу бота.")
+
+        @self.bot.command()
+        async def board(ctx, *, args: str = ""):
+            """Общая доска задач канала; с --server - доска всего сервера."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            if ctx.guild is None:
+                await command_ctx.send("❌ Общие доски доступны только на серверах.")
+                return
+            scope, _, rest = args.strip().partition(' ')
+            if scope == '--server':
+                await self.board_handler.run(command_ctx, ctx.guild.id, rest, "сервера")
+            else:
+                await self.board_handler.run(command_ctx, ctx.channel.id, args, "канала")
 
         @self.bot.command()
-        @commands.cooldown(CommandConstants.COOLDOWN_RATE, CommandConstants.COOLDOWN_SECONDS, commands.BucketType.user)
         async def help(ctx):
             """Показать справку по командам."""
-            command_ctx = CommandContext(ctx.author.id, ctx.channel, ctx.send, self.logger)
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
             await self.help_handler.show_help(command_ctx)
 
+        @self.bot.command()
+        @commands.is_owner()
+        async def memory(ctx):
+            """Отчет о памяти процесса (только для владельца бота)."""
+            command_ctx = CommandContext(ctx.author.id, ctx.channel, self.dispatcher.sender(ctx.channel), self.logger)
+            await self.admin_handler.show_memory(command_ctx, memory_report(self.bot))
+
     async def cleanup(self) -> None:
         """Очистка ресурсов."""
+        if self.scheduler:
+            await self.scheduler.close()
+        
+        if self.workers:
+            # До остановки очереди исходящих: ответы на начатые команды еще приходят
+            await self.workers.close()
+        
+        if self.dispatcher:
+            await self.dispatcher.close()
+        
         if self.bot and not self.bot.is_closed():
             await self.bot.close()
             self.logger.info("Bot connection closed")
         
+        if CommandConstants.RATE_LIMIT_STATE_PATH:
+            try:
+                saved = await asyncio.to_thread(self.rate_limiter.save, CommandConstants.RATE_LIMIT_STATE_PATH)
+                self.logger.info(f"Saved {saved} rate limit buckets")
+            except OSError as e:
+                self.logger.error(f"Failed to save rate limit state: {e}")
+        
+        if self.metrics_server:
+            await self.metrics_server.stop()
+            self.metrics_server = None
+        
         if self.db:
             await self.db.close()
             self.logger.info("Database connection closed")
@@ -164,6 +378,21 @@ class BotManager:
             await self.setup_bot_events()
             await self.setup_commands()
             
+            if CommandConstants.RATE_LIMIT_STATE_PATH:
+                try:
+                    loaded = self.rate_limiter.load(CommandConstants.RATE_LIMIT_STATE_PATH)
+                    self.logger.info(f"Loaded {loaded} rate limit buckets")
+                except (OSError, ValueError) as e:
+                    self.logger.error(f"Failed to load rate limit state: {e}")
+            
+            if self.config.metrics_port is not None:
+                self.metrics_server = MetricsServer(METRICS, self.config.metrics_host, self.config.metrics_port)
+                await self.metrics_server.start()
+            
+            if self.workers:
+                await self.workers.start()
+                self.workers.launch()
+            
             self.logger.info("Bot starting...")
             try:
                 await self.bot.start(self.config.token)
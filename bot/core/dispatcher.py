@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import discord
+
+from ..config.settings import BotConstants
+from ..utils.metrics import OUTBOUND_COALESCED, OUTBOUND_LATENCY, OUTBOUND_MESSAGES
+
+class SlidingWindow:
+    """Ограничение "не больше rate отправок за per секунд"."""
+
+    def __init__(self, rate: int, per: float):
+        self.rate = rate
+        self.per = per
+        self._sent: Deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        while self._sent and self._sent[0] <= now - self.per:
+            self._sent.popleft()
+
+    def delay(self, now: float) -> float:
+        """Сколько ждать до следующей разрешенной отправки."""
+        self._expire(now)
+        if len(self._sent) < self.rate:
+            return 0.0
+        return self._sent[0] + self.per - now
+
+    def idle_in(self, now: float) -> float:
+        """Через сколько окно опустеет."""
+        self._expire(now)
+        return self._sent[-1] + self.per - now if self._sent else 0.0
+
+    def record(self, now: float) -> None:
+        self._sent.append(now)
+
+class _Outbound:
+    __slots__ = ('content', 'kwargs', 'future', 'queued_at')
+
+    def __init__(self, content: Optional[str], kwargs: Dict[str, Any], future: asyncio.Future):
+        self.content = content
+        self.kwargs = kwargs
+        self.future = future
+        self.queued_at = time.perf_counter()
+
+    @property
+    def plain(self) -> bool:
+        """Только текст - такое сообщение можно склеить с соседними."""
+        return self.content is not None and not self.kwargs
+
+class _ChannelQueue:
+    __slots__ = ('channel', 'pending', 'window', 'wakeup', 'worker')
+
+    def __init__(self, channel: Any, window: SlidingWindow):
+        self.channel = channel
+        self.pending: Deque[_Outbound] = deque()
+        self.window = window
+        self.wakeup = asyncio.Event()
+        self.worker: Optional[asyncio.Task] = None
+
+def _rewind_files(kwargs: Dict[str, Any]) -> bool:
+    """Возврат вложений к началу перед повторной отправкой.
+
+    Первая попытка уже прочитала файлы; без перемотки повтор загрузил бы
+    пустые вложения. False - файл перемотать нельзя (закрыт или без seek).
+    """
+    files = list(kwargs.get('files') or ())
+    if kwargs.get('file') is not None:
+        files.append(kwargs['file'])
+    try:
+        for file in files:
+            file.reset()
+    except (OSError, ValueError):
+        return False
+    return True
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Ошибка доставки уже залогирована; обработчик может и не ждать результата
+    if not future.cancelled():
+        future.exception()
+
+class OutboundDispatcher:
+    """Очередь исходящих сообщений с отдельным воркером на канал.
+
+    send() ставит сообщение в очередь канала и сразу возвращает Future с
+    отправленным discord.Message, так что обработчик команды не ждет HTTP.
+    Воркер канала соблюдает лимиты канала и общий лимит бота, склеивает
+    подряд идущие текстовые сообщения в одно (в пределах MESSAGE_MAX_LENGTH)
+    и повторяет отправку при 429 и 5xx. Неудачи логируются и учитываются в
+    discord_bot_outbound_messages_total.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        channel_rate: int = BotConstants.OUTBOUND_CHANNEL_RATE,
+        channel_per: float = BotConstants.OUTBOUND_CHANNEL_PER,
+        global_rate: int = BotConstants.OUTBOUND_GLOBAL_RATE,
+        global_per: float = BotConstants.OUTBOUND_GLOBAL_PER,
+        max_pending: int = BotConstants.OUTBOUND_MAX_PENDING,
+        max_retries: int = BotConstants.OUTBOUND_MAX_RETRIES,
+        coalesce: bool = BotConstants.OUTBOUND_COALESCE,
+        max_length: int = BotConstants.MESSAGE_MAX_LENGTH,
+    ):
+        self.logger = logger
+        self.channel_rate = channel_rate
+        self.channel_per = channel_per
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.coalesce = coalesce
+        self.max_length = max_length
+        self._global = SlidingWindow(global_rate, global_per)
+        self._channels: Dict[int, _ChannelQueue] = {}
+        self._closed = False
+
+    def sender(self, channel: Any) -> Callable[..., Any]:
+        """Функция отправки в канал для CommandContext.send."""
+        async def send(content: Optional[str] = None, **kwargs: Any) -> asyncio.Future:
+            return self.send(channel, content, **kwargs)
+        return send
+
+    def send(self, channel: Any, content: Optional[str] = None, **kwargs: Any) -> asyncio.Future:
+        """Постановка сообщения в очередь канала."""
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        if self._closed:
+            future.set_exception(RuntimeError("Outbound dispatcher is closed"))
+            return future
+
+        key = getattr(channel, 'id', id(channel))
+        state = self._channels.get(key)
+        if state is None:
+            state = self._channels[key] = _ChannelQueue(channel, SlidingWindow(self.channel_rate, self.channel_per))
+        if len(state.pending) >= self.max_pending:
+            OUTBOUND_MESSAGES.inc('dropped')
+            self.logger.warning(f"Outbound queue for channel {key} is full, message dropped")
+            future.set_exception(RuntimeError("Outbound queue is full"))
+            return future
+
+        state.pending.append(_Outbound(content, kwargs, future))
+        state.wakeup.set()
+        if state.worker is None:
+            state.worker = asyncio.create_task(self._run(key, state))
+        return future
+
+    def pending(self) -> int:
+        """Число сообщений, ожидающих отправки."""
+        return sum(len(state.pending) for state in self._channels.values())
+
+    def _take_batch(self, pending: Deque[_Outbound]) -> List[_Outbound]:
+        batch = [pending.popleft()]
+        if not self.coalesce or not batch[0].plain:
+            return batch
+        length = len(batch[0].content)
+        while pending and pending[0].plain and length + 1 + len(pending[0].content) <= self.max_length:
+            length += 1 + len(pending[0].content)
+            batch.append(pending.popleft())
+        return batch
+
+    async def _run(self, key: int, state: _ChannelQueue) -> None:
+        try:
+            while True:
+                now = time.monotonic()
+                if not state.pending:
+                    # Состояние канала хранится, пока его окно лимита не опустеет
+                    idle_in = state.window.idle_in(now)
+                    if self._closed or idle_in <= 0:
+                        break
+                    state.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(state.wakeup.wait(), timeout=idle_in)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                delay = max(state.window.delay(now), self._global.delay(now))
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                state.window.record(now)
+                self._global.record(now)
+                await self._deliver(key, state.channel, self._take_batch(state.pending))
+        finally:
+            if self._channels.get(key) is state:
+                del self._channels[key]
+            for item in state.pending:
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError("Outbound dispatcher is closed"))
+
+    async def _deliver(self, key: int, channel: Any, batch: List[_Outbound]) -> None:
+        if len(batch) > 1:
+            OUTBOUND_COALESCED.inc(amount=len(batch) - 1)
+            content: Optional[str] = '\n'.join(item.content for item in batch)
+        else:
+            content = batch[0].content
+        kwargs = batch[0].kwargs
+
+        attempt = 0
+        while True:
+            try:
+                message = await channel.send(content, **kwargs)
+                break
+            except discord.HTTPException as e:
+                if (attempt < self.max_retries and (e.status == 429 or e.status >= 500)
+                        and _rewind_files(kwargs)):
+                    attempt += 1
+                    await asyncio.sleep(getattr(e, 'retry_after', None) or self.channel_per * attempt)
+                    continue
+                error: Exception = e
+            except Exception as e:
+                error = e
+            OUTBOUND_MESSAGES.inc('failed', amount=len(batch))
+            self.logger.error(f"Failed to deliver message to channel {key}: {error}")
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(error)
+            return
+
+        OUTBOUND_MESSAGES.inc('sent', amount=len(batch))
+        delivered = time.perf_counter()
+        for item in batch:
+            OUTBOUND_LATENCY.observe(delivered - item.queued_at)
+            if not item.future.done():
+                item.future.set_result(message)
+
+    async def close(self, timeout: float = BotConstants.OUTBOUND_CLOSE_TIMEOUT) -> None:
+        """Отправка оставшихся сообщений и остановка воркеров."""
+        self._closed = True
+        workers = [state.worker for state in self._channels.values() if state.worker is not None]
+        for state in self._channels.values():
+            state.wakeup.set()
+        if not workers:
+            return
+        done, still_running = await asyncio.wait(workers, timeout=timeout)
+        for worker in still_running:
+            worker.cancel()
+        if still_running:
+            self.logger.warning(f"{self.pending()} outbound messages were not delivered before shutdown")
+            await asyncio.gather(*still_running, return_exceptions=True)
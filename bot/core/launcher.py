@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+from ..config.settings import BotConstants
+
+def cluster_shard_ids(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Разбиение шардов 0..shard_count-1 на cluster_count непрерывных диапазонов."""
+    if cluster_count < 1 or shard_count < cluster_count:
+        raise ValueError("shard count must be at least the cluster count")
+    size, extra = divmod(shard_count, cluster_count)
+    ranges = []
+    start = 0
+    for cluster_id in range(cluster_count):
+        end = start + size + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+class ClusterLauncher:
+    """Запуск кластеров шардов в отдельных процессах.
+
+    Каждый кластер - это `python -m bot.main` с переменными окружения
+    SHARD_COUNT, SHARD_IDS и CLUSTER_ID. Кластер, завершившийся с ненулевым
+    кодом, перезапускается с экспоненциально растущей паузой; пауза
+    сбрасывается, если кластер проработал CLUSTER_STABLE_AFTER секунд.
+    """
+
+    def __init__(
+        self,
+        shard_count: int,
+        cluster_count: int,
+        logger: logging.Logger,
+        restart_delay: float = BotConstants.CLUSTER_RESTART_DELAY,
+        max_restart_delay: float = BotConstants.CLUSTER_MAX_RESTART_DELAY,
+        stable_after: float = BotConstants.CLUSTER_STABLE_AFTER,
+        stop_timeout: float = BotConstants.CLUSTER_STOP_TIMEOUT,
+        command: Optional[List[str]] = None,
+    ):
+        self.shard_count = shard_count
+        self.clusters = cluster_shard_ids(shard_count, cluster_count)
+        self.logger = logger
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self.command = command or [sys.executable, '-m', 'bot.main']
+        self.processes: Dict[int, asyncio.subprocess.Process] = {}
+        self.restarts: Dict[int, int] = {cluster_id: 0 for cluster_id in range(cluster_count)}
+        self._stopping = asyncio.Event()
+
+    def environment(self, cluster_id: int) -> Dict[str, str]:
+        """Окружение процесса кластера."""
+        env = dict(os.environ)
+        env['SHARD_COUNT'] = str(self.shard_count)
+        env['SHARD_IDS'] = ','.join(str(shard_id) for shard_id in self.clusters[cluster_id])
+        env['CLUSTER_ID'] = str(cluster_id)
+        return env
+
+    async def _supervise(self, cluster_id: int) -> None:
+        delay = self.restart_delay
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(*self.command, env=self.environment(cluster_id))
+            self.processes[cluster_id] = process
+            if self._stopping.is_set():
+                process.terminate()
+            self.logger.info(
+                f"Cluster {cluster_id} started (pid {process.pid}, shards {self.clusters[cluster_id]})"
+            )
+            returncode = await process.wait()
+            del self.processes[cluster_id]
+            if self._stopping.is_set():
+                break
+            if returncode == 0:
+                self.logger.info(f"Cluster {cluster_id} exited normally")
+                break
+
+            if time.monotonic() - started >= self.stable_after:
+                delay = self.restart_delay
+            self.restarts[cluster_id] += 1
+            self.logger.error(
+                f"Cluster {cluster_id} exited with code {returncode}, restarting in {delay:.0f}s"
+            )
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def stop(self) -> None:
+        """Остановка всех кластеров: SIGTERM, а по истечении stop_timeout - kill."""
+        self._stopping.set()
+        processes = list(self.processes.values())
+        for process in processes:
+            if process.returncode is None:
+                process.terminate()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(process.wait() for process in processes)), timeout=self.stop_timeout
+            )
+        except asyncio.TimeoutError:
+            for process in processes:
+                if process.returncode is None:
+                    self.logger.warning(f"Killing cluster process {process.pid}")
+                    process.kill()
+
+    async def run(self) -> int:
+        """Запуск и наблюдение за кластерами до остановки по сигналу."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.create_task(self.stop()))
+
+        self.logger.info(f"Launching {len(self.clusters)} clusters for {self.shard_count} shards")
+        await asyncio.gather(*(self._supervise(cluster_id) for cluster_id in range(len(self.clusters))))
+        return 0
@@ -1,24 +1,125 @@
+import atexit
+import json
 import logging
-from ..config.settings import BotConfig
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from ..config.settings import BotConfig, BotConstants
+from ..utils.metrics import LOG_RECORDS_DROPPED
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записей лога в одну JSON-строку."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler с ограниченной очередью.
+
+    При переполнении запись либо отбрасывается (block=False) с учетом в
+    dropped и метрике discord_bot_log_records_dropped_total, либо вызывающий
+    поток ждет освобождения места (block=True).
+    """
+
+    def __init__(self, records: queue.Queue, block: bool = False):
+        super().__init__(records)
+        self.block = block
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
 
 class LoggingManager:
-    """Менеджер логирования."""
+    """Менеджер логирования.
+
+    Обработчики вызываются из потока QueueListener, поэтому запись на диск
+    и в консоль не блокирует цикл событий.
+    """
+
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _handler: Optional[BoundedQueueHandler] = None
+
+    @staticmethod
+    def _create_handlers(config: BotConfig) -> List[logging.Handler]:
+        if BotConstants.LOG_ROTATE_WHEN:
+            file_handler: logging.Handler = logging.handlers.TimedRotatingFileHandler(
+                config.log_file,
+                when=BotConstants.LOG_ROTATE_WHEN,
+                backupCount=BotConstants.LOG_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                config.log_file,
+                maxBytes=BotConstants.LOG_MAX_BYTES,
+                backupCount=BotConstants.LOG_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+        if config.log_json:
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(config.log_format, datefmt="%Y-%m-%d %H:%M:%S")
+        handlers = [logging.StreamHandler(), file_handler]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        return handlers
 
     @staticmethod
     def setup(config: BotConfig) -> logging.Logger:
         """Настройка логирования."""
-        logging.basicConfig(
-            level=config.log_level,
-            format=config.log_format,
-            datefmt="%Y-%m-%d %H:%M:%S",
-            handlers=[
-                logging.StreamHandler(),
-                logging.FileHandler(config.log_file),
-            ]
+        LoggingManager.shutdown()
+
+        records: queue.Queue = queue.Queue(BotConstants.LOG_QUEUE_SIZE)
+        handler = BoundedQueueHandler(records, block=BotConstants.LOG_QUEUE_POLICY == 'block')
+        listener = logging.handlers.QueueListener(
+            records, *LoggingManager._create_handlers(config), respect_handler_level=True
         )
+
+        root = logging.getLogger()
+        root.setLevel(config.log_level)
+        root.addHandler(handler)
+        listener.start()
+        LoggingManager._handler = handler
+        LoggingManager._listener = listener
         
         # Отключение шумных логгеров
         logging.getLogger('discord').setLevel(logging.WARNING)
         logging.getLogger('discord.http').setLevel(logging.WARNING)
         
-        return logging.getLogger('discord_bot') 
\ No newline at end of file
+        return logging.getLogger('discord_bot')
+
+    @staticmethod
+    def dropped() -> int:
+        """Число записей, отброшенных из-за переполнения очереди."""
+        return LoggingManager._handler.dropped if LoggingManager._handler else 0
+
+    @staticmethod
+    def shutdown() -> None:
+        """Запись оставшихся в очереди сообщений и остановка фонового потока."""
+        handler, listener = LoggingManager._handler, LoggingManager._listener
+        LoggingManager._handler = LoggingManager._listener = None
+        if handler is not None:
+            logging.getLogger().removeHandler(handler)
+        if listener is not None:
+            listener.stop()
+            for target in listener.handlers:
+                target.close()
+
+atexit.register(LoggingManager.shutdown)
\ No newline at end of file
@@ -0,0 +1,191 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+from ..config.settings import BotConstants
+from ..database.base import DatabaseManager
+from ..database.models import Reminder
+from ..utils.metrics import REMINDER_DELAY, REMINDERS
+
+# Отправка напоминания: получает напоминание и описание задачи
+ReminderSender = Callable[[Reminder, str], Awaitable[None]]
+
+# Не больше стольких напоминаний захватывается за один проход
+FIRE_BATCH = 100
+
+class ReminderScheduler:
+    """Единый планировщик напоминаний о задачах.
+
+    Вместо задачи asyncio на каждое напоминание одна корутина держит в куче
+    только напоминания ближайших window секунд (не больше max_pending).
+    Окно перечитывается из базы по индексу remind_at, когда время доходит
+    до его границы, и не реже, чем раз в refill_interval секунд (так видны
+    напоминания, созданные другими процессами). Более далекие напоминания
+    живут только в базе, поэтому после перезапуска ничего не теряется:
+    пропущенные за время простоя отправляются при первом чтении окна.
+
+    Перед отправкой напоминание захватывается в базе сравнением remind_at
+    (время переносится на lease секунд вперед), после доставки снимается.
+    Устаревшая запись в куче или другой процесс кластера не могут отправить
+    его второй раз; если процесс упал между захватом и подтверждением, или
+    доставка не удалась, напоминание повторится по истечении lease.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        send: ReminderSender,
+        logger: logging.Logger,
+        window: float = BotConstants.REMINDER_WINDOW,
+        max_pending: int = BotConstants.REMINDER_MAX_PENDING,
+        refill_interval: float = BotConstants.REMINDER_REFILL_INTERVAL,
+        lease: int = BotConstants.REMINDER_LEASE,
+        clock: Callable[[], float] = time.time,
+    ):
+        if window <= 0 or refill_interval <= 0:
+            raise ValueError("window and refill_interval must be positive")
+        if max_pending < 1 or lease < 1:
+            raise ValueError("max_pending and lease must be positive")
+        self.db = db
+        self.send = send
+        self.logger = logger
+        self.window = window
+        self.max_pending = max_pending
+        self.refill_interval = refill_interval
+        self.lease = lease
+        self.clock = clock
+        # (время, порядковый номер, напоминание): номер избавляет от сравнения напоминаний
+        self._heap: List[Tuple[int, int, Reminder]] = []
+        self._queued: Set[Reminder] = set()
+        self._counter = itertools.count()
+        # В куче все известные напоминания раньше этой границы
+        self._horizon = 0.0
+        self._refill_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._deliveries: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def start(self) -> None:
+        """Запуск корутины планировщика."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def schedule(self, reminder: Reminder) -> None:
+        """Учет напоминания, только что сохраненного в базе."""
+        if reminder.remind_at >= self._horizon or reminder in self._queued:
+            # Дальше окна: попадет в кучу при чтении из базы
+            return
+        if len(self._heap) >= self.max_pending:
+            # Куча полна: сужаем окно, напоминание будет прочитано из базы
+            self._horizon = reminder.remind_at
+            self._refill_at = min(self._refill_at, reminder.remind_at)
+        else:
+            self._push(reminder)
+        self._wakeup.set()
+
+    def _push(self, reminder: Reminder) -> None:
+        self._queued.add(reminder)
+        heapq.heappush(self._heap, (reminder.remind_at, next(self._counter), reminder))
+
+    async def _refill(self, now: float) -> None:
+        """Перечитывание окна ближайших напоминаний из базы."""
+        horizon = now + self.window
+        reminders = await self.db.due_reminders(int(horizon), self.max_pending)
+        if len(reminders) >= self.max_pending:
+            # Окно не поместилось: граница - последнее прочитанное напоминание
+            horizon = reminders[-1].remind_at
+        # Добавленные через schedule() во время чтения остаются в куче
+        keep = [reminder for reminder in self._queued if reminder.remind_at < horizon]
+        self._heap = []
+        self._queued = set()
+        for reminder in sorted(set(reminders).union(keep), key=lambda r: (r.remind_at, r.task_id)):
+            self._push(reminder)
+        self._horizon = horizon
+        self._refill_at = min(now + self.refill_interval, horizon)
+
+    async def _run(self) -> None:
+        """Основной цикл: чтение окна, отправка наступивших, ожидание следующего."""
+        while True:
+            now = self.clock()
+            if now >= self._refill_at:
+                try:
+                    await self._refill(now)
+                except Exception as e:
+                    self.logger.error(f"Failed to load reminders: {e}")
+                    self._refill_at = now + self.refill_interval
+
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < FIRE_BATCH:
+                reminder = heapq.heappop(self._heap)[2]
+                self._queued.discard(reminder)
+                due.append(reminder)
+            if due:
+                # Захваты идут параллельно и при групповом коммите попадают в одну транзакцию
+                await asyncio.gather(*(self._fire(reminder) for reminder in due))
+                continue
+
+            next_at = self._refill_at
+            if self._heap:
+                next_at = min(next_at, self._heap[0][0])
+            self._wakeup.clear()
+            delay = next_at - self.clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _fire(self, reminder: Reminder) -> None:
+        """Захват напоминания и запуск его доставки."""
+        lease_until = int(self.clock()) + self.lease
+        try:
+            claimed = await self.db.claim_reminder(reminder, lease_until)
+        except Exception as e:
+            # Напоминание осталось в базе и будет прочитано снова
+            self.logger.error(f"Failed to claim reminder for task {reminder.task_id}: {e}")
+            return
+        if claimed is None:
+            # Напоминание изменено, отменено или уже отправлено другим процессом
+            return
+        description, status = claimed
+        delivery = asyncio.create_task(self._deliver(reminder, lease_until, description, status))
+        self._deliveries.add(delivery)
+        delivery.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, reminder: Reminder, lease_until: int, description: str, status: bool) -> None:
+        """Отправка захваченного напоминания и его снятие."""
+        if status:
+            # Задача уже выполнена - напоминать не о чем
+            REMINDERS.inc('skipped')
+        else:
+            try:
+                await self.send(reminder, description)
+            except Exception as e:
+                REMINDERS.inc('failed')
+                self.logger.warning(f"Reminder for task {reminder.task_id} not delivered, retry in {self.lease}s: {e}")
+                return
+            REMINDERS.inc('sent')
+            REMINDER_DELAY.observe(max(0.0, self.clock() - reminder.remind_at))
+        try:
+            await self.db.complete_reminder(reminder, lease_until)
+        except Exception as e:
+            self.logger.error(f"Failed to complete reminder for task {reminder.task_id}: {e}")
+
+    async def close(self, timeout: float = BotConstants.OUTBOUND_CLOSE_TIMEOUT) -> None:
+        """Остановка планировщика с ожиданием начатых доставок."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._deliveries:
+            # Недоставленные повторятся после перезапуска по истечении lease
+            done, pending = await asyncio.wait(self._deliveries, timeout=timeout)
+            for delivery in pending:
+                delivery.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,395 @@
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set
+
+import discord
+
+from ..commands.base import BaseCommandHandler, CommandContext
+from ..config.settings import BotConstants
+from ..database.models import Reminder
+from ..database.sharded import shard_for_user
+from ..utils.metrics import WORKER_JOBS
+
+class WorkerError(Exception):
+    """Задание не выполнено процессом-обработчиком."""
+
+class WorkerPoolBusy(WorkerError):
+    """Очередь заданий процесса-обработчика заполнена."""
+
+def _encode(frame: Dict[str, Any]) -> bytes:
+    """Кадр протокола: одна строка JSON."""
+    return json.dumps(frame, ensure_ascii=False, separators=(',', ':')).encode() + b'\n'
+
+class _Job:
+    __slots__ = ('frame', 'ctx', 'future')
+
+    def __init__(self, frame: Dict[str, Any], ctx: CommandContext, future: asyncio.Future):
+        self.frame = frame
+        self.ctx = ctx
+        self.future = future
+
+class _WorkerSlot:
+    __slots__ = ('index', 'pending', 'in_flight', 'writer')
+
+    def __init__(self, index: int):
+        self.index = index
+        self.pending: Deque[_Job] = deque()
+        self.in_flight: Dict[int, _Job] = {}
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+class RemoteCommandHandler:
+    """Заместитель обработчика команд в процессе шлюза.
+
+    Вызов публичного метода (ctx, *args) становится заданием пула и
+    завершается, когда процесс-обработчик выполнил одноименный метод своего
+    обработчика; ответы приходят в ctx.send. Аргументы передаются как JSON.
+    """
+
+    def __init__(self, pool: 'WorkerPool', name: str):
+        self.pool = pool
+        self.name = name
+        self.on_reminder: Optional[Callable[[Reminder], None]] = None
+
+    def __getattr__(self, method: str) -> Callable[..., Any]:
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        async def call(ctx: CommandContext, *args: Any) -> None:
+            try:
+                future = self.pool.submit(self.name, method, ctx, args)
+            except WorkerPoolBusy:
+                await ctx.send("⏳ Сейчас слишком много команд, попробуйте через несколько секунд.")
+                return
+            await future
+        return call
+
+class WorkerPool:
+    """Пул процессов-обработчиков команд (запуск с --workers).
+
+    Процесс шлюза держит соединение с Discord и только разбирает команды:
+    вызов метода RemoteCommandHandler уходит заданием по Unix-сокету одному
+    из процессов `python -m bot.main --worker-id N`. Процесс выбирается по
+    хэшу ID пользователя, как шард хранилища, и выполняет задания одного
+    пользователя строго по очереди, поэтому команды пользователя
+    применяются в порядке получения. Ответы возвращаются тем же
+    соединением и отправляются через ctx.send шлюза.
+
+    Обратное давление: процессу отправляется не больше max_in_flight
+    незавершенных заданий, остальные ждут в очереди шлюза, а при
+    max_pending ожидающих новое задание отклоняется WorkerPoolBusy.
+    Задания, уже отправленные завершившемуся процессу, не повторяются
+    (команда могла успеть выполниться) и завершаются WorkerError; ожидающие
+    уходят перезапущенному процессу.
+    """
+
+    def __init__(
+        self,
+        worker_count: int,
+        socket_path: str,
+        logger: logging.Logger,
+        max_in_flight: int = BotConstants.WORKER_MAX_IN_FLIGHT,
+        max_pending: int = BotConstants.WORKER_MAX_PENDING,
+        frame_limit: int = BotConstants.WORKER_FRAME_LIMIT,
+        restart_delay: float = BotConstants.WORKER_RESTART_DELAY,
+        max_restart_delay: float = BotConstants.WORKER_MAX_RESTART_DELAY,
+        stable_after: float = BotConstants.WORKER_STABLE_AFTER,
+        stop_timeout: float = BotConstants.WORKER_STOP_TIMEOUT,
+        command: Optional[List[str]] = None,
+    ):
+        if worker_count < 1:
+            raise ValueError("worker_count must be positive")
+        if max_in_flight < 1 or max_pending < 1:
+            raise ValueError("max_in_flight and max_pending must be positive")
+        self.socket_path = socket_path
+        self.logger = logger
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.frame_limit = frame_limit
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self.command = command or [sys.executable, '-m', 'bot.main']
+        self.restarts = [0] * worker_count
+        self._workers = [_WorkerSlot(index) for index in range(worker_count)]
+        self._handlers: Dict[str, RemoteCommandHandler] = {}
+        self._job_ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._processes: Dict[int, asyncio.subprocess.Process] = {}
+        self._supervisors: List[asyncio.Task] = []
+        self._connections: Set[asyncio.Task] = set()
+        self._closed = False
+
+    def handler(self, name: str) -> RemoteCommandHandler:
+        """Заместитель обработчика name, выполняющий его методы в процессах пула."""
+        handler = self._handlers.get(name)
+        if handler is None:
+            handler = self._handlers[name] = RemoteCommandHandler(self, name)
+        return handler
+
+    def worker_for(self, user_id: int) -> int:
+        """Номер процесса, выполняющего команды пользователя."""
+        return shard_for_user(user_id, len(self._workers))
+
+    def pending(self) -> int:
+        """Число заданий, ожидающих отправки или выполнения."""
+        return sum(len(slot.pending) + len(slot.in_flight) for slot in self._workers)
+
+    def submit(self, handler: str, method: str, ctx: CommandContext, args: Sequence[Any]) -> asyncio.Future:
+        """Постановка задания в очередь процесса пользователя.
+
+        Возвращает Future, который завершается, когда процесс выполнил
+        задание. Очередь заполнена - WorkerPoolBusy сразу.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self._closed:
+            future.set_exception(WorkerError("Worker pool is closed"))
+            return future
+
+        slot = self._workers[self.worker_for(ctx.user_id)]
+        if len(slot.pending) >= self.max_pending:
+            WORKER_JOBS.inc('rejected')
+            self.logger.warning(f"Worker {slot.index} queue is full, command of user {ctx.user_id} rejected")
+            raise WorkerPoolBusy(f"Worker {slot.index} queue is full")
+
+        frame = {
+            'job': next(self._job_ids), 'handler': handler, 'method': method,
+            'user': ctx.user_id, 'channel': ctx.channel.id, 'args': list(args),
+        }
+        slot.pending.append(_Job(frame, ctx, future))
+        self._pump(slot)
+        return future
+
+    def _pump(self, slot: _WorkerSlot) -> None:
+        # Буфер сокета ограничен max_in_flight кадрами, поэтому drain не нужен
+        while slot.writer is not None and slot.pending and len(slot.in_flight) < self.max_in_flight:
+            job = slot.pending.popleft()
+            slot.in_flight[job.frame['job']] = job
+            slot.writer.write(_encode(job.frame))
+
+    async def start(self) -> None:
+        """Открытие сокета, к которому подключаются процессы-обработчики."""
+        if os.path.exists(self.socket_path):
+            # Сокет остался от процесса, завершившегося без очистки
+            os.remove(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._accept, path=self.socket_path, limit=self.frame_limit)
+        self.logger.info(f"Worker pool listening on {self.socket_path}")
+
+    def launch(self) -> None:
+        """Запуск процессов-обработчиков под наблюдением."""
+        self._supervisors = [asyncio.create_task(self._supervise(index)) for index in range(len(self._workers))]
+
+    async def _supervise(self, index: int) -> None:
+        delay = self.restart_delay
+        while not self._closed:
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(*self.command, '--worker-id', str(index))
+            self._processes[index] = process
+            if self._closed:
+                process.kill()
+            self.logger.info(f"Worker {index} started (pid {process.pid})")
+            returncode = await process.wait()
+            del self._processes[index]
+            if self._closed:
+                break
+
+            if time.monotonic() - started >= self.stable_after:
+                delay = self.restart_delay
+            self.restarts[index] += 1
+            self.logger.error(f"Worker {index} exited with code {returncode}, restarting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(asyncio.current_task())
+        slot: Optional[_WorkerSlot] = None
+        try:
+            hello = json.loads(await reader.readline() or b'{}')
+            index = hello.get('worker')
+            if not isinstance(index, int) or not 0 <= index < len(self._workers):
+                self.logger.error(f"Rejected worker connection with invalid id {index!r}")
+                return
+            if self._workers[index].writer is not None:
+                self.logger.error(f"Rejected second connection of worker {index}")
+                return
+            slot = self._workers[index]
+            slot.writer = writer
+            self.logger.info(f"Worker {index} connected")
+            self._pump(slot)
+            while line := await reader.readline():
+                await self._receive(slot, json.loads(line))
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Worker connection failed: {e}")
+        finally:
+            self._connections.discard(asyncio.current_task())
+            if slot is not None:
+                slot.writer = None
+                self._fail(slot.in_flight, f"Worker {slot.index} disconnected")
+                if not self._closed:
+                    self.logger.error(f"Worker {slot.index} disconnected")
+            writer.close()
+
+    async def _receive(self, slot: _WorkerSlot, frame: Dict[str, Any]) -> None:
+        if 'reminder' in frame:
+            handler = self._handlers.get(frame['handler'])
+            if handler is not None and handler.on_reminder is not None:
+                handler.on_reminder(Reminder(*frame['reminder']))
+            return
+
+        job = slot.in_flight.get(frame['job'])
+        if job is None:
+            return
+        if 'send' in frame:
+            try:
+                await job.ctx.send(frame['send'])
+            except Exception as e:
+                self.logger.error(f"Failed to forward reply of job {frame['job']}: {e}")
+            return
+
+        del slot.in_flight[frame['job']]
+        if 'error' in frame:
+            WORKER_JOBS.inc('failed')
+            job.future.set_exception(WorkerError(frame['error']))
+        else:
+            WORKER_JOBS.inc('done')
+            job.future.set_result(None)
+        self._pump(slot)
+
+    def _fail(self, jobs: Dict[int, _Job], reason: str) -> None:
+        for job in jobs.values():
+            WORKER_JOBS.inc('failed')
+            if not job.future.done():
+                job.future.set_exception(WorkerError(reason))
+        jobs.clear()
+
+    async def close(self) -> None:
+        """Остановка пула.
+
+        Ожидающие задания отменяются, а соединения закрываются на запись:
+        процессы-обработчики дописывают ответы на начатые задания и
+        завершаются сами. Не успевшие за stop_timeout получают kill.
+        """
+        self._closed = True
+        if self._server is not None:
+            self._server.close()
+        for slot in self._workers:
+            while slot.pending:
+                job = slot.pending.popleft()
+                if not job.future.done():
+                    job.future.set_exception(WorkerError("Worker pool is closed"))
+            if slot.writer is not None and slot.writer.can_write_eof():
+                slot.writer.write_eof()
+
+        processes = list(self._processes.values())
+        waiters = [asyncio.ensure_future(process.wait()) for process in processes] + list(self._connections)
+        if waiters:
+            await asyncio.wait(waiters, timeout=self.stop_timeout)
+        for process in processes:
+            if process.returncode is None:
+                self.logger.warning(f"Killing worker process {process.pid}")
+                process.kill()
+
+        for task in self._supervisors + list(self._connections):
+            task.cancel()
+        await asyncio.gather(*waiters, *self._supervisors, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+class CommandWorker:
+    """Процесс-обработчик заданий WorkerPool.
+
+    Подключается к сокету шлюза и выполняет задания на своих обработчиках
+    (TaskCommandHandler и другие) с собственным соединением с хранилищем.
+    Задания разных пользователей выполняются параллельно, одного
+    пользователя - по очереди. Ответы обработчиков (только текст) и новые
+    напоминания отправляются шлюзу. Работа завершается, когда шлюз закрыл
+    соединение и начатые задания выполнены.
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        handlers: Dict[str, BaseCommandHandler],
+        logger: logging.Logger,
+        frame_limit: int = BotConstants.WORKER_FRAME_LIMIT,
+    ):
+        self.worker_id = worker_id
+        self.handlers = handlers
+        self.logger = logger
+        self.frame_limit = frame_limit
+        self._users: Dict[int, Deque[Dict[str, Any]]] = {}
+        self._running: Set[asyncio.Task] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        for name, handler in handlers.items():
+            if hasattr(handler, 'on_reminder'):
+                # Планировщик напоминаний живет в процессе шлюза
+                handler.on_reminder = functools.partial(self._forward_reminder, name)
+
+    def _send(self, frame: Dict[str, Any]) -> None:
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.write(_encode(frame))
+
+    def _forward_reminder(self, handler: str, reminder: Reminder) -> None:
+        self._send({'handler': handler, 'reminder': list(reminder)})
+
+    async def run(self, socket_path: str) -> None:
+        """Обработка заданий до закрытия соединения шлюзом."""
+        reader, self._writer = await asyncio.open_unix_connection(socket_path, limit=self.frame_limit)
+        self._send({'worker': self.worker_id})
+        self.logger.info(f"Worker {self.worker_id} connected to {socket_path}")
+        try:
+            while line := await reader.readline():
+                self._accept(json.loads(line))
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Worker {self.worker_id} lost the gateway connection: {e}")
+        finally:
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+            self._writer.close()
+            self.logger.info(f"Worker {self.worker_id} stopped")
+
+    def _accept(self, frame: Dict[str, Any]) -> None:
+        queue = self._users.get(frame['user'])
+        if queue is not None:
+            queue.append(frame)
+            return
+        self._users[frame['user']] = deque([frame])
+        task = asyncio.create_task(self._run_user(frame['user']))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_user(self, user_id: int) -> None:
+        queue = self._users[user_id]
+        while queue:
+            await self._execute(queue.popleft())
+        del self._users[user_id]
+
+    async def _execute(self, frame: Dict[str, Any]) -> None:
+        job_id = frame['job']
+
+        async def send(content: Optional[str] = None, **kwargs: Any) -> None:
+            if kwargs:
+                self.logger.warning(f"Job {job_id}: worker replies carry text only, {sorted(kwargs)} dropped")
+            self._send({'job': job_id, 'send': content})
+
+        ctx = CommandContext(frame['user'], discord.Object(id=frame['channel']), send, self.logger)
+        handler = self.handlers.get(frame['handler'])
+        method = None if frame['method'].startswith('_') else getattr(handler, frame['method'], None)
+        try:
+            if method is None:
+                raise WorkerError(f"Unknown command {frame['handler']}.{frame['method']}")
+            await method(ctx, *frame['args'])
+        except Exception as e:
+            self.logger.error(f"Job {job_id} ({frame['handler']}.{frame['method']}) failed: {e}", exc_info=True)
+            self._send({'job': job_id, 'error': f"{type(e).__name__}: {e}"})
+        else:
+            self._send({'job': job_id, 'done': True})
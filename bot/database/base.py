@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Protocol, Any
-from .models import Task
+from typing import AsyncIterator, List, Optional, Protocol, Any, Tuple
+from .models import BoardTask, Reminder, Task, TaskStats
 
 class DatabaseConnection(Protocol):
     """Протокол для подключения к базе данных."""
@@ -31,11 +31,21 @@ class DatabaseManager(ABC):
         """Добавление новой задачи."""
         pass
 
+    @abstractmethod
+    async def add_tasks(self, user_id: int, descriptions: List[str], statuses: Optional[List[bool]] = None) -> List[int]:
+        """Добавление нескольких задач одной транзакцией (statuses - статусы задач, по умолчанию невыполненные)."""
+        pass
+
     @abstractmethod
     async def get_tasks(self, user_id: int, limit: int = 10, offset: int = 0) -> List[Task]:
         """Получение списка задач."""
         pass
 
+    @abstractmethod
+    async def get_tasks_after(self, user_id: int, after_id: int, limit: int = 10) -> List[Task]:
+        """Получение задач с ID больше after_id (пагинация по курсору)."""
+        pass
+
     @abstractmethod
     async def mark_task_done(self, user_id: int, task_id: int, status: bool) -> bool:
         """Обновление статуса задачи."""
@@ -46,7 +56,123 @@ class DatabaseManager(ABC):
         """Удаление задачи."""
         pass
 
+    @abstractmethod
+    async def set_status_many(self, user_id: int, task_ids: List[int], status: bool) -> List[int]:
+        """Обновление статуса нескольких задач. Возвращает ID найденных задач."""
+        pass
+
+    @abstractmethod
+    async def delete_many(self, user_id: int, task_ids: List[int]) -> List[int]:
+        """Удаление нескольких задач. Возвращает ID удаленных задач."""
+        pass
+
+    @abstractmethod
+    def iter_tasks(self, user_id: int, chunk_size: int = 500) -> AsyncIterator[List[Task]]:
+        """Все задачи пользователя, включая архив, по порядку ID, порциями не больше chunk_size."""
+        pass
+
+    @abstractmethod
+    async def get_archived_tasks(self, user_id: int, limit: int = 10, offset: int = 0) -> List[Task]:
+        """Задачи пользователя, перенесенные в архив, по порядку ID."""
+        pass
+
+    @abstractmethod
+    async def count_archived_tasks(self, user_id: int) -> int:
+        """Количество задач пользователя в архиве."""
+        pass
+
+    @abstractmethod
+    async def search_tasks(self, user_id: int, query: str, limit: int = 10, offset: int = 0) -> List[Task]:
+        """Поиск задач пользователя по словам описания, лучшие совпадения первыми."""
+        pass
+
+    @abstractmethod
+    async def set_due_date(self, user_id: int, task_id: int, due_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка срока задачи (None - снять срок).
+
+        С channel_id напоминание в этот канал переносится на срок задачи.
+        """
+        pass
+
+    @abstractmethod
+    async def set_reminder(self, user_id: int, task_id: int, remind_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка напоминания о задаче (None - отменить напоминание)."""
+        pass
+
+    @abstractmethod
+    async def get_due_tasks(self, user_id: int, limit: int = 10) -> List[Task]:
+        """Невыполненные задачи со сроком, ближайшие первыми."""
+        pass
+
+    @abstractmethod
+    async def due_reminders(self, before: int, limit: int) -> List[Reminder]:
+        """Напоминания всех пользователей со временем раньше before, по времени."""
+        pass
+
+    @abstractmethod
+    async def claim_reminder(self, reminder: Reminder, lease_until: int) -> Optional[Tuple[str, bool]]:
+        """Захват напоминания перед отправкой.
+
+        Если напоминание все еще запланировано на reminder.remind_at, время
+        переносится на lease_until и возвращаются описание и статус задачи;
+        иначе (напоминание изменено или уже захвачено) - None.
+        """
+        pass
+
+    @abstractmethod
+    async def complete_reminder(self, reminder: Reminder, lease_until: int) -> bool:
+        """Снятие отправленного напоминания, захваченного до lease_until."""
+        pass
+
     @abstractmethod
     async def count_tasks(self, user_id: int, status: Optional[bool] = None) -> int:
         """Подсчет количества задач."""
+        pass
+
+    @abstractmethod
+    async def get_user_stats(self, user_id: int, since_day: int) -> TaskStats:
+        """Статистика пользователя: счетчики задач и созданные/выполненные по дням начиная с since_day."""
+        pass
+
+    @abstractmethod
+    async def get_global_stats(self, since_day: int) -> TaskStats:
+        """Та же статистика по всем пользователям."""
+        pass
+
+    @abstractmethod
+    async def add_board_task(self, board_id: int, user_id: int, description: str) -> int:
+        """Добавление задачи на общую доску. ID задач нумеруются в пределах доски."""
+        pass
+
+    @abstractmethod
+    async def get_board_tasks(self, board_id: int, limit: int = 10, offset: int = 0) -> List[BoardTask]:
+        """Задачи доски по порядку ID."""
+        pass
+
+    @abstractmethod
+    async def get_board_task(self, board_id: int, task_id: int) -> Optional[BoardTask]:
+        """Задача доски с текущей версией или None."""
+        pass
+
+    @abstractmethod
+    async def count_board_tasks(self, board_id: int) -> int:
+        """Количество задач на доске."""
+        pass
+
+    @abstractmethod
+    async def update_board_task(self, board_id: int, task_id: int, version: int, user_id: int,
+                                description: Optional[str] = None, status: Optional[bool] = None) -> Optional[int]:
+        """Изменение задачи доски сравнением версии (compare-and-swap).
+
+        Изменение применяется, только если версия задачи все еще равна
+        version. Возвращает новую версию или None, если задачу успели
+        изменить или удалить.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_board_task(self, board_id: int, task_id: int, version: int) -> bool:
+        """Удаление задачи доски, если ее версия все еще равна version."""
         pass 
\ No newline at end of file
@@ -0,0 +1,271 @@
+import logging
+import sys
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .base import DatabaseManager
+from .models import BoardTask, Reminder, Task, TaskStats
+from ..config.settings import DatabaseConstants
+from ..utils.cache import LRUCache, CacheStats
+
+def estimate_size(value: Any) -> int:
+    """Приблизительный размер результата запроса в байтах."""
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, Task):
+        size = sys.getsizeof(value) + sys.getsizeof(value.description)
+        # Время создания берется из слота как есть, чтобы оценка его не разбирала
+        for field in (value._created_at, value.due_at):
+            if field is not None:
+                size += sys.getsizeof(field)
+        return size
+    return sys.getsizeof(value)
+
+class CachedDatabaseManager(DatabaseManager):
+    """Кэширующая обертка над любым DatabaseManager.
+
+    Результаты get_tasks, get_tasks_after, search_tasks, get_due_tasks,
+    get_archived_tasks и счетчики кэшируются по пользователю и параметрам запроса
+    и сбрасываются записями этого пользователя. Записи в обход обертки кэш не видит: после них нужно
+    вызвать invalidate_user или clear. Задачи общих досок не кэшируются.
+    """
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        max_entries: int = DatabaseConstants.CACHE_MAX_ENTRIES,
+        max_bytes: int = DatabaseConstants.CACHE_MAX_BYTES,
+    ):
+        self.db = db
+        self.cache = LRUCache(max_entries, max_bytes, sizeof=estimate_size)
+        self.logger = logging.getLogger('discord_bot.db.cache')
+        # user_id -> [число незавершенных чтений, поколение данных]: результат
+        # чтения, начатого до записи, не попадает в кэш после нее
+        self._inflight: Dict[int, List[int]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.db, name)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Статистика попаданий, промахов и вытеснений."""
+        return self.cache.stats
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Сброс кэша пользователя."""
+        state = self._inflight.get(user_id)
+        if state is not None:
+            state[1] += 1
+        self.cache.invalidate_tag(user_id)
+
+    def clear(self) -> None:
+        """Сброс всего кэша."""
+        for state in self._inflight.values():
+            state[1] += 1
+        self.cache.clear()
+
+    async def _cached(self, user_id: int, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Чтение через кэш."""
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        state = self._inflight.setdefault(user_id, [0, 0])
+        state[0] += 1
+        generation = state[1]
+        try:
+            value = await load()
+        finally:
+            state[0] -= 1
+            if state[0] == 0:
+                del self._inflight[user_id]
+
+        if state[1] == generation:
+            self.cache.set(key, value, tag=user_id)
+        return value
+
+    async def init(self) -> None:
+        """Инициализация базы данных."""
+        await self.db.init()
+
+    async def close(self) -> None:
+        """Закрытие соединения и сброс кэша."""
+        self.clear()
+        await self.db.close()
+
+    async def add_task(self, user_id: int, description: str) -> int:
+        """Добавление новой задачи со сбросом кэша пользователя."""
+        try:
+            return await self.db.add_task(user_id, description)
+        finally:
+            self.invalidate_user(user_id)
+
+    async def add_tasks(self, user_id: int, descriptions: List[str], statuses: Optional[List[bool]] = None) -> List[int]:
+        """Добавление нескольких задач со сбросом кэша пользователя."""
+        try:
+            return await self.db.add_tasks(user_id, descriptions, statuses)
+        finally:
+            self.invalidate_user(user_id)
+
+    async def get_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Получение списка задач через кэш."""
+        return await self._cached(
+            user_id, ('tasks', user_id, limit, offset),
+            lambda: self.db.get_tasks(user_id, limit, offset)
+        )
+
+    async def get_tasks_after(self, user_id: int, after_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Получение задач после заданного ID через кэш."""
+        return await self._cached(
+            user_id, ('after', user_id, after_id, limit),
+            lambda: self.db.get_tasks_after(user_id, after_id, limit)
+        )
+
+    async def mark_task_done(self, user_id: int, task_id: int, status: bool) -> bool:
+        """Обновление статуса задачи со сбросом кэша при изменении."""
+        changed = True
+        try:
+            changed = await self.db.mark_task_done(user_id, task_id, status)
+            return changed
+        finally:
+            if changed:
+                self.invalidate_user(user_id)
+
+    async def delete_task(self, user_id: int, task_id: int) -> bool:
+        """Удаление задачи со сбросом кэша при изменении."""
+        changed = True
+        try:
+            changed = await self.db.delete_task(user_id, task_id)
+            return changed
+        finally:
+            if changed:
+                self.invalidate_user(user_id)
+
+    async def set_status_many(self, user_id: int, task_ids: List[int], status: bool) -> List[int]:
+        """Обновление статуса нескольких задач со сбросом кэша при изменении."""
+        found = task_ids
+        try:
+            found = await self.db.set_status_many(user_id, task_ids, status)
+            return found
+        finally:
+            if found:
+                self.invalidate_user(user_id)
+
+    async def delete_many(self, user_id: int, task_ids: List[int]) -> List[int]:
+        """Удаление нескольких задач со сбросом кэша при изменении."""
+        found = task_ids
+        try:
+            found = await self.db.delete_many(user_id, task_ids)
+            return found
+        finally:
+            if found:
+                self.invalidate_user(user_id)
+
+    async def iter_tasks(self, user_id: int, chunk_size: int = DatabaseConstants.EXPORT_CHUNK_SIZE) -> AsyncIterator[List[Task]]:
+        """Потоковое чтение задач мимо кэша."""
+        async with aclosing(self.db.iter_tasks(user_id, chunk_size)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def get_archived_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Задачи из архива через кэш; перенос в архив сбрасывает кэш пользователя."""
+        return await self._cached(
+            user_id, ('archived', user_id, limit, offset),
+            lambda: self.db.get_archived_tasks(user_id, limit, offset)
+        )
+
+    async def count_archived_tasks(self, user_id: int) -> int:
+        """Количество задач в архиве через кэш."""
+        return await self._cached(
+            user_id, ('archived_count', user_id), lambda: self.db.count_archived_tasks(user_id)
+        )
+
+    async def search_tasks(self, user_id: int, query: str, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Поиск задач через кэш."""
+        return await self._cached(
+            user_id, ('search', user_id, query, limit, offset),
+            lambda: self.db.search_tasks(user_id, query, limit, offset)
+        )
+
+    async def set_due_date(self, user_id: int, task_id: int, due_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка срока задачи со сбросом кэша при изменении."""
+        changed = True
+        try:
+            changed = await self.db.set_due_date(user_id, task_id, due_at, channel_id)
+            return changed
+        finally:
+            if changed:
+                self.invalidate_user(user_id)
+
+    async def set_reminder(self, user_id: int, task_id: int, remind_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка напоминания; кэшируемые поля задачи не меняются."""
+        return await self.db.set_reminder(user_id, task_id, remind_at, channel_id)
+
+    async def get_due_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Задачи со сроком через кэш."""
+        return await self._cached(
+            user_id, ('due', user_id, limit),
+            lambda: self.db.get_due_tasks(user_id, limit)
+        )
+
+    async def due_reminders(self, before: int, limit: int) -> List[Reminder]:
+        """Ближайшие напоминания мимо кэша."""
+        return await self.db.due_reminders(before, limit)
+
+    async def claim_reminder(self, reminder: Reminder, lease_until: int) -> Optional[Tuple[str, bool]]:
+        """Захват напоминания мимо кэша."""
+        return await self.db.claim_reminder(reminder, lease_until)
+
+    async def complete_reminder(self, reminder: Reminder, lease_until: int) -> bool:
+        """Снятие напоминания мимо кэша."""
+        return await self.db.complete_reminder(reminder, lease_until)
+
+    async def count_tasks(self, user_id: int, status: Optional[bool] = None) -> int:
+        """Подсчет количества задач через кэш."""
+        return await self._cached(
+            user_id, ('count', user_id, status),
+            lambda: self.db.count_tasks(user_id, status)
+        )
+
+    async def get_user_stats(self, user_id: int, since_day: int) -> TaskStats:
+        """Статистика пользователя через кэш."""
+        return await self._cached(
+            user_id, ('stats', user_id, since_day),
+            lambda: self.db.get_user_stats(user_id, since_day)
+        )
+
+    async def get_global_stats(self, since_day: int) -> TaskStats:
+        """Статистика по всем пользователям без кэширования: ее меняет любая запись."""
+        return await self.db.get_global_stats(since_day)
+
+    async def add_board_task(self, board_id: int, user_id: int, description: str) -> int:
+        """Добавление задачи на доску без кэша."""
+        return await self.db.add_board_task(board_id, user_id, description)
+
+    async def get_board_tasks(self, board_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[BoardTask]:
+        """Задачи доски без кэша.
+
+        Доску меняют многие пользователи и другие процессы кластера, а
+        устаревшая версия в кэше только умножала бы конфликты записи,
+        поэтому задачи досок всегда читаются из базы.
+        """
+        return await self.db.get_board_tasks(board_id, limit, offset)
+
+    async def get_board_task(self, board_id: int, task_id: int) -> Optional[BoardTask]:
+        """Задача доски без кэша."""
+        return await self.db.get_board_task(board_id, task_id)
+
+    async def count_board_tasks(self, board_id: int) -> int:
+        """Количество задач доски без кэша."""
+        return await self.db.count_board_tasks(board_id)
+
+    async def update_board_task(self, board_id: int, task_id: int, version: int, user_id: int,
+                                description: Optional[str] = None, status: Optional[bool] = None) -> Optional[int]:
+        """Изменение задачи доски сравнением версии."""
+        return await self.db.update_board_task(board_id, task_id, version, user_id, description, status)
+
+    async def delete_board_task(self, board_id: int, task_id: int, version: int) -> bool:
+        """Удаление задачи доски сравнением версии."""
+        return await self.db.delete_board_task(board_id, task_id, version)
@@ -0,0 +1,49 @@
+from .base import DatabaseManager
+from .cached import CachedDatabaseManager
+from .memory import InMemoryDatabaseManager
+from .metered import MeteredDatabaseManager
+from .sharded import ShardedSQLiteDatabaseManager
+from .sqlite import SQLiteDatabaseManager
+from ..config.settings import DatabaseConstants
+from ..utils.metrics import METRICS
+
+def create_database_manager(metered: bool = False, shared: bool = False, migrate: bool = True) -> DatabaseManager:
+    """Создание менеджера базы данных по настройкам DatabaseConstants.
+
+    С metered=True время операций с базой учитывается в метриках.
+    shared=True - хранилище общее для нескольких процессов (кластеры
+    шардов): SQLite открывается в режиме WAL, кэш чтения процесса не
+    используется, а хранилище в памяти недоступно. migrate=False отключает
+    миграцию схемы при запуске (MIGRATE_ON_START): в группе процессов ее
+    выполняет только один.
+    """
+    if shared and DatabaseConstants.BACKEND == 'memory':
+        raise ValueError("The memory backend cannot be shared between processes")
+
+    sqlite_options = {'wal': True} if shared else {}
+    if not migrate:
+        sqlite_options['migrate_on_start'] = False
+    if DatabaseConstants.BACKEND == 'sqlite':
+        db: DatabaseManager = SQLiteDatabaseManager(**sqlite_options)
+    elif DatabaseConstants.BACKEND == 'sharded':
+        db = ShardedSQLiteDatabaseManager(**sqlite_options)
+    elif DatabaseConstants.BACKEND == 'memory':
+        db = InMemoryDatabaseManager()
+    else:
+        raise ValueError(f"Unknown database backend: {DatabaseConstants.BACKEND}")
+
+    store = db
+    if metered:
+        db = MeteredDatabaseManager(db)
+    if DatabaseConstants.CACHE_ENABLED and not shared:
+        db = CachedDatabaseManager(db)
+        if isinstance(store, (SQLiteDatabaseManager, ShardedSQLiteDatabaseManager)):
+            # Фоновый перенос в архив идет мимо обертки и должен сбрасывать кэш
+            store.add_archive_listener(db.invalidate_user)
+        if metered:
+            stats = db.stats
+            METRICS.callback('discord_bot_cache_hits_total', 'Read cache hits', lambda: stats.hits, 'counter')
+            METRICS.callback('discord_bot_cache_misses_total', 'Read cache misses', lambda: stats.misses, 'counter')
+            METRICS.callback('discord_bot_cache_evictions_total', 'Read cache evictions', lambda: stats.evictions, 'counter')
+            METRICS.callback('discord_bot_cache_size_bytes', 'Approximate read cache size', lambda: stats.size_bytes)
+    return db
@@ -0,0 +1,124 @@
+"""
+Служебные операции над файлом базы данных.
+
+Запуск: python -m bot.database.maintenance --db tasks.db counters --verify
+"""
+import argparse
+import asyncio
+import sys
+from typing import List, Optional
+
+from .sharded import shard_paths, split_database
+from .sqlite import SQLiteDatabaseManager
+from ..config.settings import DatabaseConstants
+
+
+async def counters(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Проверка и пересчет счетчиков задач пользователей."""
+    if args.rebuild:
+        await db.rebuild_counters()
+        print("Task counters rebuilt")
+
+    mismatches = await db.verify_counters()
+    for user_id, total, done, actual_total, actual_done in mismatches:
+        print(f"user {user_id}: expected total={total} done={done}, stored total={actual_total} done={actual_done}")
+    print(f"{len(mismatches)} mismatching users")
+    return 1 if mismatches else 0
+
+
+async def search_index(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Перестроение полнотекстового индекса задач."""
+    await db.rebuild_search_index()
+    print("Search index rebuilt")
+    return 0
+
+
+async def stats(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Заполнение агрегатов статистики по существующим задачам."""
+    await db.rebuild_stats()
+    totals = await db.get_global_stats(0)
+    print(f"Task statistics rebuilt: {totals.users} users, {totals.total} tasks, {totals.done} done")
+    return 0
+
+
+async def archive(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Перенос старых выполненных задач в архив."""
+    archived = await db.archive_done_tasks(args.older_than_days * 86400)
+    print(f"{archived} tasks archived to {db.archive_path}")
+    return 0
+
+
+async def vacuum(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Перестройка файлов базы и архива с включением incremental auto_vacuum."""
+    await db.vacuum()
+    print("Database vacuumed")
+    return 0
+
+
+async def migrate(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Применение ожидающих миграций схемы."""
+    applied = await db.migrate()
+    for version in applied:
+        print(f"Migrated to schema version {version}")
+    if not applied:
+        print("Schema is up to date")
+    return 0
+
+
+async def split(db: SQLiteDatabaseManager, args: argparse.Namespace) -> int:
+    """Разделение базы данных на шарды."""
+    paths = shard_paths(args.db, args.shards)
+    counts = await split_database(args.db, paths)
+    for path, count in zip(paths, counts):
+        print(f"{path}: {count} tasks")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(description="Task database maintenance")
+    parser.add_argument("--db", default=DatabaseConstants.DB_PATH, help="путь к файлу базы данных")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    counters_parser = subparsers.add_parser("counters", help="проверить или пересчитать счетчики задач")
+    counters_parser.add_argument("--verify", action="store_true", help="только проверить (по умолчанию)")
+    counters_parser.add_argument("--rebuild", action="store_true", help="пересчитать перед проверкой")
+    counters_parser.set_defaults(handler=counters)
+
+    search_parser = subparsers.add_parser("search-index", help="перестроить поисковый индекс задач")
+    search_parser.set_defaults(handler=search_index)
+
+    stats_parser = subparsers.add_parser("stats", help="пересчитать агрегаты статистики (!stats)")
+    stats_parser.set_defaults(handler=stats)
+
+    archive_parser = subparsers.add_parser("archive", help="перенести старые выполненные задачи в архив")
+    archive_parser.add_argument("--older-than-days", type=float, default=DatabaseConstants.ARCHIVE_AFTER_DAYS,
+                                help="возраст выполненных задач в днях")
+    archive_parser.set_defaults(handler=archive)
+
+    vacuum_parser = subparsers.add_parser("vacuum", help="перестроить файлы базы и включить incremental vacuum")
+    vacuum_parser.set_defaults(handler=vacuum)
+
+    migrate_parser = subparsers.add_parser("migrate", help="применить ожидающие миграции схемы")
+    migrate_parser.set_defaults(handler=migrate)
+
+    split_parser = subparsers.add_parser("split", help="разделить базу данных на шарды по user_id")
+    split_parser.add_argument("--shards", type=int, default=DatabaseConstants.SHARD_COUNT, help="число шардов")
+    split_parser.set_defaults(handler=split)
+
+    return parser
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа служебной утилиты."""
+    args = build_parser().parse_args(argv)
+    db = SQLiteDatabaseManager(db_path=args.db, migrate_on_start=False)
+    await db.init()
+    try:
+        return await args.handler(db, args)
+    finally:
+        await db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,873 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timezone
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, IO, List, Optional, Tuple, Union
+
+from .base import DatabaseManager, DatabaseError
+from .models import BoardTask, Reminder, SECONDS_PER_DAY, Task, TaskStats, search_terms
+from ..config.settings import DatabaseConstants
+
+class _UserTasks:
+    """Задачи одного пользователя: отсортированные ID и задачи по ID."""
+    __slots__ = ('ids', 'tasks', 'done')
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.tasks: Dict[int, Task] = {}
+        self.done = 0
+
+class _Board:
+    """Задачи общей доски: отсортированные ID, задачи по ID и счетчик ID."""
+    __slots__ = ('ids', 'tasks', 'next_id')
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.tasks: Dict[int, BoardTask] = {}
+        self.next_id = 1
+
+def _copy(task: Task) -> Task:
+    """Копия задачи для вызывающего кода, чтобы он не менял состояние хранилища."""
+    return Task(task.id, task.user_id, task.description, task.status, task._created_at, task.due_at)
+
+def _now() -> str:
+    """Текущее время UTC в формате CURRENT_TIMESTAMP SQLite."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def _today() -> int:
+    """Номер текущих суток UTC."""
+    return int(time.time()) // SECONDS_PER_DAY
+
+def _day_of(created_at: Union[datetime, int, str, None]) -> int:
+    """Сутки UTC для времени создания задачи в том виде, в каком оно хранится."""
+    if created_at is None:
+        return _today()
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    if isinstance(created_at, datetime):
+        created_at = int(created_at.replace(tzinfo=timezone.utc).timestamp())
+    return created_at // SECONDS_PER_DAY
+
+class InMemoryDatabaseManager(DatabaseManager):
+    """Менеджер базы данных, хранящий задачи в памяти процесса.
+
+    Каждое изменение дописывается в журнал операций (JSON по строке) и
+    применяется к состоянию в памяти только после fsync журнала, поэтому
+    читатели не видят несохраненных изменений; параллельные записи
+    разделяют один fsync. Раз в snapshot_every операций состояние целиком
+    сохраняется в снимок, а журнал начинается заново. При запуске загружается
+    снимок и дочитываются записи журнала с большим порядковым номером.
+
+    Без log_path данные живут только в памяти. Задачи объекта Task внутри
+    хранилища не изменяются, а заменяются, поэтому снимок можно сериализовать
+    в отдельном потоке.
+    """
+
+    def __init__(
+        self,
+        log_path: Optional[str] = DatabaseConstants.MEMORY_LOG_PATH,
+        snapshot_path: Optional[str] = None,
+        snapshot_every: int = DatabaseConstants.MEMORY_SNAPSHOT_EVERY,
+        fsync_interval: float = DatabaseConstants.MEMORY_FSYNC_INTERVAL,
+    ):
+        self.log_path = log_path
+        self.snapshot_path = snapshot_path or (f"{log_path}.snapshot" if log_path else None)
+        self.snapshot_every = snapshot_every
+        self.fsync_interval = fsync_interval
+        self.logger = logging.getLogger('discord_bot.db')
+
+        self._users: Dict[int, _UserTasks] = {}
+        self._boards: Dict[int, _Board] = {}
+        # task_id -> (remind_at, user_id, channel_id)
+        self._reminders: Dict[int, Tuple[int, int, Optional[int]]] = {}
+        # Статистика: user_id -> {сутки: [создано, выполнено]}, то же по всем
+        # пользователям, сутки выполнения задач и общие счетчики
+        self._user_daily: Dict[int, Dict[int, List[int]]] = {}
+        self._daily: Dict[int, List[int]] = {}
+        self._completed_on: Dict[int, int] = {}
+        self._total = 0
+        self._done = 0
+        self._next_id = 1
+        self._seq = 0
+        self._synced_seq = 0
+        # Размер журнала в байтах: записанный и сохраненный последним fsync
+        self._log_size = 0
+        self._synced_size = 0
+        # Причина, по которой запись отключена до перезапуска
+        self._read_only: Optional[str] = None
+        self._ops_since_snapshot = 0
+        self._log: Optional[IO[str]] = None
+        # Записанные в журнал, но еще не примененные операции в порядке seq
+        self._pending: Deque[Tuple[Dict[str, Any], asyncio.Future]] = deque()
+        self._sync_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    # Восстановление и журнал
+
+    async def init(self) -> None:
+        """Загрузка снимка и журнала операций."""
+        if self.log_path is None:
+            self.logger.info("In-memory database initialized without persistence")
+            return
+        try:
+            snapshot_seq = await asyncio.to_thread(self._load_snapshot)
+            replayed = 0
+            for path in (f"{self.log_path}.old", self.log_path):
+                count, end = await asyncio.to_thread(self._replay_log, path, snapshot_seq)
+                replayed += count
+                if os.path.exists(path) and os.path.getsize(path) > end:
+                    # Обрезаем недописанный хвост, иначе новые записи допишутся к нему
+                    # и при следующем восстановлении будут отброшены вместе с ним
+                    self.logger.warning(f"Truncating {path} to last complete record at offset {end}")
+                    os.truncate(path, end)
+            self._synced_seq = self._seq
+            old_path = f"{self.log_path}.old"
+            if os.path.exists(old_path):
+                # Прошлый снимок не успел записаться: сохраняем состояние до новой ротации журнала
+                await asyncio.to_thread(self._write_snapshot, self._capture_state())
+                os.remove(old_path)
+            self._log = open(self.log_path, 'a', encoding='utf-8')
+            self._log_size = self._synced_size = os.path.getsize(self.log_path)
+            if self.fsync_interval > 0:
+                self._flusher = asyncio.create_task(self._fsync_loop())
+            self.logger.info(f"In-memory database restored: snapshot seq {snapshot_seq}, {replayed} log records replayed")
+        except Exception as e:
+            self.logger.error(f"In-memory database initialization failed: {e}")
+            raise DatabaseError(f"Failed to initialize database: {e}")
+
+    def _load_snapshot(self) -> int:
+        """Загрузка снимка состояния. Возвращает номер последней вошедшей в него операции."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+        with open(self.snapshot_path, encoding='utf-8') as snapshot:
+            data = json.load(snapshot)
+        for task_id, user_id, description, status, created_at, *due_at in data['tasks']:
+            self._insert(Task(task_id, user_id, description, bool(status), created_at, *due_at))
+        for task_id, remind_at, user_id, channel_id in data.get('reminders', []):
+            self._reminders[task_id] = (remind_at, user_id, channel_id)
+        if 'stats' in data:
+            for user_id, day, created, completed in data['stats']:
+                self._count_day(user_id, day, created, completed)
+            self._completed_on.update(data['completed_on'])
+        else:
+            self._rebuild_stats()
+        for board_id, next_id, tasks in data.get('boards', []):
+            board = self._board(board_id)
+            board.next_id = next_id
+            for task_id, description, status, version, created_by, updated_by in tasks:
+                self._put_board_task(BoardTask(task_id, board_id, description, bool(status), version, created_by, updated_by))
+        self._next_id = data['next_id']
+        self._seq = data['seq']
+        return self._seq
+
+    def _replay_log(self, path: str, after_seq: int) -> Tuple[int, int]:
+        """Применение записей журнала с номером больше after_seq.
+
+        Возвращает число примененных записей и смещение конца последней
+        целой записи.
+        """
+        if not os.path.exists(path):
+            return 0, 0
+        replayed = 0
+        end = 0
+        with open(path, 'rb') as log:
+            for line in log:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("record without line end")
+                    record = json.loads(line)
+                except ValueError:
+                    # Недописанная последняя строка после сбоя
+                    self.logger.warning(f"Skipping truncated record in {path}")
+                    break
+                end += len(line)
+                if record['seq'] <= after_seq:
+                    continue
+                self._apply(record)
+                self._seq = record['seq']
+                replayed += 1
+        return replayed, end
+
+    def _apply(self, record: Dict[str, Any]) -> Any:
+        """Применение операции к состоянию в памяти."""
+        op = record['op']
+        user_id = record.get('user')
+        if op == 'add':
+            statuses = record.get('done') or [False] * len(record['ids'])
+            day = _day_of(record['at'])
+            for task_id, description, status in zip(record['ids'], record['descriptions'], statuses):
+                self._insert(Task(task_id, user_id, description, status, record['at']))
+                self._count_day(user_id, day, 1, int(status))
+                if status:
+                    self._completed_on[task_id] = day
+            self._next_id = max(self._next_id, record['ids'][-1] + 1)
+            return record['ids']
+        if op == 'status':
+            return self._set_status(user_id, record['ids'], record['status'], record.get('day', _today()))
+        if op == 'delete':
+            return self._remove(user_id, record['ids'])
+        if op == 'due':
+            return self._set_due(user_id, record['id'], record['due'], record.get('channel'), 'channel' in record)
+        if op == 'remind':
+            return self._set_reminder(user_id, record['id'], record['at'], record.get('channel'), record.get('expect'))
+        if op == 'board_add':
+            board = self._board(record['board'])
+            board.next_id = max(board.next_id, record['id'] + 1)
+            self._put_board_task(BoardTask(record['id'], record['board'], record['description'], False, 1, user_id, user_id))
+            return record['id']
+        if op == 'board_update':
+            return self._update_board_task(record['board'], record['id'], record['expect'], user_id,
+                                           record.get('description'), record.get('status'))
+        if op == 'board_delete':
+            return self._remove_board_task(record['board'], record['id'], record['expect'])
+        raise DatabaseError(f"Unknown log operation: {op}")
+
+    async def _commit(self, record: Dict[str, Any]) -> Any:
+        """Запись операции в журнал, ожидание ее надежного сохранения и применение."""
+        if self._log is None:
+            return self._apply(record)
+        if self._read_only is not None:
+            raise DatabaseError(f"Database is read-only until restart: {self._read_only}")
+
+        self._seq += 1
+        seq = record['seq'] = self._seq
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self._log.write(line)
+        self._log.flush()
+        self._log_size += len(line.encode('utf-8'))
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        self._ops_since_snapshot += 1
+        if self._ops_since_snapshot >= self.snapshot_every and self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(self._snapshot())
+
+        if self.fsync_interval <= 0:
+            await self._sync(seq)
+        self._apply_pending(seq)
+        return future.result()
+
+    def _apply_pending(self, seq: int) -> None:
+        """Применение записанных в журнал операций до seq в порядке журнала."""
+        while self._pending and self._pending[0][0]['seq'] <= seq:
+            record, future = self._pending.popleft()
+            try:
+                future.set_result(self._apply(record))
+            except Exception as e:
+                future.set_exception(e)
+
+    async def _sync(self, seq: int) -> None:
+        """Ожидание fsync журнала до операции seq; одновременные записи делят один fsync."""
+        while self._synced_seq < seq:
+            if self._sync_task is None:
+                self._sync_task = asyncio.create_task(self._fsync())
+            await asyncio.shield(self._sync_task)
+
+    async def _fsync(self) -> None:
+        """Сброс журнала на диск."""
+        target = self._seq
+        size = self._log_size
+        log = self._log
+        try:
+            await asyncio.to_thread(os.fsync, log.fileno())
+            self._synced_seq = max(self._synced_seq, target)
+            self._synced_size = size
+        except Exception as e:
+            self._discard_unsynced(e)
+            raise
+        finally:
+            self._sync_task = None
+
+    def _discard_unsynced(self, error: Exception) -> None:
+        """Отмена операций, которые не удалось сохранить fsync.
+
+        Ошибка записи должна означать, что изменение не применено: операции
+        после последнего успешного fsync убираются из очереди применения, а
+        журнал обрезается до сохраненного размера, чтобы они не применились
+        при следующей записи или восстановлении. С fsync_interval операции
+        уже применены до fsync, и журнал не обрезается.
+        """
+        if self.fsync_interval > 0:
+            return
+        while self._pending and self._pending[-1][0]['seq'] > self._synced_seq:
+            _, future = self._pending.pop()
+            future.set_exception(DatabaseError(f"Operation log fsync failed: {error}"))
+            # Ошибку вызывающий код получает из _sync
+            future.exception()
+        try:
+            os.ftruncate(self._log.fileno(), self._synced_size)
+        except OSError as e:
+            # Несохраненные записи остались в журнале: новые записи легли бы после них
+            self._read_only = f"cannot truncate operation log after fsync failure: {e}"
+            self.logger.critical(f"In-memory database is read-only until restart: {self._read_only}")
+            return
+        self._log_size = self._synced_size
+        self._seq = self._synced_seq
+        self.logger.error(f"Operation log fsync failed, discarded unsynced records after seq {self._synced_seq}: {error}")
+
+    async def _fsync_loop(self) -> None:
+        """Периодический fsync журнала в фоне."""
+        while True:
+            await asyncio.sleep(self.fsync_interval)
+            if self._synced_seq < self._seq:
+                try:
+                    await self._sync(self._seq)
+                except Exception as e:
+                    self.logger.error(f"Operation log fsync failed: {e}")
+
+    async def _snapshot(self) -> None:
+        """Сохранение снимка и начало нового журнала."""
+        try:
+            while self._synced_seq < self._seq:
+                await self._sync(self._seq)
+            # Снимок и ротация журнала фиксируются в одной точке цикла событий
+            self._apply_pending(self._seq)
+            state = self._capture_state()
+            old_path = f"{self.log_path}.old"
+            self._log.close()
+            os.replace(self.log_path, old_path)
+            self._log = open(self.log_path, 'a', encoding='utf-8')
+            self._log_size = self._synced_size = 0
+            self._ops_since_snapshot = 0
+
+            await asyncio.to_thread(self._write_snapshot, state)
+            os.remove(old_path)
+            self.logger.info(f"Snapshot written at seq {state['seq']} with {len(state['tasks'])} tasks")
+        except Exception as e:
+            self.logger.error(f"Snapshot failed: {e}")
+        finally:
+            self._snapshot_task = None
+
+    def _capture_state(self) -> Dict[str, Any]:
+        """Неизменяемый срез состояния для снимка."""
+        return {
+            'seq': self._seq,
+            'next_id': self._next_id,
+            'tasks': [task for user in self._users.values() for task in user.tasks.values()],
+            'reminders': [[task_id, *reminder] for task_id, reminder in self._reminders.items()],
+            'stats': [[user_id, day, *counts] for user_id, days in self._user_daily.items()
+                      for day, counts in days.items()],
+            'completed_on': list(self._completed_on.items()),
+            'boards': [(board_id, board.next_id, list(board.tasks.values())) for board_id, board in self._boards.items()],
+        }
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        """Атомарная запись снимка во временный файл с последующей заменой."""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as snapshot:
+            json.dump({
+                'seq': state['seq'],
+                'next_id': state['next_id'],
+                'tasks': [[task.id, task.user_id, task.description, int(task.status), task._created_at, task.due_at]
+                          for task in state['tasks']],
+                'reminders': state['reminders'],
+                'stats': state['stats'],
+                'completed_on': state['completed_on'],
+                'boards': [[board_id, next_id, [[task.id, task.description, int(task.status), task.version,
+                                                 task.created_by, task.updated_by] for task in tasks]]
+                           for board_id, next_id, tasks in state['boards']],
+            }, snapshot, ensure_ascii=False, separators=(',', ':'))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def close(self) -> None:
+        """Сохранение журнала и снимка, закрытие файлов."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._snapshot_task is not None:
+            await self._snapshot_task
+        if self._log is None:
+            return
+        try:
+            await self._sync(self._seq)
+            if self._ops_since_snapshot:
+                await self._snapshot()
+        finally:
+            self._log.close()
+            self._log = None
+            self.logger.info("In-memory database closed")
+
+    # Операции над состоянием
+
+    def _insert(self, task: Task) -> None:
+        user = self._users.get(task.user_id)
+        if user is None:
+            user = self._users[task.user_id] = _UserTasks()
+        if task.id not in user.tasks:
+            insort(user.ids, task.id)
+            self._total += 1
+        elif user.tasks[task.id].status:
+            user.done -= 1
+            self._done -= 1
+        user.tasks[task.id] = task
+        if task.status:
+            user.done += 1
+            self._done += 1
+
+    def _count_day(self, user_id: int, day: int, created: int, completed: int) -> None:
+        """Учет созданных и выполненных задач в статистике суток."""
+        for counts in (self._user_daily.setdefault(user_id, {}).setdefault(day, [0, 0]),
+                       self._daily.setdefault(day, [0, 0])):
+            counts[0] += created
+            counts[1] += completed
+
+    def _rebuild_stats(self) -> None:
+        """Статистика по задачам снимка, сохраненного до ее появления.
+
+        Время выполнения старых задач неизвестно: они считаются выполненными сегодня.
+        """
+        today = _today()
+        for user_id, user in self._users.items():
+            for task in user.tasks.values():
+                self._count_day(user_id, _day_of(task._created_at), 1, 0)
+                if task.status:
+                    self._count_day(user_id, today, 0, 1)
+                    self._completed_on[task.id] = today
+
+    def _set_status(self, user_id: int, task_ids: List[int], status: bool, day: int) -> List[int]:
+        user = self._users.get(user_id)
+        found = []
+        if user is None:
+            return found
+        for task_id in sorted(set(task_ids)):
+            task = user.tasks.get(task_id)
+            if task is None:
+                continue
+            found.append(task_id)
+            if task.status != status:
+                user.tasks[task_id] = Task(task.id, user_id, task.description, status, task._created_at, task.due_at)
+                user.done += 1 if status else -1
+                self._done += 1 if status else -1
+                if status:
+                    self._completed_on[task_id] = day
+                    self._count_day(user_id, day, 0, 1)
+                else:
+                    # Снятая отметка вычитается из суток, когда задача была выполнена
+                    self._count_day(user_id, self._completed_on.pop(task_id, day), 0, -1)
+        return found
+
+    def _set_due(self, user_id: int, task_id: int, due_at: Optional[int],
+                 channel_id: Optional[int], with_reminder: bool) -> bool:
+        user = self._users.get(user_id)
+        task = user.tasks.get(task_id) if user is not None else None
+        if task is None:
+            return False
+        user.tasks[task_id] = Task(task.id, user_id, task.description, task.status, task._created_at, due_at)
+        if with_reminder:
+            self._set_reminder(user_id, task_id, due_at, channel_id)
+        return True
+
+    def _set_reminder(self, user_id: int, task_id: int, remind_at: Optional[int],
+                      channel_id: Optional[int], expect: Optional[int] = None) -> bool:
+        """Установка напоминания; с expect - только если оно запланировано на expect."""
+        user = self._users.get(user_id)
+        if user is None or task_id not in user.tasks:
+            return False
+        if expect is not None:
+            current = self._reminders.get(task_id)
+            if current is None or current[0] != expect:
+                return False
+            channel_id = current[2]
+        if remind_at is None:
+            self._reminders.pop(task_id, None)
+        else:
+            self._reminders[task_id] = (remind_at, user_id, channel_id)
+        return True
+
+    def _remove(self, user_id: int, task_ids: List[int]) -> List[int]:
+        user = self._users.get(user_id)
+        removed = []
+        if user is None:
+            return removed
+        for task_id in sorted(set(task_ids)):
+            task = user.tasks.pop(task_id, None)
+            if task is None:
+                continue
+            removed.append(task_id)
+            self._reminders.pop(task_id, None)
+            self._completed_on.pop(task_id, None)
+            del user.ids[bisect_left(user.ids, task_id)]
+            self._total -= 1
+            if task.status:
+                user.done -= 1
+                self._done -= 1
+        if not user.tasks:
+            del self._users[user_id]
+        return removed
+
+    def _board(self, board_id: int) -> _Board:
+        board = self._boards.get(board_id)
+        if board is None:
+            board = self._boards[board_id] = _Board()
+        return board
+
+    def _put_board_task(self, task: BoardTask) -> None:
+        board = self._board(task.board_id)
+        if task.id not in board.tasks:
+            insort(board.ids, task.id)
+        board.tasks[task.id] = task
+
+    def _update_board_task(self, board_id: int, task_id: int, expect: int, user_id: int,
+                           description: Optional[str], status: Optional[bool]) -> Optional[int]:
+        """Изменение задачи доски, если ее версия все еще равна expect."""
+        board = self._boards.get(board_id)
+        task = board.tasks.get(task_id) if board is not None else None
+        if task is None or task.version != expect:
+            return None
+        board.tasks[task_id] = task._replace(
+            description=task.description if description is None else description,
+            status=task.status if status is None else status,
+            version=expect + 1, updated_by=user_id,
+        )
+        return expect + 1
+
+    def _remove_board_task(self, board_id: int, task_id: int, expect: int) -> bool:
+        """Удаление задачи доски, если ее версия все еще равна expect.
+
+        Доска остается и после удаления последней задачи: ее счетчик ID
+        не должен начаться заново.
+        """
+        board = self._boards.get(board_id)
+        task = board.tasks.get(task_id) if board is not None else None
+        if task is None or task.version != expect:
+            return False
+        del board.tasks[task_id]
+        del board.ids[bisect_left(board.ids, task_id)]
+        return True
+
+    # Реализация DatabaseManager
+
+    async def add_task(self, user_id: int, description: str) -> int:
+        """Добавление новой задачи."""
+        return (await self.add_tasks(user_id, [description]))[0]
+
+    async def add_tasks(self, user_id: int, descriptions: List[str], statuses: Optional[List[bool]] = None) -> List[int]:
+        """Добавление нескольких задач одной операцией журнала."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        if not descriptions:
+            return []
+        if statuses is not None and len(statuses) != len(descriptions):
+            raise ValueError("statuses must match descriptions")
+
+        max_len = DatabaseConstants.MAX_DESCRIPTION_LENGTH
+        if any(len(description) > max_len for description in descriptions):
+            self.logger.warning(f"Task description truncated for user {user_id}")
+        ids = list(range(self._next_id, self._next_id + len(descriptions)))
+        # ID резервируются сразу: операция применяется только после fsync
+        self._next_id += len(descriptions)
+        record = {
+            'op': 'add', 'user': user_id, 'ids': ids, 'at': _now(),
+            'descriptions': [description[:max_len] for description in descriptions],
+        }
+        if statuses is not None and any(statuses):
+            record['done'] = [bool(status) for status in statuses]
+        try:
+            return await self._commit(record)
+        except Exception as e:
+            self.logger.error(f"Error adding tasks: {e}")
+            raise DatabaseError(f"Failed to add task: {e}")
+
+    async def get_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Получение списка задач с пагинацией."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        user = self._users.get(user_id)
+        if user is None:
+            return []
+        return [_copy(user.tasks[task_id]) for task_id in user.ids[offset:offset + limit]]
+
+    async def get_tasks_after(self, user_id: int, after_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Получение задач после заданного ID двоичным поиском."""
+        if not isinstance(user_id, int) or not isinstance(after_id, int):
+            raise ValueError("user_id and after_id must be integers")
+        user = self._users.get(user_id)
+        if user is None:
+            return []
+        start = bisect_right(user.ids, after_id)
+        return [_copy(user.tasks[task_id]) for task_id in user.ids[start:start + limit]]
+
+    async def iter_tasks(self, user_id: int, chunk_size: int = DatabaseConstants.EXPORT_CHUNK_SIZE) -> AsyncIterator[List[Task]]:
+        """Задачи пользователя порциями; удаленные во время обхода пропускаются."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        user = self._users.get(user_id)
+        if user is None:
+            return
+        task_ids = list(user.ids)
+        for start in range(0, len(task_ids), chunk_size):
+            chunk = [_copy(user.tasks[task_id]) for task_id in task_ids[start:start + chunk_size] if task_id in user.tasks]
+            if chunk:
+                yield chunk
+
+    async def get_archived_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Архива нет: все задачи хранятся в памяти."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        return []
+
+    async def count_archived_tasks(self, user_id: int) -> int:
+        """Архива нет: все задачи хранятся в памяти."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        return 0
+
+    async def search_tasks(self, user_id: int, query: str, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Поиск перебором задач пользователя.
+
+        Каждое слово запроса ищется как префикс слов описания, все слова
+        должны найтись; выше те задачи, где совпавших слов больше.
+        """
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        terms = search_terms(query)
+        user = self._users.get(user_id)
+        if not terms or user is None:
+            return []
+        ranked = []
+        for task_id in user.ids:
+            task = user.tasks[task_id]
+            words = search_terms(task.description)
+            if all(any(word.startswith(term) for word in words) for term in terms):
+                hits = sum(1 for word in words if any(word.startswith(term) for term in terms))
+                ranked.append((-hits, task_id))
+        ranked.sort()
+        return [_copy(user.tasks[task_id]) for _, task_id in ranked[offset:offset + limit]]
+
+    async def mark_task_done(self, user_id: int, task_id: int, status: bool) -> bool:
+        """Обновление статуса задачи."""
+        if not isinstance(user_id, int) or not isinstance(task_id, int):
+            raise ValueError("user_id and task_id must be integers")
+        return bool(await self.set_status_many(user_id, [task_id], status))
+
+    async def delete_task(self, user_id: int, task_id: int) -> bool:
+        """Удаление задачи."""
+        if not isinstance(user_id, int) or not isinstance(task_id, int):
+            raise ValueError("user_id and task_id must be integers")
+        return bool(await self.delete_many(user_id, [task_id]))
+
+    async def set_status_many(self, user_id: int, task_ids: List[int], status: bool) -> List[int]:
+        """Обновление статуса нескольких задач."""
+        if not isinstance(user_id, int) or not all(isinstance(task_id, int) for task_id in task_ids):
+            raise ValueError("user_id and task_ids must be integers")
+        user = self._users.get(user_id)
+        if user is None or not any(task_id in user.tasks for task_id in task_ids):
+            return []
+        try:
+            return await self._commit(
+                {'op': 'status', 'user': user_id, 'ids': list(task_ids), 'status': bool(status), 'day': _today()}
+            )
+        except Exception as e:
+            self.logger.error(f"Error updating task status: {e}")
+            raise DatabaseError(f"Failed to update task status: {e}")
+
+    async def delete_many(self, user_id: int, task_ids: List[int]) -> List[int]:
+        """Удаление нескольких задач."""
+        if not isinstance(user_id, int) or not all(isinstance(task_id, int) for task_id in task_ids):
+            raise ValueError("user_id and task_ids must be integers")
+        user = self._users.get(user_id)
+        if user is None or not any(task_id in user.tasks for task_id in task_ids):
+            return []
+        try:
+            return await self._commit({'op': 'delete', 'user': user_id, 'ids': list(task_ids)})
+        except Exception as e:
+            self.logger.error(f"Error deleting tasks: {e}")
+            raise DatabaseError(f"Failed to delete task: {e}")
+
+    def _has_task(self, user_id: int, task_id: int) -> bool:
+        user = self._users.get(user_id)
+        return user is not None and task_id in user.tasks
+
+    async def set_due_date(self, user_id: int, task_id: int, due_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка срока задачи, с channel_id - вместе с напоминанием."""
+        if not isinstance(user_id, int) or not isinstance(task_id, int):
+            raise ValueError("user_id and task_id must be integers")
+        if not self._has_task(user_id, task_id):
+            return False
+        record = {'op': 'due', 'user': user_id, 'id': task_id, 'due': due_at}
+        if channel_id is not None:
+            record['channel'] = channel_id
+        try:
+            return await self._commit(record)
+        except Exception as e:
+            self.logger.error(f"Error setting due date: {e}")
+            raise DatabaseError(f"Failed to set due date: {e}")
+
+    async def set_reminder(self, user_id: int, task_id: int, remind_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка или отмена напоминания о задаче."""
+        if not isinstance(user_id, int) or not isinstance(task_id, int):
+            raise ValueError("user_id and task_id must be integers")
+        if not self._has_task(user_id, task_id):
+            return False
+        try:
+            return await self._commit({'op': 'remind', 'user': user_id, 'id': task_id, 'at': remind_at, 'channel': channel_id})
+        except Exception as e:
+            self.logger.error(f"Error setting reminder: {e}")
+            raise DatabaseError(f"Failed to set reminder: {e}")
+
+    async def get_due_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Невыполненные задачи со сроком перебором задач пользователя."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        user = self._users.get(user_id)
+        if user is None:
+            return []
+        due = heapq.nsmallest(
+            limit,
+            (task for task in user.tasks.values() if task.due_at is not None and not task.status),
+            key=lambda task: (task.due_at, task.id)
+        )
+        return [_copy(task) for task in due]
+
+    async def due_reminders(self, before: int, limit: int) -> List[Reminder]:
+        """Ближайшие напоминания перебором запланированных."""
+        return heapq.nsmallest(
+            limit,
+            (Reminder(remind_at, user_id, task_id, channel_id)
+             for task_id, (remind_at, user_id, channel_id) in self._reminders.items() if remind_at < before),
+            key=lambda reminder: (reminder.remind_at, reminder.task_id)
+        )
+
+    async def _compare_and_set_reminder(self, reminder: Reminder, expect: int, remind_at: Optional[int]) -> bool:
+        """Перенос напоминания, если оно запланировано на expect."""
+        current = self._reminders.get(reminder.task_id)
+        if current is None or current[0] != expect or current[1] != reminder.user_id:
+            return False
+        record = {'op': 'remind', 'user': reminder.user_id, 'id': reminder.task_id, 'at': remind_at, 'expect': expect}
+        try:
+            return await self._commit(record)
+        except Exception as e:
+            self.logger.error(f"Error updating reminder: {e}")
+            raise DatabaseError(f"Failed to update reminder: {e}")
+
+    async def claim_reminder(self, reminder: Reminder, lease_until: int) -> Optional[Tuple[str, bool]]:
+        """Захват напоминания сравнением времени."""
+        user = self._users.get(reminder.user_id)
+        task = user.tasks.get(reminder.task_id) if user is not None else None
+        if task is None or not await self._compare_and_set_reminder(reminder, reminder.remind_at, lease_until):
+            return None
+        return task.description, task.status
+
+    async def complete_reminder(self, reminder: Reminder, lease_until: int) -> bool:
+        """Снятие напоминания, захваченного до lease_until."""
+        return await self._compare_and_set_reminder(reminder, lease_until, None)
+
+    async def count_tasks(self, user_id: int, status: Optional[bool] = None) -> int:
+        """Подсчет количества задач."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        user = self._users.get(user_id)
+        if user is None:
+            return 0
+        if status is None:
+            return len(user.ids)
+        return user.done if status else len(user.ids) - user.done
+
+    async def get_user_stats(self, user_id: int, since_day: int) -> TaskStats:
+        """Статистика пользователя из счетчиков в памяти."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        user = self._users.get(user_id)
+        days = self._user_daily.get(user_id, {})
+        daily = sorted((day, *counts) for day, counts in days.items() if day >= since_day)
+        if user is None:
+            return TaskStats(0, 0, daily)
+        return TaskStats(len(user.ids), user.done, daily)
+
+    async def get_global_stats(self, since_day: int) -> TaskStats:
+        """Статистика по всем пользователям из счетчиков в памяти."""
+        daily = sorted((day, *counts) for day, counts in self._daily.items() if day >= since_day)
+        return TaskStats(self._total, self._done, daily, len(self._users))
+
+    async def add_board_task(self, board_id: int, user_id: int, description: str) -> int:
+        """Добавление задачи на доску одной операцией журнала."""
+        if not isinstance(board_id, int) or not isinstance(user_id, int):
+            raise ValueError("board_id and user_id must be integers")
+        max_len = DatabaseConstants.MAX_DESCRIPTION_LENGTH
+        if len(description) > max_len:
+            self.logger.warning(f"Task description truncated for user {user_id}")
+        board = self._board(board_id)
+        # ID резервируется сразу: операция применяется только после fsync
+        task_id = board.next_id
+        board.next_id += 1
+        try:
+            return await self._commit(
+                {'op': 'board_add', 'user': user_id, 'board': board_id, 'id': task_id, 'description': description[:max_len]}
+            )
+        except Exception as e:
+            self.logger.error(f"Error adding board task: {e}")
+            raise DatabaseError(f"Failed to add board task: {e}")
+
+    async def get_board_tasks(self, board_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[BoardTask]:
+        """Задачи доски по порядку ID; BoardTask неизменяем, копии не нужны."""
+        if not isinstance(board_id, int):
+            raise ValueError("board_id must be an integer")
+        board = self._boards.get(board_id)
+        if board is None:
+            return []
+        return [board.tasks[task_id] for task_id in board.ids[offset:offset + limit]]
+
+    async def get_board_task(self, board_id: int, task_id: int) -> Optional[BoardTask]:
+        """Задача доски с текущей версией."""
+        if not isinstance(board_id, int) or not isinstance(task_id, int):
+            raise ValueError("board_id and task_id must be integers")
+        board = self._boards.get(board_id)
+        return board.tasks.get(task_id) if board is not None else None
+
+    async def count_board_tasks(self, board_id: int) -> int:
+        """Количество задач доски."""
+        if not isinstance(board_id, int):
+            raise ValueError("board_id must be an integer")
+        board = self._boards.get(board_id)
+        return len(board.ids) if board is not None else 0
+
+    async def update_board_task(self, board_id: int, task_id: int, version: int, user_id: int,
+                                description: Optional[str] = None, status: Optional[bool] = None) -> Optional[int]:
+        """Изменение задачи доски; версия сравнивается при применении операции после fsync."""
+        if not all(isinstance(value, int) for value in (board_id, task_id, version, user_id)):
+            raise ValueError("board_id, task_id, version and user_id must be integers")
+        board = self._boards.get(board_id)
+        task = board.tasks.get(task_id) if board is not None else None
+        if task is None or task.version != version:
+            return None
+        record = {'op': 'board_update', 'user': user_id, 'board': board_id, 'id': task_id, 'expect': version}
+        if description is not None:
+            max_len = DatabaseConstants.MAX_DESCRIPTION_LENGTH
+            if len(description) > max_len:
+                self.logger.warning(f"Task description truncated for user {user_id}")
+            record['description'] = description[:max_len]
+        if status is not None:
+            record['status'] = bool(status)
+        try:
+            return await self._commit(record)
+        except Exception as e:
+            self.logger.error(f"Error updating board task: {e}")
+            raise DatabaseError(f"Failed to update board task: {e}")
+
+    async def delete_board_task(self, board_id: int, task_id: int, version: int) -> bool:
+        """Удаление задачи доски с условием на версию."""
+        if not all(isinstance(value, int) for value in (board_id, task_id, version)):
+            raise ValueError("board_id, task_id and version must be integers")
+        board = self._boards.get(board_id)
+        task = board.tasks.get(task_id) if board is not None else None
+        if task is None or task.version != version:
+            return False
+        try:
+            return await self._commit(
+                {'op': 'board_delete', 'board': board_id, 'id': task_id, 'expect': version}
+            )
+        except Exception as e:
+            self.logger.error(f"Error deleting board task: {e}")
+            raise DatabaseError(f"Failed to delete board task: {e}")
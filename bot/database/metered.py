@@ -0,0 +1,42 @@
+import functools
+import inspect
+import time
+from typing import Any, Dict
+
+from ..utils.metrics import DB_LATENCY, DB_ERRORS
+
+class MeteredDatabaseManager:
+    """Обертка над любым DatabaseManager, измеряющая время его операций.
+
+    Каждый асинхронный метод учитывается в гистограмме
+    discord_bot_db_operation_duration_seconds под своим именем, ошибки - в
+    discord_bot_db_errors_total по типу исключения. Остальные атрибуты
+    передаются обернутому объекту без изменений.
+    """
+
+    def __init__(self, db: Any):
+        self.db = db
+        self._wrapped: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.db, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrapped[name] = self._meter(name, attribute)
+        return wrapped
+
+    @staticmethod
+    def _meter(name: str, method: Any) -> Any:
+        @functools.wraps(method)
+        async def metered(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception as e:
+                DB_ERRORS.inc(name, type(e).__name__)
+                raise
+            finally:
+                DB_LATENCY.observe(time.perf_counter() - started, name)
+        return metered
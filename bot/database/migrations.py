@@ -0,0 +1,223 @@
+"""
+Версионные миграции схемы SQLite.
+
+Версия схемы хранится в PRAGMA user_version. Миграция выполняется онлайн:
+подготовка, копирование пачками отдельными короткими транзакциями (бот
+продолжает работать со старой таблицей, а триггеры повторяют каждую запись
+в новой) и переключение на новую таблицу в одной транзакции. Прогресс
+копирования хранится в базе, поэтому прерванная миграция продолжается с
+того же места.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Collection, List, Sequence, Set
+
+from .base import DatabaseConnection, DatabaseError
+from ..config.settings import DatabaseConstants
+
+if TYPE_CHECKING:
+    from .sqlite import SQLiteDatabaseManager
+
+# Текущее время в секундах Unix-времени внутри SQL
+SQL_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+# Столбцы таблицы задач актуальной схемы
+TASK_TABLE_COLUMNS = (
+    'id', 'user_id', 'description', 'status', 'created_at', 'due_at', 'remind_at', 'remind_channel_id', 'completed_at'
+)
+
+def compact_tasks_sql(table: str) -> str:
+    """CREATE TABLE компактной схемы задач.
+
+    Строгая типизация (STRICT), время создания - целое число секунд,
+    статус - 0 или 1. Таблица без rowid кластеризована по (user_id, id):
+    задачи одного пользователя лежат рядом, и список читается подряд.
+    """
+    max_len = DatabaseConstants.MAX_DESCRIPTION_LENGTH
+    return f'''CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            description TEXT NOT NULL CHECK(length(description) <= {max_len}),
+            status INTEGER NOT NULL DEFAULT 0 CHECK(status IN (0, 1)),
+            created_at INTEGER NOT NULL DEFAULT ({SQL_NOW}),
+            due_at INTEGER,
+            remind_at INTEGER,
+            remind_channel_id INTEGER,
+            completed_at INTEGER,
+            PRIMARY KEY (user_id, id)) STRICT, WITHOUT ROWID'''
+
+def compact_select(columns: Collection[str]) -> str:
+    """Выражения SELECT, приводящие строку старой таблицы tasks к компактной схеме.
+
+    Текстовое время создания переводится в секунды, столбцы, которых нет в
+    старой таблице, заполняются NULL.
+    """
+    created_at = SQL_NOW
+    if 'created_at' in columns:
+        created_at = (f"COALESCE(CASE WHEN typeof(created_at) = 'integer' THEN created_at "
+                      f"ELSE CAST(strftime('%s', created_at) AS INTEGER) END, {SQL_NOW})")
+    expressions = {
+        'status': "COALESCE(status, 0) != 0" if 'status' in columns else "0",
+        'created_at': created_at,
+    }
+    return ", ".join(
+        expressions.get(column, column if column in columns else "NULL") for column in TASK_TABLE_COLUMNS
+    )
+
+async def schema_version(db: DatabaseConnection) -> int:
+    """Версия схемы базы данных."""
+    cursor = await db.execute("PRAGMA user_version")
+    return (await cursor.fetchone())[0]
+
+async def table_columns(db: DatabaseConnection, table: str) -> Set[str]:
+    """Имена столбцов таблицы."""
+    cursor = await db.execute("SELECT name FROM pragma_table_info(?)", (table,))
+    return {row[0] for row in await cursor.fetchall()}
+
+class Migration(ABC):
+    """Шаг схемы с номером версии.
+
+    Каждый метод выполняется в отдельной транзакции BEGIN IMMEDIATE и ничего
+    не делает, если база уже на этой версии, поэтому миграцию можно прервать
+    и запустить снова. Несколько процессов, мигрирующих одну базу, выполняют
+    шаги по очереди.
+    """
+    version: int
+    description: str
+
+    @abstractmethod
+    async def prepare(self, db: DatabaseConnection) -> None:
+        """Создание новых таблиц и триггеров, повторяющих записи."""
+        pass
+
+    @abstractmethod
+    async def copy_batch(self, db: DatabaseConnection, limit: int) -> int:
+        """Копирование следующей пачки строк. Возвращает число строк, 0 - все скопировано."""
+        pass
+
+    @abstractmethod
+    async def finish(self, db: DatabaseConnection, manager: 'SQLiteDatabaseManager') -> None:
+        """Переключение на новую схему и запись версии."""
+        pass
+
+class CompactTasksLayout(Migration):
+    """Перевод таблицы tasks на компактную схему compact_tasks_sql."""
+    version = 1
+    description = "compact STRICT tasks table clustered by (user_id, id)"
+    table = 'tasks_compact'
+
+    async def prepare(self, db: DatabaseConnection) -> None:
+        if await schema_version(db) >= self.version:
+            return
+        await db.execute(compact_tasks_sql(self.table))
+        await db.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_task_id ON {self.table}(id)")
+        await db.execute('''CREATE TABLE IF NOT EXISTS schema_migration_progress (
+            version INTEGER PRIMARY KEY,
+            last_id INTEGER NOT NULL)''')
+        await db.execute(
+            "INSERT OR IGNORE INTO schema_migration_progress (version, last_id) VALUES (?, 0)", (self.version,)
+        )
+
+        # Строка берется из tasks, а не из NEW: так в копию попадают и
+        # изменения, сделанные другими триггерами (completed_at)
+        copy_row = (f"INSERT OR REPLACE INTO {self.table} ({', '.join(TASK_TABLE_COLUMNS)}) "
+                    f"SELECT {compact_select(await table_columns(db, 'tasks'))} FROM tasks WHERE id = NEW.id;")
+        delete_row = f"DELETE FROM {self.table} WHERE id = OLD.id;"
+        for event, body in (('INSERT', copy_row), ('UPDATE', delete_row + copy_row), ('DELETE', delete_row)):
+            await db.execute(
+                f"CREATE TRIGGER IF NOT EXISTS trg_migrate_compact_{event.lower()} AFTER {event} ON tasks "
+                f"BEGIN {body} END"
+            )
+
+    async def copy_batch(self, db: DatabaseConnection, limit: int) -> int:
+        if await schema_version(db) >= self.version:
+            return 0
+        cursor = await db.execute("SELECT last_id FROM schema_migration_progress WHERE version = ?", (self.version,))
+        row = await cursor.fetchone()
+        if row is None:
+            return 0
+        cursor = await db.execute(
+            "SELECT COUNT(*), MAX(id) FROM (SELECT id FROM tasks WHERE id > ? ORDER BY id LIMIT ?)", (row[0], limit)
+        )
+        count, last_id = await cursor.fetchone()
+        if not count:
+            return 0
+        await db.execute(
+            f"INSERT OR REPLACE INTO {self.table} ({', '.join(TASK_TABLE_COLUMNS)}) "
+            f"SELECT {compact_select(await table_columns(db, 'tasks'))} FROM tasks WHERE id > ? AND id <= ?",
+            (row[0], last_id)
+        )
+        await db.execute(
+            "UPDATE schema_migration_progress SET last_id = ? WHERE version = ?", (last_id, self.version)
+        )
+        return count
+
+    async def finish(self, db: DatabaseConnection, manager: 'SQLiteDatabaseManager') -> None:
+        if await schema_version(db) >= self.version:
+            return
+        cursor = await db.execute(f"SELECT (SELECT COUNT(*) FROM tasks), (SELECT COUNT(*) FROM {self.table})")
+        source_rows, copied_rows = await cursor.fetchone()
+        if source_rows != copied_rows:
+            raise DatabaseError(f"Migration {self.version}: copied {copied_rows} of {source_rows} tasks")
+        # Вместе со старой таблицей удаляются ее индексы и триггеры, включая повторяющие
+        await db.execute("DROP TABLE tasks")
+        await db.execute(f"ALTER TABLE {self.table} RENAME TO tasks")
+        await manager._create_schema_objects(db, self.version)
+        await db.execute(f"PRAGMA user_version = {self.version}")
+        await db.execute("DELETE FROM schema_migration_progress WHERE version = ?", (self.version,))
+
+# История схемы по порядку версий
+MIGRATIONS: Sequence[Migration] = (CompactTasksLayout(),)
+LATEST_VERSION = MIGRATIONS[-1].version
+
+class MigrationRunner:
+    """Последовательное применение миграций к базе SQLiteDatabaseManager.
+
+    Каждый шаг - отдельная транзакция под блокировкой записи менеджера,
+    поэтому шаги перемежаются с обычными записями бота; между пачками
+    копирования - пауза batch_pause.
+    """
+
+    def __init__(
+        self,
+        manager: 'SQLiteDatabaseManager',
+        migrations: Sequence[Migration] = MIGRATIONS,
+        batch_size: int = DatabaseConstants.MIGRATION_BATCH_SIZE,
+        batch_pause: float = DatabaseConstants.MIGRATION_BATCH_PAUSE,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.manager = manager
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.logger = logging.getLogger('discord_bot.db.migrations')
+
+    async def pending(self) -> List[Migration]:
+        """Миграции новее текущей версии базы."""
+        async with self.manager.get_db() as db:
+            version = await schema_version(db)
+        return [migration for migration in self.migrations if migration.version > version]
+
+    async def run(self) -> List[int]:
+        """Применение всех ожидающих миграций. Возвращает их версии."""
+        applied = []
+        for migration in await self.pending():
+            started = time.monotonic()
+            self.logger.info(f"Applying migration {migration.version}: {migration.description}")
+            await self.manager._write_immediate(migration.prepare)
+            copied = 0
+            while True:
+                count = await self.manager._write_immediate(lambda db: migration.copy_batch(db, self.batch_size))
+                if not count:
+                    break
+                copied += count
+                await asyncio.sleep(self.batch_pause)
+            await self.manager._write_immediate(lambda db: migration.finish(db, self.manager))
+            self.logger.info(
+                f"Migration {migration.version} applied: {copied} rows copied in {time.monotonic() - started:.1f}s"
+            )
+            applied.append(migration.version)
+        return applied
@@ -1,15 +1,101 @@
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Any
+import re
+from datetime import datetime, timezone
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple, Union
 
-@dataclass
-class Task:
-    """Модель задачи."""
+# Порядок столбцов, на который рассчитан Task.from_row
+TASK_COLUMNS = "id, user_id, description, status, created_at, due_at"
+
+SEARCH_TERM = re.compile(r'\w+')
+
+def search_terms(query: str) -> List[str]:
+    """Слова поискового запроса в нижнем регистре; знаки препинания отбрасываются."""
+    return SEARCH_TERM.findall(query.casefold())
+
+SECONDS_PER_DAY = 86400
+
+class TaskStats(NamedTuple):
+    """Статистика задач пользователя или всего бота из агрегатных таблиц."""
+    total: int
+    done: int
+    # (день, создано, выполнено); день - номер суток UTC (Unix-время // SECONDS_PER_DAY)
+    daily: List[Tuple[int, int, int]]
+    users: Optional[int] = None  # пользователей с задачами, только в общей статистике
+
+    @property
+    def completion_rate(self) -> float:
+        """Доля выполненных задач."""
+        return self.done / self.total if self.total else 0.0
+
+class BoardTask(NamedTuple):
+    """Задача общей доски канала или сервера.
+
+    version увеличивается при каждом изменении строки; записи сравнивают
+    ее с прочитанной (compare-and-swap), поэтому одновременные правки
+    разных участников не затирают друг друга.
+    """
     id: int
-    user_id: int
+    board_id: int
     description: str
     status: bool
-    created_at: datetime
+    version: int
+    created_by: int
+    updated_by: int
+
+class Reminder(NamedTuple):
+    """Запланированное напоминание; порядок полей - порядок срабатывания."""
+    remind_at: int
+    user_id: int
+    task_id: int
+    channel_id: Optional[int]
+
+class Task:
+    """Модель задачи.
+
+    Занимает фиксированные слоты без __dict__; created_at хранится в том виде,
+    в котором пришел из базы данных (секунды Unix-времени или текст ISO в
+    старой схеме), и разбирается при первом обращении в datetime UTC без
+    часового пояса.
+    due_at - срок задачи в секундах Unix-времени (UTC) или None.
+    """
+    __slots__ = ('id', 'user_id', 'description', 'status', '_created_at', 'due_at')
+
+    def __init__(self, id: int, user_id: int, description: str, status: bool,
+                 created_at: Union[datetime, int, str, None], due_at: Optional[int] = None):
+        self.id = id
+        self.user_id = user_id
+        self.description = description
+        self.status = status
+        self._created_at = created_at
+        self.due_at = due_at
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        """Время создания задачи."""
+        value = self._created_at
+        if isinstance(value, int):
+            value = self._created_at = datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+        elif isinstance(value, str):
+            value = self._created_at = datetime.fromisoformat(value)
+        return value
+
+    @created_at.setter
+    def created_at(self, value: Union[datetime, int, str, None]) -> None:
+        self._created_at = value
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Task):
+            return NotImplemented
+        return (self.id, self.user_id, self.description, self.status, self.created_at, self.due_at) == \
+            (other.id, other.user_id, other.description, other.status, other.created_at, other.due_at)
+
+    def __repr__(self) -> str:
+        return (f"Task(id={self.id!r}, user_id={self.user_id!r}, description={self.description!r}, "
+                f"status={self.status!r}, created_at={self.created_at!r}, due_at={self.due_at!r})")
+
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> 'Task':
+        """Создание объекта Task из кортежа столбцов TASK_COLUMNS."""
+        return cls(row[0], row[1], row[2], bool(row[3]), row[4], row[5] if len(row) > 5 else None)
 
     @classmethod
     def from_db_row(cls, row: Dict[str, Any]) -> 'Task':
@@ -19,15 +105,19 @@ class Task:
             user_id=row['user_id'],
             description=row['description'],
             status=bool(row['status']),
-            created_at=datetime.fromisoformat(row['created_at'])
+            created_at=row['created_at'],
+            due_at=row.get('due_at')
         )
 
     def to_dict(self) -> Dict[str, Any]:
         """Преобразование объекта Task в словарь."""
+        created_at = self.created_at
         return {
             'id': self.id,
             'user_id': self.user_id,
             'description': self.description,
             'status': self.status,
-            'created_at': self.created_at.isoformat()
-        } 
\ No newline at end of file
+            'created_at': created_at.isoformat() if created_at is not None else None,
+            'due_at': (datetime.fromtimestamp(self.due_at, timezone.utc).isoformat()
+                       if self.due_at is not None else None)
+        }
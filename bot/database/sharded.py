@@ -0,0 +1,321 @@
+import asyncio
+import heapq
+import logging
+import os
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+import aiosqlite
+
+from .base import DatabaseManager, DatabaseError
+from .models import BoardTask, Reminder, Task, TaskStats
+from .migrations import TASK_TABLE_COLUMNS, compact_select
+from .sqlite import ARCHIVE_COLUMNS, ArchiveListener, SQLiteDatabaseManager, archive_path_for
+from ..config.settings import DatabaseConstants
+
+_MASK_64 = (1 << 64) - 1
+
+def shard_for_user(user_id: int, shard_count: int) -> int:
+    """Номер шарда пользователя.
+
+    Младшие биты snowflake-ID Discord почти не меняются, поэтому ID сначала
+    перемешивается финализатором splitmix64.
+    """
+    x = (user_id + 0x9E3779B97F4A7C15) & _MASK_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    x ^= x >> 31
+    return x % shard_count
+
+def shard_paths(db_path: str = DatabaseConstants.DB_PATH, shard_count: int = DatabaseConstants.SHARD_COUNT) -> List[str]:
+    """Пути к файлам шардов рядом с основной базой данных."""
+    base, ext = os.path.splitext(db_path)
+    return [DatabaseConstants.SHARD_PATH_TEMPLATE.format(base=base, index=index, ext=ext or '.db')
+            for index in range(shard_count)]
+
+class ShardedSQLiteDatabaseManager(DatabaseManager):
+    """Менеджер базы данных, распределяющий пользователей по нескольким файлам SQLite.
+
+    У каждого шарда свое соединение для записи, поэтому записи в разные
+    шарды выполняются параллельно. Все данные пользователя лежат в одном
+    шарде; ID задач уникальны в пределах шарда. Общая доска выбирает шард
+    по своему ID так же, как пользователь.
+    """
+
+    def __init__(self, paths: Optional[List[str]] = None, **sqlite_options: Any):
+        paths = paths or shard_paths()
+        if not paths:
+            raise ValueError("at least one shard path is required")
+        self.shards = [SQLiteDatabaseManager(db_path=path, **sqlite_options) for path in paths]
+        self.logger = logging.getLogger('discord_bot.db')
+
+    def shard(self, user_id: int) -> SQLiteDatabaseManager:
+        """Шард, в котором хранятся задачи пользователя."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        return self.shards[shard_for_user(user_id, len(self.shards))]
+
+    async def _each_shard(self, operation: Callable[[SQLiteDatabaseManager], Awaitable[Any]]) -> List[Any]:
+        """Выполнение операции на всех шардах параллельно."""
+        return await asyncio.gather(*(operation(shard) for shard in self.shards))
+
+    async def init(self) -> None:
+        """Инициализация всех шардов."""
+        await self._each_shard(lambda shard: shard.init())
+        self.logger.info(f"Sharded database initialized with {len(self.shards)} shards")
+
+    async def close(self) -> None:
+        """Закрытие соединений всех шардов."""
+        results = await asyncio.gather(*(shard.close() for shard in self.shards), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise DatabaseError(f"Failed to close {len(errors)} shards: {errors[0]}")
+
+    async def add_task(self, user_id: int, description: str) -> int:
+        """Добавление новой задачи."""
+        return await self.shard(user_id).add_task(user_id, description)
+
+    async def add_tasks(self, user_id: int, descriptions: List[str], statuses: Optional[List[bool]] = None) -> List[int]:
+        """Добавление нескольких задач одной транзакцией."""
+        return await self.shard(user_id).add_tasks(user_id, descriptions, statuses)
+
+    async def get_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Получение списка задач."""
+        return await self.shard(user_id).get_tasks(user_id, limit, offset)
+
+    async def get_tasks_after(self, user_id: int, after_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Получение задач с ID больше after_id."""
+        return await self.shard(user_id).get_tasks_after(user_id, after_id, limit)
+
+    async def mark_task_done(self, user_id: int, task_id: int, status: bool) -> bool:
+        """Обновление статуса задачи."""
+        return await self.shard(user_id).mark_task_done(user_id, task_id, status)
+
+    async def delete_task(self, user_id: int, task_id: int) -> bool:
+        """Удаление задачи."""
+        return await self.shard(user_id).delete_task(user_id, task_id)
+
+    async def set_status_many(self, user_id: int, task_ids: List[int], status: bool) -> List[int]:
+        """Обновление статуса нескольких задач."""
+        return await self.shard(user_id).set_status_many(user_id, task_ids, status)
+
+    async def delete_many(self, user_id: int, task_ids: List[int]) -> List[int]:
+        """Удаление нескольких задач."""
+        return await self.shard(user_id).delete_many(user_id, task_ids)
+
+    async def iter_tasks(self, user_id: int, chunk_size: int = DatabaseConstants.EXPORT_CHUNK_SIZE) -> AsyncIterator[List[Task]]:
+        """Потоковое чтение задач из шарда пользователя."""
+        async with aclosing(self.shard(user_id).iter_tasks(user_id, chunk_size)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def get_archived_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Задачи из архива шарда пользователя."""
+        return await self.shard(user_id).get_archived_tasks(user_id, limit, offset)
+
+    async def count_archived_tasks(self, user_id: int) -> int:
+        """Количество задач в архиве шарда пользователя."""
+        return await self.shard(user_id).count_archived_tasks(user_id)
+
+    async def search_tasks(self, user_id: int, query: str, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Поиск задач в шарде пользователя."""
+        return await self.shard(user_id).search_tasks(user_id, query, limit, offset)
+
+    async def set_due_date(self, user_id: int, task_id: int, due_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка срока задачи."""
+        return await self.shard(user_id).set_due_date(user_id, task_id, due_at, channel_id)
+
+    async def set_reminder(self, user_id: int, task_id: int, remind_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка или отмена напоминания."""
+        return await self.shard(user_id).set_reminder(user_id, task_id, remind_at, channel_id)
+
+    async def get_due_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Невыполненные задачи со сроком из шарда пользователя."""
+        return await self.shard(user_id).get_due_tasks(user_id, limit)
+
+    async def due_reminders(self, before: int, limit: int) -> List[Reminder]:
+        """Ближайшие напоминания всех шардов, слитые по времени."""
+        results = await self._each_shard(lambda shard: shard.due_reminders(before, limit))
+        return list(heapq.merge(*results, key=lambda reminder: (reminder.remind_at, reminder.task_id)))[:limit]
+
+    async def claim_reminder(self, reminder: Reminder, lease_until: int) -> Optional[Tuple[str, bool]]:
+        """Захват напоминания в шарде пользователя."""
+        return await self.shard(reminder.user_id).claim_reminder(reminder, lease_until)
+
+    async def complete_reminder(self, reminder: Reminder, lease_until: int) -> bool:
+        """Снятие напоминания в шарде пользователя."""
+        return await self.shard(reminder.user_id).complete_reminder(reminder, lease_until)
+
+    async def count_tasks(self, user_id: int, status: Optional[bool] = None) -> int:
+        """Подсчет количества задач."""
+        return await self.shard(user_id).count_tasks(user_id, status)
+
+    async def get_user_stats(self, user_id: int, since_day: int) -> TaskStats:
+        """Статистика пользователя из его шарда."""
+        return await self.shard(user_id).get_user_stats(user_id, since_day)
+
+    async def get_global_stats(self, since_day: int) -> TaskStats:
+        """Сумма статистики всех шардов: пользователи шардов не пересекаются."""
+        results = await self._each_shard(lambda shard: shard.get_global_stats(since_day))
+        daily = {}
+        for stats in results:
+            for day, created, completed in stats.daily:
+                counts = daily.setdefault(day, [0, 0])
+                counts[0] += created
+                counts[1] += completed
+        return TaskStats(
+            sum(stats.total for stats in results),
+            sum(stats.done for stats in results),
+            sorted((day, *counts) for day, counts in daily.items()),
+            sum(stats.users for stats in results),
+        )
+
+    async def add_board_task(self, board_id: int, user_id: int, description: str) -> int:
+        """Добавление задачи на доску в ее шарде."""
+        return await self.shard(board_id).add_board_task(board_id, user_id, description)
+
+    async def get_board_tasks(self, board_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[BoardTask]:
+        """Задачи доски из ее шарда."""
+        return await self.shard(board_id).get_board_tasks(board_id, limit, offset)
+
+    async def get_board_task(self, board_id: int, task_id: int) -> Optional[BoardTask]:
+        """Задача доски из ее шарда."""
+        return await self.shard(board_id).get_board_task(board_id, task_id)
+
+    async def count_board_tasks(self, board_id: int) -> int:
+        """Количество задач доски."""
+        return await self.shard(board_id).count_board_tasks(board_id)
+
+    async def update_board_task(self, board_id: int, task_id: int, version: int, user_id: int,
+                                description: Optional[str] = None, status: Optional[bool] = None) -> Optional[int]:
+        """Изменение задачи доски сравнением версии в ее шарде."""
+        return await self.shard(board_id).update_board_task(board_id, task_id, version, user_id, description, status)
+
+    async def delete_board_task(self, board_id: int, task_id: int, version: int) -> bool:
+        """Удаление задачи доски сравнением версии в ее шарде."""
+        return await self.shard(board_id).delete_board_task(board_id, task_id, version)
+
+    async def rebuild_search_index(self) -> None:
+        """Перестроение поискового индекса во всех шардах."""
+        await self._each_shard(lambda shard: shard.rebuild_search_index())
+
+    async def rebuild_counters(self) -> None:
+        """Пересчет счетчиков задач во всех шардах."""
+        await self._each_shard(lambda shard: shard.rebuild_counters())
+
+    async def rebuild_stats(self) -> None:
+        """Пересчет агрегатов статистики во всех шардах."""
+        await self._each_shard(lambda shard: shard.rebuild_stats())
+
+    async def verify_counters(self) -> List[Tuple[int, int, int, int, int]]:
+        """Сверка счетчиков задач во всех шардах."""
+        results = await self._each_shard(lambda shard: shard.verify_counters())
+        return sorted(mismatch for mismatches in results for mismatch in mismatches)
+
+    def add_archive_listener(self, listener: ArchiveListener) -> None:
+        """Подписка на перенос задач в архив во всех шардах."""
+        for shard in self.shards:
+            shard.add_archive_listener(listener)
+
+    async def archive_done_tasks(self, older_than: Optional[float] = None) -> int:
+        """Перенос старых выполненных задач в архив каждого шарда."""
+        return sum(await self._each_shard(lambda shard: shard.archive_done_tasks(older_than)))
+
+    async def vacuum(self) -> None:
+        """Перестройка файлов всех шардов."""
+        await self._each_shard(lambda shard: shard.vacuum())
+
+async def _copy_into_shard(db: aiosqlite.Connection, source_path: str, index: int, shard_count: int,
+                           source_archive_path: Optional[str] = None) -> int:
+    """Копирование задач пользователей одного шарда из исходной базы и ее архива."""
+    cursor = await db.execute("SELECT 1 FROM tasks LIMIT 1")
+    if await cursor.fetchone() is not None:
+        raise DatabaseError("Shard is not empty")
+
+    await db.create_function(
+        "shard_for_user", 1, lambda user_id: shard_for_user(user_id, shard_count), deterministic=True
+    )
+    await db.execute("ATTACH DATABASE ? AS source", (source_path,))
+    if source_archive_path is not None:
+        await db.execute("ATTACH DATABASE ? AS source_archive", (source_archive_path,))
+    try:
+        cursor = await db.execute("SELECT name FROM pragma_table_info('tasks', 'source')")
+        source_columns = {row[0] for row in await cursor.fetchall()}
+        # Исходная база может быть в старой схеме: строки приводятся к текущей
+        cursor = await db.execute(
+            f"INSERT INTO tasks ({', '.join(TASK_TABLE_COLUMNS)}) SELECT {compact_select(source_columns)} "
+            f"FROM source.tasks WHERE shard_for_user(user_id) = ? ORDER BY id",
+            (index,)
+        )
+        copied = cursor.rowcount
+
+        sources = ["(SELECT MAX(id) FROM source.tasks)"]
+        if source_archive_path is not None:
+            await db.execute(
+                f"INSERT INTO archive.archived_tasks ({ARCHIVE_COLUMNS}) SELECT {ARCHIVE_COLUMNS} "
+                f"FROM source_archive.archived_tasks WHERE shard_for_user(user_id) = ? ORDER BY id",
+                (index,)
+            )
+            sources.append("(SELECT MAX(id) FROM source_archive.archived_tasks)")
+        # Счетчик ID исходной базы: task_sequence или, в старой схеме, sqlite_sequence
+        cursor = await db.execute(
+            "SELECT name FROM source.sqlite_master WHERE type = 'table' AND name IN ('task_sequence', 'sqlite_sequence')"
+        )
+        source_tables = {row[0] for row in await cursor.fetchall()}
+        if 'task_sequence' in source_tables:
+            sources.append("(SELECT seq FROM source.task_sequence)")
+        if 'sqlite_sequence' in source_tables:
+            sources.append("(SELECT seq FROM source.sqlite_sequence WHERE name = 'tasks')")
+
+        start = ", ".join(f"COALESCE({source}, 0)" for source in sources)
+        await db.execute(f"UPDATE task_sequence SET seq = MAX(seq, {start})")
+
+        cursor = await db.execute("SELECT 1 FROM source.sqlite_master WHERE type = 'table' AND name = 'board_tasks'")
+        if await cursor.fetchone() is not None:
+            # Общие доски распределяются по своему ID; total пересчитывают триггеры вставки
+            await db.execute(
+                "INSERT INTO boards (board_id, next_id) SELECT board_id, next_id FROM source.boards "
+                "WHERE shard_for_user(board_id) = ?",
+                (index,)
+            )
+            await db.execute(
+                "INSERT INTO board_tasks SELECT * FROM source.board_tasks WHERE shard_for_user(board_id) = ?", (index,)
+            )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.execute("DETACH DATABASE source")
+        if source_archive_path is not None:
+            await db.execute("DETACH DATABASE source_archive")
+    return copied
+
+async def split_database(source_path: str, paths: List[str]) -> List[int]:
+    """Перенос задач из одного файла SQLite в шарды.
+
+    ID задач сохраняются, а счетчик ID каждого шарда выставляется
+    по исходной базе, чтобы новые задачи не получили ID удаленных. Архив
+    исходной базы, если он есть, раскладывается по архивам шардов. Шарды
+    должны быть пустыми. Возвращает число перенесенных задач по шардам.
+    """
+    if not os.path.exists(source_path):
+        raise DatabaseError(f"Source database {source_path} does not exist")
+    source_archive_path = archive_path_for(source_path)
+    if not os.path.exists(source_archive_path):
+        source_archive_path = None
+
+    counts = []
+    for index, path in enumerate(paths):
+        shard = SQLiteDatabaseManager(db_path=path)
+        await shard.init()
+        try:
+            async with shard.get_db() as db:
+                counts.append(await _copy_into_shard(db, source_path, index, len(paths), source_archive_path))
+            # Копирование учтено триггерами как создание задач сегодня
+            await shard.rebuild_stats()
+        finally:
+            await shard.close()
+    return counts
@@ -1,28 +1,147 @@
 import aiosqlite
 import asyncio
 import logging
+import os
+import time
 from contextlib import asynccontextmanager
-from typing import Optional, List
+from typing import Optional, List, Any, AsyncIterator, Awaitable, Callable, Set, Tuple
+from urllib.parse import quote
 
 from .base import DatabaseManager, DatabaseConnection, DatabaseError
-from .models import Task
+from .migrations import LATEST_VERSION, MigrationRunner, SQL_NOW, compact_tasks_sql, schema_version
+from .models import BoardTask, Reminder, SECONDS_PER_DAY, Task, TaskStats, TASK_COLUMNS, search_terms
 from ..config.settings import DatabaseConstants
+from ..utils.metrics import ARCHIVED_TASKS
+
+WriteOperation = Callable[[DatabaseConnection], Awaitable[Any]]
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+# Не больше стольких параметров в одном списке IN (...)
+IN_CLAUSE_CHUNK = 500
+
+# Столбцы, добавляемые в таблицы, созданные до их появления
+ADDED_COLUMNS = ('due_at', 'remind_at', 'remind_channel_id', 'completed_at')
+
+# Столбцы архивной таблицы: напоминания выполненных задач не переносятся
+ARCHIVE_COLUMNS = f"{TASK_COLUMNS}, completed_at"
+
+# Копии, оставшиеся в архиве после прерванного переноса, скрыты, пока задача есть в tasks
+ARCHIVE_ONLY = "NOT EXISTS (SELECT 1 FROM main.tasks t WHERE t.id = a.id)"
+
+# Текущие сутки UTC и сутки создания задачи (created_at - текст в старой схеме) внутри SQL
+SQL_TODAY = f"({SQL_NOW} / {SECONDS_PER_DAY})"
+SQL_CREATED_DAY = (f"(COALESCE(CASE WHEN typeof(created_at) = 'integer' THEN created_at "
+                   f"ELSE CAST(strftime('%s', created_at) AS INTEGER) END, {SQL_NOW}) / {SECONDS_PER_DAY})")
+
+# Порядок столбцов, на который рассчитан BoardTask
+BOARD_TASK_COLUMNS = "id, board_id, description, status, version, created_by, updated_by"
+
+# Вызывается с user_id, чьи задачи перенесены в архив
+ArchiveListener = Callable[[int], Any]
+
+def archive_path_for(db_path: str) -> str:
+    """Путь к файлу архива рядом с файлом базы данных."""
+    base, ext = os.path.splitext(db_path)
+    return DatabaseConstants.ARCHIVE_PATH_TEMPLATE.format(base=base, ext=ext)
+
+# TASK_COLUMNS для запросов, соединяющих tasks с другими таблицами
+SEARCH_COLUMNS = ', '.join(f't.{column.strip()}' for column in TASK_COLUMNS.split(','))
 
 class SQLiteDatabaseManager(DatabaseManager):
     """Реализация менеджера базы данных для SQLite."""
 
-    def __init__(self, db_path: str = DatabaseConstants.DB_PATH):
+    def __init__(
+        self,
+        db_path: str = DatabaseConstants.DB_PATH,
+        group_commit: bool = DatabaseConstants.GROUP_COMMIT_ENABLED,
+        group_commit_window: float = DatabaseConstants.GROUP_COMMIT_WINDOW,
+        group_commit_max_batch: int = DatabaseConstants.GROUP_COMMIT_MAX_BATCH,
+        wal: bool = DatabaseConstants.WAL_ENABLED,
+        read_pool_size: int = DatabaseConstants.READ_POOL_SIZE,
+        busy_timeout_ms: int = DatabaseConstants.BUSY_TIMEOUT_MS,
+        wal_autocheckpoint: int = DatabaseConstants.WAL_AUTOCHECKPOINT,
+        checkpoint_interval: float = DatabaseConstants.CHECKPOINT_INTERVAL,
+        checkpoint_mode: str = DatabaseConstants.CHECKPOINT_MODE,
+        archive_path: Optional[str] = None,
+        archive_after_days: float = DatabaseConstants.ARCHIVE_AFTER_DAYS,
+        archive_batch_size: int = DatabaseConstants.ARCHIVE_BATCH_SIZE,
+        archive_batch_pause: float = DatabaseConstants.ARCHIVE_BATCH_PAUSE,
+        archive_interval: float = DatabaseConstants.ARCHIVE_INTERVAL,
+        archive_vacuum_pages: int = DatabaseConstants.ARCHIVE_VACUUM_PAGES,
+        migrate_on_start: bool = DatabaseConstants.MIGRATE_ON_START,
+    ):
+        if group_commit_max_batch < 1:
+            raise ValueError("group_commit_max_batch must be positive")
+        if read_pool_size < 1:
+            raise ValueError("read_pool_size must be positive")
+        if checkpoint_mode.upper() not in CHECKPOINT_MODES:
+            raise ValueError(f"checkpoint_mode must be one of {', '.join(CHECKPOINT_MODES)}")
+        if archive_batch_size < 1:
+            raise ValueError("archive_batch_size must be positive")
+
         self.db_path = db_path
         self.lock = asyncio.Lock()
         self.logger = logging.getLogger('discord_bot.db')
         self._connection: Optional[DatabaseConnection] = None
 
+        self.group_commit = group_commit
+        self.group_commit_window = group_commit_window
+        self.group_commit_max_batch = group_commit_max_batch
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        self.wal = wal
+        self.read_pool_size = read_pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.wal_autocheckpoint = wal_autocheckpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_mode = checkpoint_mode.upper()
+        self._readers: Optional[asyncio.Queue] = None
+        self._all_readers: List[DatabaseConnection] = []
+        self._reader_slots = 0
+        self._checkpointer: Optional[asyncio.Task] = None
+
+        self.archive_path = archive_path or archive_path_for(db_path)
+        self.archive_after = archive_after_days * 86400
+        self.archive_batch_size = archive_batch_size
+        self.archive_batch_pause = archive_batch_pause
+        self.archive_interval = archive_interval
+        self.archive_vacuum_pages = archive_vacuum_pages
+        self._archive_listeners: List[ArchiveListener] = []
+        self._archiver: Optional[asyncio.Task] = None
+
+        self.migrate_on_start = migrate_on_start
+        self._migrator: Optional[asyncio.Task] = None
+
+    async def _connect(self, read_only: bool = False) -> DatabaseConnection:
+        """Открытие нового соединения с базой данных."""
+        if read_only:
+            uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            connection = await aiosqlite.connect(uri, uri=True)
+        else:
+            connection = await aiosqlite.connect(self.db_path)
+        await connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        if read_only:
+            archive = f"file:{quote(os.path.abspath(self.archive_path))}?mode=ro"
+        else:
+            # Действует только для новой базы; существующую переводит vacuum()
+            await connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            archive = self.archive_path
+        # Холодный архив - отдельный файл, подключенный к каждому соединению
+        await connection.execute("ATTACH DATABASE ? AS archive", (archive,))
+        if self.wal and not read_only:
+            await connection.execute("PRAGMA journal_mode = WAL")
+            await connection.execute("PRAGMA archive.journal_mode = WAL")
+            await connection.execute(f"PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint)}")
+        return connection
+
     @asynccontextmanager
     async def get_db(self) -> DatabaseConnection:
         """Контекстный менеджер для работы с базой данных."""
         if self._connection is None:
-            self._connection = await aiosqlite.connect(self.db_path)
-            self._connection.row_factory = aiosqlite.Row
+            self._connection = await self._connect()
         
         try:
             async with self._connection.cursor():
@@ -32,91 +151,900 @@ class SQLiteDatabaseManager(DatabaseManager):
             await self._connection.rollback()
             raise DatabaseError(f"Database operation failed: {e}")
 
+    @asynccontextmanager
+    async def read_db(self) -> DatabaseConnection:
+        """Контекстный менеджер для запросов на чтение.
+
+        В WAL-режиме выдает соединение из пула только для чтения, поэтому
+        чтения не ждут в очереди за записями. Иначе использует общее соединение
+        под self.lock: без этого чтение увидело бы незафиксированную пачку
+        записей, а его ошибка откатила бы чужую транзакцию.
+        """
+        if not self.wal:
+            async with self.lock:
+                async with self.get_db() as db:
+                    yield db
+            return
+
+        if self._readers is None:
+            self._readers = asyncio.Queue()
+        if self._readers.empty() and self._reader_slots < self.read_pool_size:
+            self._reader_slots += 1
+            try:
+                connection = await self._connect(read_only=True)
+            except Exception as e:
+                self._reader_slots -= 1
+                raise DatabaseError(f"Failed to open read connection: {e}")
+            self._all_readers.append(connection)
+        else:
+            connection = await self._readers.get()
+
+        try:
+            yield connection
+        except Exception as e:
+            self.logger.error(f"Database read failed: {e}")
+            raise DatabaseError(f"Database operation failed: {e}")
+        finally:
+            if self._readers is not None and connection in self._all_readers:
+                self._readers.put_nowait(connection)
+
+    async def checkpoint(self, mode: Optional[str] = None) -> None:
+        """Перенос журнала WAL в основной файл базы данных."""
+        if not self.wal:
+            return
+        mode = (mode or self.checkpoint_mode).upper()
+        if mode not in CHECKPOINT_MODES:
+            raise ValueError(f"checkpoint mode must be one of {', '.join(CHECKPOINT_MODES)}")
+        async with self.get_db() as db:
+            await db.execute(f"PRAGMA main.wal_checkpoint({mode})")
+            await db.execute(f"PRAGMA archive.wal_checkpoint({mode})")
+
+    async def _checkpoint_loop(self) -> None:
+        """Периодический checkpoint в фоне."""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                self.logger.warning(f"WAL checkpoint failed: {e}")
+
     async def init(self) -> None:
         """Инициализация базы данных с созданием необходимых таблиц и индексов."""
         try:
             async with self.get_db() as db:
-                await self._create_tables(db)
-                await self._create_indexes(db)
+                tasks_exist = await self._table_exists(db, "tasks")
+                counters_exist = await self._table_exists(db, "user_task_counts")
+                search_index_exists = await self._table_exists(db, "tasks_fts")
+                stats_exist = await self._table_exists(db, "user_daily_stats")
+                await self._create_tables(db, tasks_exist)
+                version = await schema_version(db)
+                await self._add_missing_columns(db)
+                await self._create_archive(db)
+                await self._init_task_sequence(db)
+                await self._create_schema_objects(db, version)
+                if not counters_exist:
+                    await self._rebuild_counters(db)
+                if not search_index_exists:
+                    await self._rebuild_search_index(db)
+                if not stats_exist:
+                    await self._rebuild_stats(db)
                 await db.commit()
+            if self.wal and self.checkpoint_interval > 0 and self._checkpointer is None:
+                self._checkpointer = asyncio.create_task(self._checkpoint_loop())
+            if self.archive_after > 0 and self.archive_interval > 0 and self._archiver is None:
+                self._archiver = asyncio.create_task(self._archive_loop())
+            if self.migrate_on_start and version < LATEST_VERSION and self._migrator is None:
+                self._migrator = asyncio.create_task(self._migrate_in_background())
             self.logger.info("Database initialized successfully")
         except Exception as e:
             self.logger.error(f"Database initialization failed: {e}")
             raise DatabaseError(f"Failed to initialize database: {e}")
 
-    async def _create_tables(self, db: DatabaseConnection) -> None:
-        """Создание таблиц базы данных."""
-        max_len = DatabaseConstants.MAX_DESCRIPTION_LENGTH
-        await db.execute(f'''CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+    async def _create_tables(self, db: DatabaseConnection, tasks_exist: bool) -> None:
+        """Создание таблиц базы данных.
+
+        Новая база сразу получает актуальную схему; существующую переводят
+        миграции (migrate).
+        """
+        if not tasks_exist:
+            await db.execute(compact_tasks_sql('tasks'))
+            await db.execute(f"PRAGMA user_version = {LATEST_VERSION}")
+        # Счетчик ID задач: у таблицы без rowid нет AUTOINCREMENT
+        await db.execute("CREATE TABLE IF NOT EXISTS task_sequence (seq INTEGER NOT NULL)")
+        await db.execute('''CREATE TABLE IF NOT EXISTS user_task_counts (
+            user_id INTEGER PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0)''')
+        # Агрегаты для !stats: созданные и выполненные задачи по суткам UTC
+        # и общие итоги; обновляются триггерами в транзакции записи
+        await db.execute('''CREATE TABLE IF NOT EXISTS user_daily_stats (
+            user_id INTEGER NOT NULL,
+            day INTEGER NOT NULL,
+            created INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)) WITHOUT ROWID''')
+        await db.execute('''CREATE TABLE IF NOT EXISTS daily_stats (
+            day INTEGER PRIMARY KEY,
+            created INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0)''')
+        await db.execute('''CREATE TABLE IF NOT EXISTS task_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            users INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0)''')
+        await db.execute("INSERT OR IGNORE INTO task_totals (id) VALUES (0)")
+        # Общие доски: счетчик ID и число задач доски, задачи с версией строки
+        await db.execute('''CREATE TABLE IF NOT EXISTS boards (
+            board_id INTEGER PRIMARY KEY,
+            next_id INTEGER NOT NULL DEFAULT 1,
+            total INTEGER NOT NULL DEFAULT 0)''')
+        await db.execute(f'''CREATE TABLE IF NOT EXISTS board_tasks (
+            board_id INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            description TEXT NOT NULL CHECK(length(description) <= {DatabaseConstants.MAX_DESCRIPTION_LENGTH}),
+            status INTEGER NOT NULL DEFAULT 0 CHECK(status IN (0, 1)),
+            version INTEGER NOT NULL DEFAULT 1,
+            created_by INTEGER NOT NULL,
+            updated_by INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL DEFAULT ({SQL_NOW}),
+            PRIMARY KEY (board_id, id)) STRICT, WITHOUT ROWID''')
+
+    async def _table_exists(self, db: DatabaseConnection, name: str) -> bool:
+        """Проверка существования таблицы."""
+        cursor = await db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        )
+        return await cursor.fetchone() is not None
+
+    async def _add_missing_columns(self, db: DatabaseConnection) -> None:
+        """Добавление новых столбцов в старую таблицу tasks."""
+        cursor = await db.execute("SELECT name FROM pragma_table_info('tasks')")
+        existing = {row[0] for row in await cursor.fetchall()}
+        if 'created_at' not in existing:
+            await db.execute("ALTER TABLE tasks ADD COLUMN created_at TIMESTAMP")
+        for column in ADDED_COLUMNS:
+            if column not in existing:
+                await db.execute(f"ALTER TABLE tasks ADD COLUMN {column} INTEGER")
+        if 'completed_at' not in existing:
+            # Время выполнения старых задач неизвестно: отсчет возраста начинается сейчас
+            await db.execute(f"UPDATE tasks SET completed_at = {SQL_NOW} WHERE COALESCE(status, 0) != 0")
+
+    async def _init_task_sequence(self, db: DatabaseConnection) -> None:
+        """Начальное значение счетчика ID: больше любого выданного ранее ID."""
+        sources = ["(SELECT MAX(id) FROM tasks)", "(SELECT MAX(id) FROM archive.archived_tasks)"]
+        if await self._table_exists(db, "sqlite_sequence"):
+            sources.append("(SELECT seq FROM sqlite_sequence WHERE name = 'tasks')")
+        start = ", ".join(f"COALESCE({source}, 0)" for source in sources)
+        await db.execute(
+            f"INSERT INTO task_sequence (seq) SELECT MAX(0, {start}) WHERE NOT EXISTS (SELECT 1 FROM task_sequence)"
+        )
+
+    async def _allocate_task_ids(self, db: DatabaseConnection, count: int) -> int:
+        """Выделение count идущих подряд ID в текущей транзакции. Возвращает первый."""
+        await db.execute("UPDATE task_sequence SET seq = seq + ?", (count,))
+        cursor = await db.execute("SELECT seq FROM task_sequence")
+        return (await cursor.fetchone())[0] - count + 1
+
+    async def _create_schema_objects(self, db: DatabaseConnection, version: int) -> None:
+        """Индексы и триггеры таблицы tasks для схемы заданной версии."""
+        await self._create_indexes(db, version)
+        await self._create_triggers(db)
+        await self._create_search_index(db)
+
+    async def _create_archive(self, db: DatabaseConnection) -> None:
+        """Создание таблицы задач в подключенном файле архива."""
+        await db.execute("PRAGMA archive.auto_vacuum = INCREMENTAL")
+        await db.execute('''CREATE TABLE IF NOT EXISTS archive.archived_tasks (
+            id INTEGER PRIMARY KEY,
             user_id INTEGER NOT NULL,
-            description TEXT NOT NULL CHECK(length(description) <= {max_len}),
-            status BOOLEAN DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+            description TEXT NOT NULL,
+            status BOOLEAN,
+            created_at TIMESTAMP,
+            due_at INTEGER,
+            completed_at INTEGER)''')
+        await db.execute("CREATE INDEX IF NOT EXISTS archive.idx_archive_user_task ON archived_tasks(user_id, id);")
 
-    async def _create_indexes(self, db: DatabaseConnection) -> None:
+    async def _create_indexes(self, db: DatabaseConnection, version: int) -> None:
         """Создание индексов для оптимизации запросов."""
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON tasks(user_id);")
-        await db.execute("CREATE INDEX IF NOT EXISTS idx_user_task ON tasks(user_id, id);")
+        if version == 0:
+            # Старая таблица с rowid: задачи пользователя находятся через индексы
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_user_id ON tasks(user_id);")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_user_task ON tasks(user_id, id);")
+        else:
+            # Ключ таблицы - (user_id, id); поиск задачи только по ID идет через этот индекс
+            await db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_task_id ON tasks(id);")
+        # Частичные индексы: задачи без срока и напоминания в них не попадают
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_user_due ON tasks(user_id, due_at) WHERE due_at IS NOT NULL;")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_remind_at ON tasks(remind_at) WHERE remind_at IS NOT NULL;")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_completed_at ON tasks(completed_at) WHERE completed_at IS NOT NULL;")
+
+    async def _create_triggers(self, db: DatabaseConnection) -> None:
+        """Создание триггеров, поддерживающих счетчики задач пользователей."""
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_task_counts_insert AFTER INSERT ON tasks
+        BEGIN
+            INSERT INTO user_task_counts (user_id, total, done) VALUES (NEW.user_id, 1, COALESCE(NEW.status, 0) != 0)
+            ON CONFLICT(user_id) DO UPDATE SET total = total + 1, done = done + excluded.done;
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_task_counts_delete AFTER DELETE ON tasks
+        BEGIN
+            UPDATE user_task_counts
+            SET total = total - 1, done = done - (COALESCE(OLD.status, 0) != 0)
+            WHERE user_id = OLD.user_id;
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_task_counts_update AFTER UPDATE OF user_id, status ON tasks
+        WHEN OLD.user_id != NEW.user_id OR (COALESCE(OLD.status, 0) != 0) != (COALESCE(NEW.status, 0) != 0)
+        BEGIN
+            UPDATE user_task_counts
+            SET total = total - 1, done = done - (COALESCE(OLD.status, 0) != 0)
+            WHERE user_id = OLD.user_id;
+            INSERT INTO user_task_counts (user_id, total, done) VALUES (NEW.user_id, 1, COALESCE(NEW.status, 0) != 0)
+            ON CONFLICT(user_id) DO UPDATE SET total = total + 1, done = done + excluded.done;
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_board_total_insert AFTER INSERT ON board_tasks
+        BEGIN
+            UPDATE boards SET total = total + 1 WHERE board_id = NEW.board_id;
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_board_total_delete AFTER DELETE ON board_tasks
+        BEGIN
+            UPDATE boards SET total = total - 1 WHERE board_id = OLD.board_id;
+        END''')
+        await self._create_stats_triggers(db)
+        # Время выполнения, по которому задачи уходят в архив
+        await db.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_tasks_completed_at AFTER UPDATE OF status ON tasks
+        WHEN (COALESCE(OLD.status, 0) != 0) != (COALESCE(NEW.status, 0) != 0)
+        BEGIN
+            UPDATE tasks SET completed_at = CASE WHEN COALESCE(NEW.status, 0) != 0 THEN {SQL_NOW} END
+            WHERE id = NEW.id;
+        END''')
+        await db.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_tasks_completed_at_insert AFTER INSERT ON tasks
+        WHEN COALESCE(NEW.status, 0) != 0 AND NEW.completed_at IS NULL
+        BEGIN
+            UPDATE tasks SET completed_at = {SQL_NOW} WHERE id = NEW.id;
+        END''')
+
+    async def _create_stats_triggers(self, db: DatabaseConnection) -> None:
+        """Триггеры агрегатов статистики.
+
+        Созданные и выполненные задачи учитываются по суткам в момент записи;
+        удаление и перенос в архив историю не меняют, а снятие отметки
+        вычитается из суток, когда задача была выполнена. Общие итоги
+        следуют за счетчиками user_task_counts.
+        """
+        completed = "(COALESCE(NEW.status, 0) != 0)"
+        for table, key, values in (
+            ('user_daily_stats', 'user_id, day', 'NEW.user_id, '),
+            ('daily_stats', 'day', ''),
+        ):
+            await db.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON tasks
+            BEGIN
+                INSERT INTO {table} ({key}, created, completed) VALUES ({values}{SQL_TODAY}, 1, {completed})
+                ON CONFLICT({key}) DO UPDATE SET created = created + 1, completed = completed + excluded.completed;
+            END''')
+            await db.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_status AFTER UPDATE OF status ON tasks
+            WHEN (COALESCE(OLD.status, 0) != 0) != {completed}
+            BEGIN
+                INSERT INTO {table} ({key}, created, completed) VALUES (
+                    {values}CASE WHEN {completed} THEN {SQL_TODAY}
+                        ELSE COALESCE(OLD.completed_at, {SQL_NOW}) / {SECONDS_PER_DAY} END,
+                    0, CASE WHEN {completed} THEN 1 ELSE -1 END)
+                ON CONFLICT({key}) DO UPDATE SET completed = completed + excluded.completed;
+            END''')
+
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_task_totals_insert AFTER INSERT ON user_task_counts
+        BEGIN
+            UPDATE task_totals SET users = users + (NEW.total > 0), total = total + NEW.total, done = done + NEW.done
+            WHERE id = 0;
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_task_totals_update AFTER UPDATE ON user_task_counts
+        BEGIN
+            UPDATE task_totals
+            SET users = users + (NEW.total > 0) - (OLD.total > 0),
+                total = total + NEW.total - OLD.total,
+                done = done + NEW.done - OLD.done
+            WHERE id = 0;
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_task_totals_delete AFTER DELETE ON user_task_counts
+        BEGIN
+            UPDATE task_totals SET users = users - (OLD.total > 0), total = total - OLD.total, done = done - OLD.done
+            WHERE id = 0;
+        END''')
+
+    async def _create_search_index(self, db: DatabaseConnection) -> None:
+        """Создание полнотекстового индекса FTS5 по описаниям задач.
+
+        Индекс хранит только токены (external content), сами описания
+        берутся из tasks; синхронизацию обеспечивают триггеры.
+        """
+        await db.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            description, content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2')''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_insert AFTER INSERT ON tasks
+        BEGIN
+            INSERT INTO tasks_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_delete AFTER DELETE ON tasks
+        BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+        END''')
+        await db.execute('''CREATE TRIGGER IF NOT EXISTS trg_tasks_fts_update AFTER UPDATE OF description ON tasks
+        BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, description) VALUES ('delete', OLD.id, OLD.description);
+            INSERT INTO tasks_fts (rowid, description) VALUES (NEW.id, NEW.description);
+        END''')
+
+    async def _rebuild_search_index(self, db: DatabaseConnection) -> None:
+        """Заполнение поискового индекса по содержимому таблицы tasks."""
+        await db.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+    async def rebuild_search_index(self) -> None:
+        """Полное перестроение поискового индекса."""
+        try:
+            await self._write(self._rebuild_search_index)
+            self.logger.info("Search index rebuilt")
+        except Exception as e:
+            self.logger.error(f"Error rebuilding search index: {e}")
+            raise DatabaseError(f"Failed to rebuild search index: {e}")
+
+    async def _rebuild_counters(self, db: DatabaseConnection) -> None:
+        """Пересчет счетчиков задач по содержимому таблицы tasks."""
+        await db.execute("DELETE FROM user_task_counts")
+        await db.execute('''INSERT INTO user_task_counts (user_id, total, done)
+            SELECT user_id, COUNT(*), SUM(COALESCE(status, 0) != 0) FROM tasks GROUP BY user_id''')
+
+    async def rebuild_counters(self) -> None:
+        """Полный пересчет счетчиков задач, например для старой базы данных."""
+        try:
+            await self._write(self._rebuild_counters)
+            self.logger.info("Task counters rebuilt")
+        except Exception as e:
+            self.logger.error(f"Error rebuilding task counters: {e}")
+            raise DatabaseError(f"Failed to rebuild task counters: {e}")
+
+    async def _rebuild_stats(self, db: DatabaseConnection) -> None:
+        """Пересчет агрегатов статистики по задачам и архиву.
+
+        Удаленные задачи и снятые отметки восстановить нельзя, поэтому
+        после пересчета учитываются только существующие задачи.
+        """
+        done = "COALESCE(status, 0) != 0 AND completed_at IS NOT NULL"
+        await db.execute("DELETE FROM user_daily_stats")
+        await db.execute(f'''INSERT INTO user_daily_stats (user_id, day, created, completed)
+            SELECT user_id, day, SUM(created), SUM(completed) FROM (
+                SELECT user_id, {SQL_CREATED_DAY} AS day, 1 AS created, 0 AS completed FROM tasks
+                UNION ALL
+                SELECT user_id, completed_at / {SECONDS_PER_DAY}, 0, 1 FROM tasks WHERE {done}
+                UNION ALL
+                SELECT user_id, {SQL_CREATED_DAY}, 1, 0 FROM archive.archived_tasks a WHERE {ARCHIVE_ONLY}
+                UNION ALL
+                SELECT user_id, completed_at / {SECONDS_PER_DAY}, 0, 1 FROM archive.archived_tasks a
+                WHERE {done} AND {ARCHIVE_ONLY}
+            ) GROUP BY user_id, day''')
+        await db.execute("DELETE FROM daily_stats")
+        await db.execute('''INSERT INTO daily_stats (day, created, completed)
+            SELECT day, SUM(created), SUM(completed) FROM user_daily_stats GROUP BY day''')
+        await db.execute('''UPDATE task_totals
+            SET (users, total, done) = (
+                SELECT COALESCE(SUM(total > 0), 0), COALESCE(SUM(total), 0), COALESCE(SUM(done), 0) FROM user_task_counts)
+            WHERE id = 0''')
+
+    async def rebuild_stats(self) -> None:
+        """Заполнение агрегатов статистики по существующим данным."""
+        try:
+            await self._write(self._rebuild_stats)
+            self.logger.info("Task statistics rebuilt")
+        except Exception as e:
+            self.logger.error(f"Error rebuilding task statistics: {e}")
+            raise DatabaseError(f"Failed to rebuild task statistics: {e}")
+
+    async def verify_counters(self) -> List[Tuple[int, int, int, int, int]]:
+        """Сверка счетчиков с таблицей tasks.
+
+        Возвращает расхождения в виде (user_id, ожидаемое total, ожидаемое done,
+        фактическое total, фактическое done).
+        """
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute('''
+                    WITH expected AS (
+                        SELECT user_id, COUNT(*) AS total, SUM(COALESCE(status, 0) != 0) AS done
+                        FROM tasks GROUP BY user_id
+                    )
+                    SELECT e.user_id, e.total, e.done, COALESCE(c.total, 0), COALESCE(c.done, 0)
+                    FROM expected e LEFT JOIN user_task_counts c ON c.user_id = e.user_id
+                    WHERE c.user_id IS NULL OR c.total != e.total OR c.done != e.done
+                    UNION ALL
+                    SELECT c.user_id, 0, 0, c.total, c.done
+                    FROM user_task_counts c
+                    WHERE (c.total != 0 OR c.done != 0)
+                      AND NOT EXISTS (SELECT 1 FROM expected e WHERE e.user_id = c.user_id)
+                    ORDER BY 1''')
+                return [tuple(row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error verifying task counters: {e}")
+            raise DatabaseError(f"Failed to verify task counters: {e}")
+
+    def add_archive_listener(self, listener: ArchiveListener) -> None:
+        """Подписка на перенос задач пользователя в архив (например, сброс кэша)."""
+        self._archive_listeners.append(listener)
+
+    async def _copy_to_archive(self, db: DatabaseConnection, cutoff: int) -> List[int]:
+        """Первая транзакция пачки: копирование самых старых выполненных задач в архив."""
+        cursor = await db.execute(
+            "SELECT id FROM main.tasks WHERE completed_at <= ? ORDER BY completed_at LIMIT ?",
+            (cutoff, self.archive_batch_size)
+        )
+        task_ids = [row[0] for row in await cursor.fetchall()]
+        if task_ids:
+            placeholders = ", ".join("?" * len(task_ids))
+            await db.execute(
+                f"""INSERT OR REPLACE INTO archive.archived_tasks ({ARCHIVE_COLUMNS})
+                SELECT {ARCHIVE_COLUMNS} FROM main.tasks WHERE id IN ({placeholders})""",
+                task_ids
+            )
+        return task_ids
+
+    async def _remove_archived(self, db: DatabaseConnection, task_ids: List[int], cutoff: int) -> Tuple[int, Set[int]]:
+        """Вторая транзакция пачки: удаление скопированных задач из основной базы.
+
+        Задачи, снова открытые между транзакциями, остаются в основной базе,
+        а их копии удаляются из архива.
+        """
+        placeholders = ", ".join("?" * len(task_ids))
+        selection = f"id IN ({placeholders}) AND completed_at <= ?"
+        cursor = await db.execute(f"SELECT DISTINCT user_id FROM main.tasks WHERE {selection}", (*task_ids, cutoff))
+        user_ids = {row[0] for row in await cursor.fetchall()}
+        cursor = await db.execute(f"DELETE FROM main.tasks WHERE {selection}", (*task_ids, cutoff))
+        removed = cursor.rowcount
+        await db.execute(
+            f"DELETE FROM archive.archived_tasks WHERE id IN ({placeholders}) AND id IN (SELECT id FROM main.tasks)",
+            task_ids
+        )
+        return removed, user_ids
+
+    async def _incremental_vacuum(self) -> None:
+        """Возврат ограниченного числа свободных страниц основной базы файловой системе."""
+        async with self.lock:
+            async with self.get_db() as db:
+                # execute() делает один шаг прагмы и освобождает одну страницу,
+                # executescript() выполняет ее до конца
+                await db.executescript(f"PRAGMA main.incremental_vacuum({int(self.archive_vacuum_pages)});")
+
+    async def archive_done_tasks(self, older_than: Optional[float] = None) -> int:
+        """Перенос выполненных задач старше older_than секунд в архив.
+
+        Задачи переносятся пачками по archive_batch_size с паузой между ними,
+        чтобы не занимать запись надолго. Каждая пачка - две короткие
+        транзакции: копирование в архив и удаление из основной базы. Атомарность
+        транзакции над двумя файлами в WAL не гарантируется, поэтому перенос
+        идемпотентен: после сбоя между ними задача остается в обеих таблицах
+        (копия в архиве скрыта от чтения) и удаляется из основной базы при
+        следующем проходе. В конце
+        incremental_vacuum возвращает освободившиеся страницы.
+
+        Возвращает количество перенесенных задач.
+        """
+        older_than = self.archive_after if older_than is None else older_than
+        cutoff = int(time.time() - older_than)
+        archived = 0
+        try:
+            while True:
+                task_ids = await self._write(lambda db: self._copy_to_archive(db, cutoff))
+                if not task_ids:
+                    break
+                removed, user_ids = await self._write(lambda db: self._remove_archived(db, task_ids, cutoff))
+                archived += removed
+                ARCHIVED_TASKS.inc(amount=removed)
+                for user_id in user_ids:
+                    for listener in self._archive_listeners:
+                        listener(user_id)
+                if len(task_ids) < self.archive_batch_size:
+                    break
+                await asyncio.sleep(self.archive_batch_pause)
+            if archived:
+                await self._incremental_vacuum()
+                self.logger.info(f"Archived {archived} completed tasks")
+            return archived
+        except Exception as e:
+            self.logger.error(f"Error archiving tasks: {e}")
+            raise DatabaseError(f"Failed to archive tasks: {e}")
+
+    async def _archive_loop(self) -> None:
+        """Периодический перенос старых выполненных задач в архив."""
+        while True:
+            await asyncio.sleep(self.archive_interval)
+            try:
+                await self.archive_done_tasks()
+            except Exception as e:
+                self.logger.warning(f"Task archiving failed: {e}")
+
+    async def migrate(self) -> List[int]:
+        """Применение ожидающих миграций схемы. Возвращает их версии."""
+        try:
+            return await MigrationRunner(self).run()
+        except Exception as e:
+            self.logger.error(f"Schema migration failed: {e}")
+            raise DatabaseError(f"Failed to migrate database: {e}")
+
+    async def _migrate_in_background(self) -> None:
+        """Миграция при запуске; бот в это время работает со старой схемой."""
+        try:
+            await self.migrate()
+        except Exception as e:
+            self.logger.warning(f"Background schema migration stopped, it continues on next start: {e}")
+
+    async def vacuum(self) -> None:
+        """Полная перестройка файлов базы и архива.
+
+        Заодно включает incremental auto_vacuum в базах, созданных без него:
+        для существующего файла режим меняется только через VACUUM.
+        """
+        try:
+            async with self.lock:
+                async with self.get_db() as db:
+                    await db.commit()
+                    for schema in ('main', 'archive'):
+                        await db.execute(f"PRAGMA {schema}.auto_vacuum = INCREMENTAL")
+                        await db.execute(f"VACUUM {schema}")
+            self.logger.info("Database vacuumed")
+        except Exception as e:
+            self.logger.error(f"Error vacuuming database: {e}")
+            raise DatabaseError(f"Failed to vacuum database: {e}")
+
+    async def _write(self, operation: WriteOperation) -> Any:
+        """Выполнение операции записи с коммитом.
+
+        В режиме группового коммита операция ставится в очередь, а результат
+        возвращается только после фиксации всей пачки.
+        """
+        if not self.group_commit:
+            async with self.lock:
+                async with self.get_db() as db:
+                    result = await operation(db)
+                    await db.commit()
+                    return result
+
+        if self._flusher is None or self._flusher.done():
+            if self._write_queue is None:
+                self._write_queue = asyncio.Queue()
+                self._batch_full = asyncio.Event()
+            else:
+                # Записи, оставшиеся в очереди остановленной задачи, не будут зафиксированы
+                self._fail_queued_writes(DatabaseError("Group commit writer stopped"))
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((operation, future))
+        if self._write_queue.qsize() >= self.group_commit_max_batch - 1:
+            self._batch_full.set()
+        return await future
+
+    async def _write_immediate(self, operation: WriteOperation) -> Any:
+        """Выполнение операции записи в отдельной транзакции BEGIN IMMEDIATE.
+
+        Блокировка записи берется в начале транзакции, поэтому другой
+        процесс, пишущий в ту же базу, ждет ее в пределах busy_timeout, а не
+        получает SQLITE_BUSY при повышении чтения до записи. Очередь
+        группового коммита не используется: пачки и эта операция разделяют
+        блокировку записи процесса.
+        """
+        async with self.lock:
+            async with self.get_db() as db:
+                await db.execute("BEGIN IMMEDIATE")
+                result = await operation(db)
+                await db.commit()
+                return result
+
+    async def _flush_loop(self) -> None:
+        """Фоновая задача, фиксирующая накопленные записи пачками."""
+        queue = self._write_queue
+        while True:
+            batch = [await queue.get()]
+            if self.group_commit_window > 0 and queue.qsize() < self.group_commit_max_batch - 1:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.group_commit_window)
+                except asyncio.TimeoutError:
+                    pass
+
+            while len(batch) < self.group_commit_max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(DatabaseError("Group commit writer stopped"))
+                    queue.task_done()
+
+    def _fail_queued_writes(self, error: DatabaseError) -> None:
+        """Завершение ошибкой записей, ожидающих в очереди группового коммита."""
+        while not self._write_queue.empty():
+            _, future = self._write_queue.get_nowait()
+            self._write_queue.task_done()
+            if not future.done():
+                future.set_exception(error)
+
+    async def _commit_batch(self, batch: List[Tuple[WriteOperation, asyncio.Future]]) -> None:
+        """Выполнение пачки операций в одной транзакции.
+
+        Каждая операция изолирована точкой сохранения, поэтому ошибка одной
+        записи не откатывает остальные.
+        """
+        outcomes = []
+        try:
+            async with self.lock:
+                async with self.get_db() as db:
+                    await db.execute("BEGIN")
+                    for operation, future in batch:
+                        await db.execute("SAVEPOINT group_write")
+                        try:
+                            value = await operation(db)
+                        except Exception as e:
+                            await db.execute("ROLLBACK TO group_write")
+                            outcomes.append((future, None, e))
+                        else:
+                            outcomes.append((future, value, None))
+                        await db.execute("RELEASE group_write")
+                    await db.commit()
+        except Exception as e:
+            self.logger.error(f"Group commit of {len(batch)} writes failed: {e}")
+            error = e if isinstance(e, DatabaseError) else DatabaseError(f"Group commit failed: {e}")
+            outcomes = [(future, None, error) for _, future in batch]
+
+        for future, value, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
 
     async def close(self) -> None:
         """Закрытие соединения с базой данных."""
+        if self._migrator is not None:
+            # Прогресс сохранен в базе: миграция продолжится при следующем запуске
+            self._migrator.cancel()
+            await asyncio.gather(self._migrator, return_exceptions=True)
+            self._migrator = None
+
+        if self._flusher is not None:
+            if not self._flusher.done():
+                await self._write_queue.join()
+                self._flusher.cancel()
+                await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+        if self._checkpointer is not None:
+            self._checkpointer.cancel()
+            await asyncio.gather(self._checkpointer, return_exceptions=True)
+            self._checkpointer = None
+
+        if self._archiver is not None:
+            # Прерванную пачку доделает следующий проход
+            self._archiver.cancel()
+            await asyncio.gather(self._archiver, return_exceptions=True)
+            self._archiver = None
+
+        for reader in self._all_readers:
+            await reader.close()
+        self._all_readers = []
+        self._reader_slots = 0
+        self._readers = None
+
         if self._connection is not None:
+            if self.wal:
+                try:
+                    await self.checkpoint()
+                except Exception as e:
+                    self.logger.warning(f"WAL checkpoint on close failed: {e}")
             await self._connection.close()
             self._connection = None
             self.logger.info("Database connection closed")
 
+    def _truncate_description(self, user_id: int, description: str) -> str:
+        """Обрезка описания до допустимой длины."""
+        if len(description) > DatabaseConstants.MAX_DESCRIPTION_LENGTH:
+            self.logger.warning(f"Task description truncated for user {user_id}")
+            return description[:DatabaseConstants.MAX_DESCRIPTION_LENGTH]
+        return description
+
+    async def _existing_task_ids(self, db: DatabaseConnection, user_id: int, task_ids: List[int]) -> List[int]:
+        """ID задач пользователя из списка, которые есть в базе."""
+        found = []
+        unique_ids = sorted(set(task_ids))
+        for start in range(0, len(unique_ids), IN_CLAUSE_CHUNK):
+            chunk = unique_ids[start:start + IN_CLAUSE_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = await db.execute(
+                f"SELECT id FROM tasks WHERE user_id = ? AND id IN ({placeholders}) ORDER BY id",
+                (user_id, *chunk)
+            )
+            found.extend(row[0] for row in await cursor.fetchall())
+        return found
+
     async def add_task(self, user_id: int, description: str) -> int:
         """Добавление новой задачи."""
         if not isinstance(user_id, int):
             raise ValueError("user_id must be an integer")
             
-        if len(description) > DatabaseConstants.MAX_DESCRIPTION_LENGTH:
-            description = description[:DatabaseConstants.MAX_DESCRIPTION_LENGTH]
-            self.logger.warning(f"Task description truncated for user {user_id}")
+        description = self._truncate_description(user_id, description)
         
+        async def insert(db: DatabaseConnection) -> int:
+            task_id = await self._allocate_task_ids(db, 1)
+            await db.execute(
+                "INSERT INTO tasks (id, user_id, description) VALUES (?, ?, ?)",
+                (task_id, user_id, description)
+            )
+            return task_id
+
         try:
-            async with self.get_db() as db:
-                cursor = await db.execute(
-                    "INSERT INTO tasks (user_id, description) VALUES (?, ?)",
-                    (user_id, description)
-                )
-                await db.commit()
-                return cursor.lastrowid
+            return await self._write(insert)
         except Exception as e:
             self.logger.error(f"Error adding task: {e}")
             raise DatabaseError(f"Failed to add task: {e}")
 
+    async def add_tasks(self, user_id: int, descriptions: List[str], statuses: Optional[List[bool]] = None) -> List[int]:
+        """Добавление нескольких задач через executemany в одной транзакции."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        if not descriptions:
+            return []
+        if statuses is not None and len(statuses) != len(descriptions):
+            raise ValueError("statuses must match descriptions")
+
+        descriptions = [self._truncate_description(user_id, description) for description in descriptions]
+        statuses = statuses or [False] * len(descriptions)
+
+        async def insert_many(db: DatabaseConnection) -> List[int]:
+            first_id = await self._allocate_task_ids(db, len(descriptions))
+            task_ids = list(range(first_id, first_id + len(descriptions)))
+            await db.executemany(
+                "INSERT INTO tasks (id, user_id, description, status) VALUES (?, ?, ?, ?)",
+                [(task_id, user_id, description, int(bool(status)))
+                 for task_id, description, status in zip(task_ids, descriptions, statuses)]
+            )
+            return task_ids
+
+        try:
+            return await self._write(insert_many)
+        except Exception as e:
+            self.logger.error(f"Error adding {len(descriptions)} tasks: {e}")
+            raise DatabaseError(f"Failed to add tasks: {e}")
+
     async def get_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
         """Получение списка задач с пагинацией."""
         if not isinstance(user_id, int):
             raise ValueError("user_id must be an integer")
             
         try:
-            async with self.get_db() as db:
+            async with self.read_db() as db:
                 cursor = await db.execute(
-                    "SELECT * FROM tasks WHERE user_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                    f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ? ORDER BY id LIMIT ? OFFSET ?",
                     (user_id, limit, offset)
                 )
                 rows = await cursor.fetchall()
-                return [Task.from_db_row(dict(row)) for row in rows]
+                return [Task.from_row(row) for row in rows]
         except Exception as e:
             self.logger.error(f"Error getting tasks: {e}")
             raise DatabaseError(f"Failed to retrieve tasks: {e}")
 
+    async def get_tasks_after(self, user_id: int, after_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Получение задач после заданного ID по индексу idx_user_task."""
+        if not isinstance(user_id, int) or not isinstance(after_id, int):
+            raise ValueError("user_id and after_id must be integers")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (user_id, after_id, limit)
+                )
+                rows = await cursor.fetchall()
+                return [Task.from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting tasks after {after_id}: {e}")
+            raise DatabaseError(f"Failed to retrieve tasks: {e}")
+
+    async def iter_tasks(self, user_id: int, chunk_size: int = DatabaseConstants.EXPORT_CHUNK_SIZE) -> AsyncIterator[List[Task]]:
+        """Потоковое чтение задач пользователя через fetchmany, включая архив.
+
+        Соединение занято, пока итерация не закончена или не закрыта.
+        """
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        async with self.read_db() as db:
+            cursor = await db.execute(
+                f"""SELECT {TASK_COLUMNS} FROM main.tasks WHERE user_id = ?
+                UNION ALL
+                SELECT {TASK_COLUMNS} FROM archive.archived_tasks a WHERE user_id = ? AND {ARCHIVE_ONLY}
+                ORDER BY id""",
+                (user_id, user_id)
+            )
+            try:
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [Task.from_row(row) for row in rows]
+            finally:
+                await cursor.close()
+
+    async def get_archived_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Задачи пользователя из архива по индексу idx_archive_user_task."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f"""SELECT {TASK_COLUMNS} FROM archive.archived_tasks a WHERE user_id = ? AND {ARCHIVE_ONLY}
+                    ORDER BY id LIMIT ? OFFSET ?""",
+                    (user_id, limit, offset)
+                )
+                rows = await cursor.fetchall()
+                return [Task.from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting archived tasks: {e}")
+            raise DatabaseError(f"Failed to retrieve archived tasks: {e}")
+
+    async def count_archived_tasks(self, user_id: int) -> int:
+        """Количество задач пользователя в архиве."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f"SELECT COUNT(*) FROM archive.archived_tasks a WHERE user_id = ? AND {ARCHIVE_ONLY}", (user_id,)
+                )
+                return (await cursor.fetchone())[0]
+        except Exception as e:
+            self.logger.error(f"Error counting archived tasks: {e}")
+            raise DatabaseError(f"Failed to count archived tasks: {e}")
+
+    async def search_tasks(self, user_id: int, query: str, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[Task]:
+        """Поиск по индексу tasks_fts с ранжированием bm25.
+
+        Каждое слово запроса ищется как префикс, все слова должны найтись.
+        """
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+        terms = search_terms(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"*' for term in terms)
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f'''SELECT {SEARCH_COLUMNS} FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+                    WHERE tasks_fts MATCH ? AND t.user_id = ?
+                    ORDER BY tasks_fts.rank, t.id LIMIT ? OFFSET ?''',
+                    (match, user_id, limit, offset)
+                )
+                rows = await cursor.fetchall()
+                return [Task.from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error searching tasks: {e}")
+            raise DatabaseError(f"Failed to search tasks: {e}")
+
     async def mark_task_done(self, user_id: int, task_id: int, status: bool) -> bool:
         """Обновление статуса задачи."""
         if not isinstance(user_id, int) or not isinstance(task_id, int):
             raise ValueError("user_id and task_id must be integers")
             
+        async def update(db: DatabaseConnection) -> int:
+            cursor = await db.execute(
+                "UPDATE tasks SET status = ? WHERE id = ? AND user_id = ?",
+                (status, task_id, user_id)
+            )
+            return cursor.rowcount
+
         try:
-            async with self.get_db() as db:
-                cursor = await db.execute(
-                    "UPDATE tasks SET status = ? WHERE id = ? AND user_id = ?",
-                    (status, task_id, user_id)
-                )
-                await db.commit()
-                return cursor.rowcount > 0
+            return await self._write(update) > 0
         except Exception as e:
             self.logger.error(f"Error marking task {task_id} as {'done' if status else 'not done'}: {e}")
             raise DatabaseError(f"Failed to update task status: {e}")
@@ -126,37 +1054,340 @@ class SQLiteDatabaseManager(DatabaseManager):
         if not isinstance(user_id, int) or not isinstance(task_id, int):
             raise ValueError("user_id and task_id must be integers")
             
+        async def delete(db: DatabaseConnection) -> int:
+            cursor = await db.execute(
+                "DELETE FROM tasks WHERE id = ? AND user_id = ?",
+                (task_id, user_id)
+            )
+            return cursor.rowcount
+
         try:
-            async with self.get_db() as db:
-                cursor = await db.execute(
-                    "DELETE FROM tasks WHERE id = ? AND user_id = ?",
-                    (task_id, user_id)
-                )
-                await db.commit()
-                return cursor.rowcount > 0
+            return await self._write(delete) > 0
         except Exception as e:
             self.logger.error(f"Error deleting task {task_id}: {e}")
             raise DatabaseError(f"Failed to delete task: {e}")
 
+    async def set_status_many(self, user_id: int, task_ids: List[int], status: bool) -> List[int]:
+        """Обновление статуса нескольких задач в одной транзакции."""
+        if not isinstance(user_id, int) or not all(isinstance(task_id, int) for task_id in task_ids):
+            raise ValueError("user_id and task_ids must be integers")
+
+        async def update_many(db: DatabaseConnection) -> List[int]:
+            found = await self._existing_task_ids(db, user_id, task_ids)
+            await db.executemany(
+                "UPDATE tasks SET status = ? WHERE id = ? AND user_id = ?",
+                [(status, task_id, user_id) for task_id in found]
+            )
+            return found
+
+        try:
+            return await self._write(update_many)
+        except Exception as e:
+            self.logger.error(f"Error updating status of {len(task_ids)} tasks: {e}")
+            raise DatabaseError(f"Failed to update task status: {e}")
+
+    async def delete_many(self, user_id: int, task_ids: List[int]) -> List[int]:
+        """Удаление нескольких задач в одной транзакции."""
+        if not isinstance(user_id, int) or not all(isinstance(task_id, int) for task_id in task_ids):
+            raise ValueError("user_id and task_ids must be integers")
+
+        async def remove_many(db: DatabaseConnection) -> List[int]:
+            found = await self._existing_task_ids(db, user_id, task_ids)
+            await db.executemany(
+                "DELETE FROM tasks WHERE id = ? AND user_id = ?",
+                [(task_id, user_id) for task_id in found]
+            )
+            return found
+
+        try:
+            return await self._write(remove_many)
+        except Exception as e:
+            self.logger.error(f"Error deleting {len(task_ids)} tasks: {e}")
+            raise DatabaseError(f"Failed to delete tasks: {e}")
+
+    async def set_due_date(self, user_id: int, task_id: int, due_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка срока задачи, с channel_id - вместе с напоминанием."""
+        if not isinstance(user_id, int) or not isinstance(task_id, int):
+            raise ValueError("user_id and task_id must be integers")
+
+        async def update(db: DatabaseConnection) -> int:
+            if channel_id is None:
+                cursor = await db.execute(
+                    "UPDATE tasks SET due_at = ? WHERE id = ? AND user_id = ?",
+                    (due_at, task_id, user_id)
+                )
+            else:
+                cursor = await db.execute(
+                    "UPDATE tasks SET due_at = ?, remind_at = ?, remind_channel_id = ? WHERE id = ? AND user_id = ?",
+                    (due_at, due_at, channel_id if due_at is not None else None, task_id, user_id)
+                )
+            return cursor.rowcount
+
+        try:
+            return await self._write(update) > 0
+        except Exception as e:
+            self.logger.error(f"Error setting due date of task {task_id}: {e}")
+            raise DatabaseError(f"Failed to set due date: {e}")
+
+    async def set_reminder(self, user_id: int, task_id: int, remind_at: Optional[int],
+                           channel_id: Optional[int] = None) -> bool:
+        """Установка или отмена напоминания о задаче."""
+        if not isinstance(user_id, int) or not isinstance(task_id, int):
+            raise ValueError("user_id and task_id must be integers")
+
+        async def update(db: DatabaseConnection) -> int:
+            cursor = await db.execute(
+                "UPDATE tasks SET remind_at = ?, remind_channel_id = ? WHERE id = ? AND user_id = ?",
+                (remind_at, channel_id if remind_at is not None else None, task_id, user_id)
+            )
+            return cursor.rowcount
+
+        try:
+            return await self._write(update) > 0
+        except Exception as e:
+            self.logger.error(f"Error setting reminder for task {task_id}: {e}")
+            raise DatabaseError(f"Failed to set reminder: {e}")
+
+    async def get_due_tasks(self, user_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT) -> List[Task]:
+        """Невыполненные задачи со сроком по индексу idx_user_due."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f"""SELECT {TASK_COLUMNS} FROM tasks
+                    WHERE user_id = ? AND due_at IS NOT NULL AND NOT COALESCE(status, 0)
+                    ORDER BY due_at, id LIMIT ?""",
+                    (user_id, limit)
+                )
+                rows = await cursor.fetchall()
+                return [Task.from_row(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting due tasks: {e}")
+            raise DatabaseError(f"Failed to retrieve due tasks: {e}")
+
+    async def due_reminders(self, before: int, limit: int) -> List[Reminder]:
+        """Ближайшие напоминания по индексу idx_remind_at."""
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    """SELECT remind_at, user_id, id, remind_channel_id FROM tasks
+                    WHERE remind_at IS NOT NULL AND remind_at < ?
+                    ORDER BY remind_at, id LIMIT ?""",
+                    (before, limit)
+                )
+                return [Reminder(*row) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error loading reminders: {e}")
+            raise DatabaseError(f"Failed to load reminders: {e}")
+
+    async def claim_reminder(self, reminder: Reminder, lease_until: int) -> Optional[Tuple[str, bool]]:
+        """Захват напоминания сравнением remind_at в одной транзакции."""
+        async def claim(db: DatabaseConnection) -> Optional[Tuple[str, bool]]:
+            cursor = await db.execute(
+                "UPDATE tasks SET remind_at = ? WHERE id = ? AND user_id = ? AND remind_at = ?",
+                (lease_until, reminder.task_id, reminder.user_id, reminder.remind_at)
+            )
+            if cursor.rowcount == 0:
+                return None
+            cursor = await db.execute("SELECT description, status FROM tasks WHERE id = ?", (reminder.task_id,))
+            description, status = await cursor.fetchone()
+            return description, bool(status)
+
+        try:
+            return await self._write(claim)
+        except Exception as e:
+            self.logger.error(f"Error claiming reminder for task {reminder.task_id}: {e}")
+            raise DatabaseError(f"Failed to claim reminder: {e}")
+
+    async def complete_reminder(self, reminder: Reminder, lease_until: int) -> bool:
+        """Снятие напоминания, если оно все еще захвачено до lease_until."""
+        async def complete(db: DatabaseConnection) -> int:
+            cursor = await db.execute(
+                """UPDATE tasks SET remind_at = NULL, remind_channel_id = NULL
+                WHERE id = ? AND user_id = ? AND remind_at = ?""",
+                (reminder.task_id, reminder.user_id, lease_until)
+            )
+            return cursor.rowcount
+
+        try:
+            return await self._write(complete) > 0
+        except Exception as e:
+            self.logger.error(f"Error completing reminder for task {reminder.task_id}: {e}")
+            raise DatabaseError(f"Failed to complete reminder: {e}")
+
     async def count_tasks(self, user_id: int, status: Optional[bool] = None) -> int:
-        """Подсчет количества задач с опциональной фильтрацией по статусу."""
+        """Подсчет количества задач по поддерживаемым триггерами счетчикам."""
         if not isinstance(user_id, int):
             raise ValueError("user_id must be an integer")
             
         try:
-            async with self.get_db() as db:
-                if status is None:
-                    cursor = await db.execute(
-                        "SELECT COUNT(*) FROM tasks WHERE user_id = ?", 
-                        (user_id,)
-                    )
-                else:
-                    cursor = await db.execute(
-                        "SELECT COUNT(*) FROM tasks WHERE user_id = ? AND status = ?", 
-                        (user_id, status)
-                    )
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    "SELECT total, done FROM user_task_counts WHERE user_id = ?",
+                    (user_id,)
+                )
                 result = await cursor.fetchone()
-                return result[0]
+                if result is None:
+                    return 0
+                total, done = result
+                if status is None:
+                    return total
+                return done if status else total - done
         except Exception as e:
             self.logger.error(f"Error counting tasks: {e}")
-            raise DatabaseError(f"Failed to count tasks: {e}") 
\ No newline at end of file
+            raise DatabaseError(f"Failed to count tasks: {e}")
+
+    async def get_user_stats(self, user_id: int, since_day: int) -> TaskStats:
+        """Статистика пользователя из user_task_counts и user_daily_stats."""
+        if not isinstance(user_id, int):
+            raise ValueError("user_id must be an integer")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute("SELECT total, done FROM user_task_counts WHERE user_id = ?", (user_id,))
+                total, done = await cursor.fetchone() or (0, 0)
+                cursor = await db.execute(
+                    "SELECT day, created, completed FROM user_daily_stats WHERE user_id = ? AND day >= ? ORDER BY day",
+                    (user_id, since_day)
+                )
+                return TaskStats(total, done, [tuple(row) for row in await cursor.fetchall()])
+        except Exception as e:
+            self.logger.error(f"Error getting task statistics: {e}")
+            raise DatabaseError(f"Failed to get task statistics: {e}")
+
+    async def get_global_stats(self, since_day: int) -> TaskStats:
+        """Статистика по всем пользователям из task_totals и daily_stats."""
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute("SELECT users, total, done FROM task_totals WHERE id = 0")
+                users, total, done = await cursor.fetchone() or (0, 0, 0)
+                cursor = await db.execute(
+                    "SELECT day, created, completed FROM daily_stats WHERE day >= ? ORDER BY day", (since_day,)
+                )
+                return TaskStats(total, done, [tuple(row) for row in await cursor.fetchall()], users)
+        except Exception as e:
+            self.logger.error(f"Error getting task statistics: {e}")
+            raise DatabaseError(f"Failed to get task statistics: {e}")
+
+    async def add_board_task(self, board_id: int, user_id: int, description: str) -> int:
+        """Добавление задачи на доску; ID берется из счетчика доски в той же транзакции."""
+        if not isinstance(board_id, int) or not isinstance(user_id, int):
+            raise ValueError("board_id and user_id must be integers")
+
+        description = self._truncate_description(user_id, description)
+
+        async def insert(db: DatabaseConnection) -> int:
+            await db.execute(
+                """INSERT INTO boards (board_id, next_id) VALUES (?, 2)
+                ON CONFLICT(board_id) DO UPDATE SET next_id = next_id + 1""",
+                (board_id,)
+            )
+            cursor = await db.execute("SELECT next_id - 1 FROM boards WHERE board_id = ?", (board_id,))
+            task_id = (await cursor.fetchone())[0]
+            await db.execute(
+                "INSERT INTO board_tasks (board_id, id, description, created_by, updated_by) VALUES (?, ?, ?, ?, ?)",
+                (board_id, task_id, description, user_id, user_id)
+            )
+            return task_id
+
+        try:
+            return await self._write(insert)
+        except Exception as e:
+            self.logger.error(f"Error adding board task: {e}")
+            raise DatabaseError(f"Failed to add board task: {e}")
+
+    async def get_board_tasks(self, board_id: int, limit: int = DatabaseConstants.DEFAULT_TASK_LIMIT, offset: int = 0) -> List[BoardTask]:
+        """Задачи доски по первичному ключу (board_id, id)."""
+        if not isinstance(board_id, int):
+            raise ValueError("board_id must be an integer")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f"SELECT {BOARD_TASK_COLUMNS} FROM board_tasks WHERE board_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                    (board_id, limit, offset)
+                )
+                return [BoardTask(row[0], row[1], row[2], bool(row[3]), *row[4:]) for row in await cursor.fetchall()]
+        except Exception as e:
+            self.logger.error(f"Error getting board tasks: {e}")
+            raise DatabaseError(f"Failed to retrieve board tasks: {e}")
+
+    async def get_board_task(self, board_id: int, task_id: int) -> Optional[BoardTask]:
+        """Задача доски с текущей версией."""
+        if not isinstance(board_id, int) or not isinstance(task_id, int):
+            raise ValueError("board_id and task_id must be integers")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute(
+                    f"SELECT {BOARD_TASK_COLUMNS} FROM board_tasks WHERE board_id = ? AND id = ?", (board_id, task_id)
+                )
+                row = await cursor.fetchone()
+                return BoardTask(row[0], row[1], row[2], bool(row[3]), *row[4:]) if row is not None else None
+        except Exception as e:
+            self.logger.error(f"Error getting board task: {e}")
+            raise DatabaseError(f"Failed to retrieve board task: {e}")
+
+    async def count_board_tasks(self, board_id: int) -> int:
+        """Количество задач доски по счетчику boards.total."""
+        if not isinstance(board_id, int):
+            raise ValueError("board_id must be an integer")
+
+        try:
+            async with self.read_db() as db:
+                cursor = await db.execute("SELECT total FROM boards WHERE board_id = ?", (board_id,))
+                row = await cursor.fetchone()
+                return row[0] if row is not None else 0
+        except Exception as e:
+            self.logger.error(f"Error counting board tasks: {e}")
+            raise DatabaseError(f"Failed to count board tasks: {e}")
+
+    async def update_board_task(self, board_id: int, task_id: int, version: int, user_id: int,
+                                description: Optional[str] = None, status: Optional[bool] = None) -> Optional[int]:
+        """Изменение задачи доски одним UPDATE с условием на версию.
+
+        Записи этого процесса идут через общую блокировку записи, как и
+        остальные. Между процессами блокировка строки не нужна: их записи
+        сериализует SQLite, а проигравшая запись не находит строку с
+        прочитанной версией.
+        """
+        if not all(isinstance(value, int) for value in (board_id, task_id, version, user_id)):
+            raise ValueError("board_id, task_id, version and user_id must be integers")
+        if description is not None:
+            description = self._truncate_description(user_id, description)
+
+        async def compare_and_swap(db: DatabaseConnection) -> Optional[int]:
+            cursor = await db.execute(
+                f"""UPDATE board_tasks
+                SET description = COALESCE(?, description), status = COALESCE(?, status),
+                    version = version + 1, updated_by = ?, updated_at = {SQL_NOW}
+                WHERE board_id = ? AND id = ? AND version = ?""",
+                (description, None if status is None else int(status), user_id, board_id, task_id, version)
+            )
+            return version + 1 if cursor.rowcount else None
+
+        try:
+            return await self._write(compare_and_swap)
+        except Exception as e:
+            self.logger.error(f"Error updating board task: {e}")
+            raise DatabaseError(f"Failed to update board task: {e}")
+
+    async def delete_board_task(self, board_id: int, task_id: int, version: int) -> bool:
+        """Удаление задачи доски с условием на версию."""
+        if not all(isinstance(value, int) for value in (board_id, task_id, version)):
+            raise ValueError("board_id, task_id and version must be integers")
+
+        async def delete(db: DatabaseConnection) -> int:
+            cursor = await db.execute(
+                "DELETE FROM board_tasks WHERE board_id = ? AND id = ? AND version = ?", (board_id, task_id, version)
+            )
+            return cursor.rowcount
+
+        try:
+            return await self._write(delete) > 0
+        except Exception as e:
+            self.logger.error(f"Error deleting board task: {e}")
+            raise DatabaseError(f"Failed to delete board task: {e}")
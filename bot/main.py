@@ -1,15 +1,103 @@
 import sys
+import argparse
 import asyncio
+import dataclasses
 import logging
+import os
+import signal
+from typing import List, Optional
 
-from .config.settings import create_config
+from .config.settings import DatabaseConstants, create_config
 from .core.bot import BotManager
-from .database.sqlite import SQLiteDatabaseManager
+from .core.launcher import ClusterLauncher
+from .core.logging import LoggingManager
+from .core.workers import CommandWorker, WorkerPool
+from .database.factory import create_database_manager
 from .commands.task import TaskCommandHandler
 from .commands.help import HelpCommandHandler
+from .commands.admin import AdminCommandHandler
+from .commands.export import ExportCommandHandler
+from .commands.importer import ImportCommandHandler
+from .commands.stats import StatsCommandHandler
+from .commands.board import BoardCommandHandler
 
-async def main() -> int:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(prog='python -m bot.main', description="Discord task manager bot")
+    parser.add_argument('--clusters', type=int, default=0,
+                        help="run shard clusters as separate processes under a supervisor")
+    parser.add_argument('--shards', type=int, default=0,
+                        help="total shard count for --clusters (default: one shard per cluster)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="run task commands in worker processes; this process only talks to Discord")
+    # С этим номером WorkerPool запускает свои процессы-обработчики
+    parser.add_argument('--worker-id', type=int, default=None, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+async def launch_clusters(cluster_count: int, shard_count: int, worker_count: int = 0) -> int:
+    """Запуск кластеров шардов под наблюдением лаунчера."""
+    try:
+        config = create_config()
+    except ValueError as config_error:
+        print(f"Fatal error: {config_error}")
+        return 1
+    if DatabaseConstants.BACKEND == 'memory':
+        print("Fatal error: the memory backend cannot be shared between cluster processes")
+        return 1
+        
+    logger = LoggingManager.setup(config)
+    command = [sys.executable, '-m', 'bot.main', '--workers', str(worker_count)] if worker_count else None
+    try:
+        launcher = ClusterLauncher(shard_count or cluster_count, cluster_count, logger, command=command)
+    except ValueError as e:
+        print(f"Fatal error: {e}")
+        return 1
+    return await launcher.run()
+
+async def run_worker(worker_id: int) -> int:
+    """Процесс-обработчик команд шлюза, запущенного с --workers."""
+    try:
+        config = create_config()
+    except ValueError as config_error:
+        print(f"Fatal error: {config_error}")
+        return 1
+    base, ext = os.path.splitext(config.log_file)
+    config = dataclasses.replace(config, log_file=f"{base}.worker{worker_id}{ext}", metrics_port=None)
+    logger = LoggingManager.setup(config)
+    # SIGINT из терминала получает вся группа процессов; обработчик
+    # завершается, когда шлюз закроет соединение
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    db = create_database_manager(shared=True, migrate=False)
+    await db.init()
+    try:
+        worker = CommandWorker(worker_id, {
+            'task': TaskCommandHandler(db, logger, page_cursor_cache_size=0),
+            'stats': StatsCommandHandler(db, logger),
+            'board': BoardCommandHandler(db, logger),
+        }, logger)
+        await worker.run(config.worker_socket)
+    except OSError as e:
+        logger.critical(f"Worker {worker_id} cannot reach the gateway: {e}")
+        return 1
+    finally:
+        await db.close()
+    return 0
+
+async def main(argv: Optional[List[str]] = None) -> int:
     """Точка входа в приложение."""
+    args = parse_args(argv)
+    if args.worker_id is not None:
+        return await run_worker(args.worker_id)
+    if args.workers < 0:
+        print("Fatal error: --workers must not be negative")
+        return 1
+    if args.workers and DatabaseConstants.BACKEND == 'memory':
+        print("Fatal error: the memory backend cannot be shared with worker processes")
+        return 1
+    if args.clusters:
+        return await launch_clusters(args.clusters, args.shards, args.workers)
+        
     try:
         # Пробуем загрузить конфигурацию
         try:
@@ -23,12 +111,39 @@ async def main() -> int:
         bot_manager = BotManager(config)
         
         # Настраиваем базу данных
-        bot_manager.db = SQLiteDatabaseManager()
+        # Процессы кластеров и процессы-обработчики работают с общим хранилищем
+        clustered = config.cluster_id is not None
+        shared = clustered or args.workers > 0
+        # Схему мигрирует только один процесс: шлюз или кластер 0
+        bot_manager.db = create_database_manager(
+            metered=config.metrics_port is not None, shared=shared, migrate=config.cluster_id in (None, 0)
+        )
         await bot_manager.db.init()
         
         # Настраиваем обработчики команд
-        bot_manager.task_handler = TaskCommandHandler(bot_manager.db, bot_manager.logger)
+        if args.workers:
+            # Команды задач, статистики и досок выполняют процессы-обработчики
+            bot_manager.workers = WorkerPool(args.workers, config.worker_socket, bot_manager.logger)
+            bot_manager.task_handler = bot_manager.workers.handler('task')
+        elif clustered:
+            # Границы страниц могут сдвигаться удалениями из других процессов
+            bot_manager.task_handler = TaskCommandHandler(bot_manager.db, bot_manager.logger, page_cursor_cache_size=0)
+        else:
+            bot_manager.task_handler = TaskCommandHandler(bot_manager.db, bot_manager.logger)
+        add_archive_listener = getattr(bot_manager.db, 'add_archive_listener', None)
+        if add_archive_listener is not None and not args.workers:
+            # Фоновый перенос в архив удаляет задачи и сдвигает границы страниц
+            add_archive_listener(bot_manager.task_handler.invalidate_user)
+        bot_manager.export_handler = ExportCommandHandler(bot_manager.db, bot_manager.logger)
+        bot_manager.import_handler = ImportCommandHandler(bot_manager.db, bot_manager.logger)
+        if args.workers:
+            bot_manager.stats_handler = bot_manager.workers.handler('stats')
+            bot_manager.board_handler = bot_manager.workers.handler('board')
+        else:
+            bot_manager.stats_handler = StatsCommandHandler(bot_manager.db, bot_manager.logger)
+            bot_manager.board_handler = BoardCommandHandler(bot_manager.db, bot_manager.logger)
         bot_manager.help_handler = HelpCommandHandler(logger=bot_manager.logger)
+        bot_manager.admin_handler = AdminCommandHandler(logger=bot_manager.logger)
         
         # Запускаем бота
         return await bot_manager.run()
@@ -42,4 +157,5 @@ async def main() -> int:
 
 if __name__ == '__main__':
     exit_code = asyncio.run(main())
+    LoggingManager.shutdown()
     sys.exit(exit_code)
\ No newline at end of file
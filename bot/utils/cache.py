@@ -0,0 +1,100 @@
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+@dataclass
+class CacheStats:
+    """Статистика работы кэша."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий среди всех обращений."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class LRUCache:
+    """LRU-кэш, ограниченный числом записей и приблизительным размером в байтах.
+
+    Записи можно помечать тегом, чтобы сбрасывать их группой.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, sizeof: Callable[[Any], int] = sys.getsizeof):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.stats = CacheStats()
+        self._entries: OrderedDict[Hashable, Tuple[Any, int, Hashable]] = OrderedDict()
+        self._tags: Dict[Hashable, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Получение значения с отметкой об использовании."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, tag: Optional[Hashable] = None) -> None:
+        """Сохранение значения с вытеснением давно не использованных записей."""
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        self._entries[key] = (value, size, tag)
+        self.stats.size_bytes += size
+        if tag is not None:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries or self.stats.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self.delete(oldest)
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+
+    def delete(self, key: Hashable) -> bool:
+        """Удаление записи."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        _, size, tag = entry
+        self.stats.size_bytes -= size
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        self.stats.entries = len(self._entries)
+        return True
+
+    def invalidate_tag(self, tag: Hashable) -> int:
+        """Удаление всех записей с указанным тегом."""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            _, size, _ = self._entries.pop(key)
+            self.stats.size_bytes -= size
+        self.stats.invalidations += len(keys)
+        self.stats.entries = len(self._entries)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Полная очистка кэша."""
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self._tags.clear()
+        self.stats.entries = 0
+        self.stats.size_bytes = 0
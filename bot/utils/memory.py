@@ -0,0 +1,42 @@
+import os
+import sys
+from typing import Any, Dict, Optional
+
+def resident_memory_bytes() -> Optional[int]:
+    """Текущий размер резидентной памяти процесса или None, если неизвестен."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Вне Linux доступен только пик: в килобайтах, на macOS - в байтах
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def memory_report(client: Any) -> Dict[str, Any]:
+    """Память процесса и размеры кэшей клиента Discord."""
+    guilds = client.guilds
+    rss = resident_memory_bytes()
+    return {
+        'rss_bytes': rss,
+        'guilds': len(guilds),
+        'members': sum(len(guild.members) for guild in guilds),
+        'users': len(client.users),
+        'messages': len(client.cached_messages),
+        'rss_per_1k_guilds': rss * 1000 // len(guilds) if rss is not None and guilds else None,
+    }
+
+def _mib(value: Optional[int]) -> str:
+    return 'n/a' if value is None else f"{value / (1024 * 1024):.1f} MiB"
+
+def format_memory_report(report: Dict[str, Any]) -> str:
+    """Отчет о памяти одной строкой."""
+    return (
+        f"RSS {_mib(report['rss_bytes'])} ({_mib(report['rss_per_1k_guilds'])} per 1k guilds); "
+        f"cached: {report['guilds']} guilds, {report['members']} members, "
+        f"{report['users']} users, {report['messages']} messages"
+    )
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Границы корзин гистограмм задержки, секунды
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Монотонный счетчик с метками."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Увеличение счетчика серии с заданными значениями меток."""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Текущее значение серии."""
+        return self._values.get(label_values, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами и метками.
+
+    Наблюдение стоит одного двоичного поиска и нескольких сложений, поэтому
+    ее можно держать включенной в рабочем режиме.
+    """
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Серия: [счетчики корзин (последняя - +Inf), сумма, количество]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Учет одного наблюдения."""
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        """Число наблюдений серии."""
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def time(self, *label_values: str) -> '_Timer':
+        """Контекстный менеджер, измеряющий время выполнения блока."""
+        return _Timer(self, label_values)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, label_values)} {repr(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, label_values)} {count}"
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'started')
+
+    def __init__(self, histogram: Histogram, label_values: Tuple[str, ...]):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+
+class CallbackMetric:
+    """Метрика, значение которой вычисляется при каждом запросе."""
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float], kind: str = 'gauge'):
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.kind = kind
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {_format_value(self.callback())}"
+
+class MetricsRegistry:
+    """Набор метрик с выводом в текстовом формате Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} is already registered with another type")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """Регистрация счетчика (повторная регистрация возвращает существующий)."""
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Регистрация гистограммы (повторная регистрация возвращает существующую)."""
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def callback(self, name: str, help: str, callback: Callable[[], float], kind: str = 'gauge') -> None:
+        """Регистрация вычисляемой метрики; новая функция заменяет старую."""
+        self._metrics[name] = CallbackMetric(name, help, callback, kind)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus 0.0.4."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return '\n'.join(lines) + '\n'
+
+# Реестр процесса и метрики бота
+METRICS = MetricsRegistry()
+
+COMMAND_LATENCY = METRICS.histogram(
+    'discord_bot_command_duration_seconds', 'Command handling time', ('command',))
+COMMAND_ERRORS = METRICS.counter(
+    'discord_bot_command_errors_total', 'Commands that failed, by error type', ('command', 'error'))
+HANDLER_ERRORS = METRICS.counter(
+    'discord_bot_handler_errors_total', 'Errors reported to users by command handlers', ('error',))
+RATE_LIMIT_REJECTIONS = METRICS.counter(
+    'discord_bot_rate_limit_rejections_total', 'Commands rejected by rate limiting', ('command',))
+RATE_LIMIT_CHECK_SECONDS = METRICS.histogram(
+    'discord_bot_rate_limit_check_seconds', 'Time spent in a rate limiter check',
+    buckets=(0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.001))
+DB_LATENCY = METRICS.histogram(
+    'discord_bot_db_operation_duration_seconds', 'Database operation time', ('operation',))
+DB_ERRORS = METRICS.counter(
+    'discord_bot_db_errors_total', 'Failed database operations, by error type', ('operation', 'error'))
+LOG_RECORDS_DROPPED = METRICS.counter(
+    'discord_bot_log_records_dropped_total', 'Log records dropped because the logging queue was full')
+OUTBOUND_MESSAGES = METRICS.counter(
+    'discord_bot_outbound_messages_total', 'Queued replies by outcome (sent, failed, dropped)', ('result',))
+OUTBOUND_COALESCED = METRICS.counter(
+    'discord_bot_outbound_coalesced_total', 'Replies merged into a previous message to the same channel')
+OUTBOUND_LATENCY = METRICS.histogram(
+    'discord_bot_outbound_delivery_seconds', 'Time from queueing a reply to its delivery')
+REMINDERS = METRICS.counter(
+    'discord_bot_reminders_total', 'Fired reminders by outcome (sent, skipped, failed)', ('result',))
+REMINDER_DELAY = METRICS.histogram(
+    'discord_bot_reminder_delay_seconds', 'Time from the scheduled reminder time to its delivery',
+    buckets=(0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 3600.0))
+ARCHIVED_TASKS = METRICS.counter(
+    'discord_bot_archived_tasks_total', 'Completed tasks moved to the archive database')
+BOARD_CONFLICTS = METRICS.counter(
+    'discord_bot_board_conflicts_total', 'Board task writes rejected by a version check, by action', ('action',))
+WORKER_JOBS = METRICS.counter(
+    'discord_bot_worker_jobs_total', 'Commands sent to worker processes by outcome (done, failed, rejected)', ('result',))
+
+class MetricsServer:
+    """HTTP-эндпоинт /metrics на цикле событий бота."""
+
+    def __init__(self, registry: MetricsRegistry = METRICS, host: str = '127.0.0.1', port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger('discord_bot.metrics')
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Запуск сервера."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        """Остановка сервера."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=5)
+            method, path, *_ = request.split(b'\r\n', 1)[0].decode('latin-1').split(' ')
+            if method == 'GET' and path.split('?', 1)[0] == '/metrics':
+                status, body = '200 OK', self.registry.render().encode('utf-8')
+            else:
+                status, body = '404 Not Found', b'Not Found\n'
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except Exception as e:
+            self.logger.warning(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
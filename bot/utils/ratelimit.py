@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional
+
+from .metrics import RATE_LIMIT_CHECK_SECONDS, RATE_LIMIT_REJECTIONS
+
+class _Bucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+class RateLimiter:
+    """Общий для всех команд token bucket на пользователя.
+
+    Каждый пользователь располагает capacity токенами, которые
+    восстанавливаются со скоростью refill_rate в секунду; команда тратит
+    свой вес из weights (default_weight, если не указан). Ведро, простоявшее
+    capacity / refill_rate секунд, снова полное и неотличимо от нового,
+    поэтому такие ведра удаляются без изменения поведения. Сверх max_buckets
+    вытесняются давно неактивные пользователи.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_rate: float,
+        weights: Optional[Mapping[str, float]] = None,
+        default_weight: float = 1.0,
+        max_buckets: int = 100000,
+    ):
+        if capacity <= 0 or refill_rate <= 0:
+            raise ValueError("capacity and refill_rate must be positive")
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.max_buckets = max_buckets
+        self.idle_after = capacity / refill_rate
+        self.rejections = 0
+        # Порядок - от давно неактивных пользователей к недавним
+        self._buckets: OrderedDict[int, _Bucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def weight(self, command: str) -> float:
+        """Стоимость команды в токенах."""
+        return self.weights.get(command, self.default_weight)
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            user_id, bucket = next(iter(buckets.items()))
+            if now - bucket.updated < self.idle_after and len(buckets) <= self.max_buckets:
+                break
+            del buckets[user_id]
+
+    def check(self, user_id: int, command: str, now: Optional[float] = None) -> float:
+        """Списание веса команды.
+
+        Возвращает 0, если команда разрешена, иначе - через сколько секунд
+        токенов станет достаточно (токены при отказе не списываются).
+        """
+        started = time.perf_counter()
+        if now is None:
+            now = time.monotonic()
+        weight = self.weight(command)
+
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            tokens = self.capacity
+        else:
+            tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.refill_rate)
+
+        if tokens >= weight:
+            tokens -= weight
+            retry_after = 0.0
+        else:
+            retry_after = (weight - tokens) / self.refill_rate
+            self.rejections += 1
+            RATE_LIMIT_REJECTIONS.inc(command)
+
+        if bucket is None:
+            self._buckets[user_id] = _Bucket(tokens, now)
+        else:
+            bucket.tokens = tokens
+            bucket.updated = now
+            self._buckets.move_to_end(user_id)
+        self._evict(now)
+
+        RATE_LIMIT_CHECK_SECONDS.observe(time.perf_counter() - started)
+        return retry_after
+
+    def save(self, path: str) -> int:
+        """Сохранение неполных ведер в JSON-файл (атомарная замена).
+
+        Время хранится как время на часах системы, чтобы ведра пережили
+        перезапуск процесса. Возвращает число сохраненных ведер.
+        """
+        now = time.monotonic()
+        wall = time.time()
+        self._evict(now)
+        state: Dict[str, list] = {
+            str(user_id): [bucket.tokens, wall - (now - bucket.updated)]
+            for user_id, bucket in self._buckets.items()
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+        return len(state)
+
+    def load(self, path: str) -> int:
+        """Загрузка ведер, сохраненных save(); отсутствующий файл - не ошибка."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        now = time.monotonic()
+        wall = time.time()
+        buckets = sorted(
+            (updated, int(user_id), tokens) for user_id, (tokens, updated) in state.items()
+        )
+        for updated, user_id, tokens in buckets:
+            self._buckets[user_id] = _Bucket(min(tokens, self.capacity), now - max(0.0, wall - updated))
+            self._buckets.move_to_end(user_id)
+        self._evict(now)
+        return len(self._buckets)
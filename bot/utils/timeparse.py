@@ -0,0 +1,36 @@
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+# Относительное время: "30m", "2h", "1d12h", "1w", "2ч30м"
+DURATION = re.compile(r'^(?:\d+\s*(?:w|d|h|m|н|д|ч|м)\s*)+$', re.IGNORECASE)
+DURATION_PART = re.compile(r'(\d+)\s*(w|d|h|m|н|д|ч|м)', re.IGNORECASE)
+UNIT_SECONDS = {'w': 604800, 'н': 604800, 'd': 86400, 'д': 86400, 'h': 3600, 'ч': 3600, 'm': 60, 'м': 60}
+
+DATE_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M', '%Y-%m-%d')
+# Час напоминания, если указана только дата (UTC)
+DATE_ONLY_HOUR = 9
+
+def parse_when(text: str, now: float) -> Optional[int]:
+    """Момент времени из строки команды в секундах Unix-времени.
+
+    Понимает относительное время от now ("30m", "1d12h") и дату
+    "YYYY-MM-DD [HH:MM]" в UTC. Возвращает None, если строку не разобрать.
+    """
+    text = text.strip()
+    if DURATION.match(text):
+        seconds = sum(int(amount) * UNIT_SECONDS[unit.lower()] for amount, unit in DURATION_PART.findall(text))
+        return int(now) + seconds
+    for date_format in DATE_FORMATS:
+        try:
+            moment = datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+        if date_format == '%Y-%m-%d':
+            moment = moment.replace(hour=DATE_ONLY_HOUR)
+        return int(moment.replace(tzinfo=timezone.utc).timestamp())
+    return None
+
+def format_when(timestamp: int) -> str:
+    """Разметка Discord, показывающая время в часовом поясе читателя."""
+    return f"<t:{timestamp}:f>"
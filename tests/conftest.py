@@ -19,17 +19,19 @@ def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
 async def test_db() -> AsyncGenerator[SQLiteDatabaseManager, None]:
     """Create a test database instance."""
     test_db_path = "test_tasks.db"
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
-    
     db = SQLiteDatabaseManager(db_path=test_db_path)
+    for path in (test_db_path, db.archive_path):
+        if os.path.exists(path):
+            os.remove(path)
+    
     await db.init()
     
     yield db
     
     await db.close()
-    if os.path.exists(test_db_path):
-        os.remove(test_db_path)
+    for path in (test_db_path, db.archive_path):
+        if os.path.exists(path):
+            os.remove(path)
 
 @pytest.fixture
 def bot_config() -> BotConfig:
@@ -1,11 +1,26 @@
 import pytest
 import asyncio
+from typing import AsyncGenerator
 
 from bot.core.bot import BotManager
 from bot.commands.base import CommandContext
+from bot.database.base import DatabaseManager
+from bot.database.memory import InMemoryDatabaseManager
+from bot.database.sqlite import SQLiteDatabaseManager
 
 pytestmark = pytest.mark.asyncio
 
+@pytest.fixture(params=["sqlite", "memory"])
+async def test_db(request, tmp_path) -> AsyncGenerator[DatabaseManager, None]:
+    """Все реализации DatabaseManager проходят одни и те же тесты."""
+    if request.param == "sqlite":
+        db = SQLiteDatabaseManager(db_path=str(tmp_path / "tasks.db"))
+    else:
+        db = InMemoryDatabaseManager(log_path=str(tmp_path / "tasks.oplog"))
+    await db.init()
+    yield db
+    await db.close()
+
 class TestBotDatabaseIntegration:
     """Интеграционные тесты взаимодействия бота с базой данных."""
     
@@ -75,4 +90,62 @@ class TestBotDatabaseIntegration:
         # Попытка добавления пустой задачи
         mock_ctx.send.reset_mock()
         await bot_manager.task_handler.add_task(mock_ctx, "")
-        mock_ctx.send.assert_called_with("❌ Описание задачи не может быть пустым.") 
\ No newline at end of file
+        mock_ctx.send.assert_called_with("❌ Описание задачи не может быть пустым.") 
+    
+    async def test_search_tasks(self, test_db: DatabaseManager):
+        """Поиск находит задачи по префиксам слов только у владельца."""
+        ids = await test_db.add_tasks(1, [
+            "Написать отчет за квартал",
+            "Отчет: отправить отчет бухгалтерии",
+            "Купить молоко",
+        ])
+        await test_db.add_task(2, "Чужой отчет")
+
+        found = await test_db.search_tasks(1, "ОТЧ")
+        assert [task.id for task in found] == [ids[1], ids[0]]
+        assert [task.id for task in await test_db.search_tasks(1, "отчет кварт")] == [ids[0]]
+        assert [task.id for task in await test_db.search_tasks(1, "отчет", limit=1, offset=1)] == [ids[0]]
+        assert await test_db.search_tasks(1, "!!!") == []
+
+        await test_db.delete_task(1, ids[1])
+        assert [task.id for task in await test_db.search_tasks(1, "отчет")] == [ids[0]]
+
+    async def test_iter_tasks(self, test_db: DatabaseManager):
+        """iter_tasks отдает все задачи пользователя порциями по порядку ID."""
+        ids = await test_db.add_tasks(1, [f"Task {i}" for i in range(7)])
+        await test_db.add_task(2, "Other")
+
+        chunks = [chunk async for chunk in test_db.iter_tasks(1, chunk_size=3)]
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert [task.id for chunk in chunks for task in chunk] == ids
+        assert [chunk async for chunk in test_db.iter_tasks(3)] == []
+
+    async def test_due_dates_and_reminders(self, test_db: DatabaseManager):
+        """Сроки, выборка напоминаний и их захват сравнением времени."""
+        first, second, third = await test_db.add_tasks(1, ["a", "b", "c"])
+        other = await test_db.add_task(2, "other")
+        assert await test_db.set_due_date(1, second, 300, channel_id=10)
+        assert await test_db.set_due_date(1, first, 500)
+        assert await test_db.set_reminder(2, other, 200, channel_id=20)
+        assert await test_db.set_reminder(1, third, 400, channel_id=10)
+        assert not await test_db.set_reminder(2, first, 100)
+
+        assert [task.id for task in await test_db.get_due_tasks(1)] == [second, first]
+        await test_db.mark_task_done(1, second, True)
+        assert [(task.id, task.due_at) for task in await test_db.get_due_tasks(1)] == [(first, 500)]
+
+        reminders = await test_db.due_reminders(1000, 10)
+        assert [(r.remind_at, r.task_id, r.channel_id) for r in reminders] == [(200, other, 20), (300, second, 10), (400, third, 10)]
+        assert await test_db.due_reminders(300, 10) == reminders[:1]
+        assert await test_db.due_reminders(1000, 2) == reminders[:2]
+
+        assert await test_db.claim_reminder(reminders[1], 350) == ("b", True)
+        # Повторный захват по тому же времени не проходит
+        assert await test_db.claim_reminder(reminders[1], 360) is None
+        assert not await test_db.complete_reminder(reminders[1], 360)
+        assert await test_db.complete_reminder(reminders[1], 350)
+        assert [r.task_id for r in await test_db.due_reminders(1000, 10)] == [other, third]
+
+        await test_db.delete_task(1, third)
+        await test_db.set_reminder(2, other, None)
+        assert await test_db.due_reminders(1000, 10) == []
@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.load import WORKLOADS, create_backend, run_load
+
+pytestmark = pytest.mark.asyncio
+
+class TestLoadHarness:
+    """Проверка работоспособности нагрузочного теста на малом объеме."""
+
+    @pytest.mark.parametrize("backend", ["sqlite", "memory"])
+    async def test_small_mixed_run(self, backend: str, tmp_path):
+        """Короткий прогон возвращает сводку по всем выполненным командам."""
+        db = create_backend(backend, str(tmp_path))
+        await db.init()
+        try:
+            result = await run_load(db, WORKLOADS["mixed"], users=20, concurrency=4, operations=200)
+        finally:
+            await db.close()
+
+        assert result["operations"] == 200
+        assert sum(stats["count"] for stats in result["commands"].values()) == 200
+        assert result["commands"]["add"]["count"] > 0
+        assert all(stats["p50_ms"] <= stats["p99_ms"] for stats in result["commands"].values())
@@ -4,6 +4,10 @@ import discord
 
 from bot.commands.task import TaskCommandHandler
 from bot.commands.help import HelpCommandHandler
+from bot.commands.board import BoardCommandHandler
+from bot.commands.stats import StatsCommandHandler, format_stats
+from bot.database.base import DatabaseError
+from bot.database.models import TaskStats
 from bot.database.sqlite import SQLiteDatabaseManager
 
 pytestmark = pytest.mark.asyncio
@@ -55,6 +59,25 @@ class TestTaskCommands:
         assert "Task 11" in second_page
         assert "Task 15" in second_page
     
+    async def test_list_tasks_uses_page_cursors(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """Следующие страницы читаются по запомненной границе, удаление ее сбрасывает."""
+        ids = [await test_db.add_task(mock_ctx.author.id, f"Task {i+1}") for i in range(25)]
+
+        await task_handler.list_tasks(mock_ctx, page=1)
+        test_db.get_tasks = MagicMock(side_effect=AssertionError("OFFSET query is not expected"))
+        await task_handler.list_tasks(mock_ctx, page=2)
+        second_page = mock_ctx.send.call_args[0][0]
+        assert f"#{ids[10]}: Task 11" in second_page
+        assert f"#{ids[19]}: Task 20" in second_page
+
+        await task_handler.delete_task(mock_ctx, str(ids[0]))
+        del test_db.get_tasks
+        await task_handler.list_tasks(mock_ctx, page=2)
+        second_page = mock_ctx.send.call_args[0][0]
+        assert f"#{ids[11]}: Task 12" in second_page
+        assert f"#{ids[20]}: Task 21" in second_page
+        assert "Task 11 " not in second_page
+
     async def test_mark_task_done(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
         """Тест команды отметки задачи как выполненной."""
         task_id = await test_db.add_task(mock_ctx.author.id, "Task to complete")
@@ -83,6 +106,204 @@ class TestTaskCommands:
         tasks = await test_db.get_tasks(mock_ctx.author.id)
         assert len(tasks) == 0
 
+    async def test_add_tasks_from_checklist(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """Многострочный !add добавляет задачи одной пачкой."""
+        await task_handler.add_task(mock_ctx, "- [ ] Buy milk\n\n* Call mom\n1. Pay rent")
+
+        mock_ctx.send.assert_called_once()
+        assert "Добавлено задач: 3" in mock_ctx.send.call_args[0][0]
+        tasks = await test_db.get_tasks(mock_ctx.author.id)
+        assert [task.description for task in tasks] == ["Buy milk", "Call mom", "Pay rent"]
+
+    async def test_bulk_status_and_delete(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """!done и !delete принимают списки ID и диапазоны."""
+        ids = await test_db.add_tasks(mock_ctx.author.id, [f"Task {i}" for i in range(6)])
+
+        await task_handler.mark_tasks_status(mock_ctx, (str(ids[0]), f"{ids[2]}-{ids[4]}", "999999"), True)
+        message = mock_ctx.send.call_args[0][0]
+        assert f"#{ids[0]}, #{ids[2]}–#{ids[4]}" in message
+        assert "Не найдены: #999999" in message
+        assert await test_db.count_tasks(mock_ctx.author.id, True) == 4
+
+        await task_handler.delete_tasks(mock_ctx, (f"{ids[0]},{ids[1]}",))
+        assert "Удалены задачи" in mock_ctx.send.call_args[0][0]
+        assert await test_db.count_tasks(mock_ctx.author.id) == 4
+
+    async def test_bulk_ids_validation(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock):
+        """Некорректные и слишком большие списки ID отклоняются."""
+        await task_handler.mark_tasks_status(mock_ctx, ("5-3",), True)
+        assert "Некорректный диапазон" in mock_ctx.send.call_args[0][0]
+
+        await task_handler.delete_tasks(mock_ctx, ("1-1000",))
+        assert "не более" in mock_ctx.send.call_args[0][0]
+
+        await task_handler.delete_tasks(mock_ctx, ())
+        assert "Укажите ID задачи" in mock_ctx.send.call_args[0][0]
+
+    async def test_search_tasks(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """!search выводит найденные задачи постранично."""
+        await test_db.add_tasks(mock_ctx.author.id, [f"Report {i}" for i in range(12)] + ["Groceries"])
+
+        await task_handler.search_tasks(mock_ctx, "report")
+        message = mock_ctx.send.call_args[0][0]
+        assert "Страница 1" in message
+        assert message.count("Report") == 10
+        assert "`!search report --page 2`" in message
+
+        await task_handler.search_tasks(mock_ctx, "report --page 2")
+        message = mock_ctx.send.call_args[0][0]
+        assert message.count("Report") == 2
+        assert "--page 3" not in message
+
+        await task_handler.search_tasks(mock_ctx, "vacation")
+        assert "ничего не найдено" in mock_ctx.send.call_args[0][0]
+
+    async def test_due_dates_and_reminders(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """!due и !remind сохраняют время и передают напоминание планировщику."""
+        mock_ctx.channel.id = 42
+        task_handler.on_reminder = MagicMock()
+        task_id = await test_db.add_task(mock_ctx.author.id, "Pay rent")
+
+        await task_handler.set_due_date(mock_ctx, str(task_id), "2h")
+        assert "<t:" in mock_ctx.send.call_args[0][0]
+        reminder = task_handler.on_reminder.call_args[0][0]
+        assert (reminder.user_id, reminder.task_id, reminder.channel_id) == (mock_ctx.author.id, task_id, 42)
+        assert await test_db.due_reminders(reminder.remind_at + 1, 10) == [reminder]
+
+        await task_handler.list_due_tasks(mock_ctx)
+        assert "Pay rent" in mock_ctx.send.call_args[0][0]
+        await task_handler.list_tasks(mock_ctx)
+        assert f"<t:{reminder.remind_at}:f>" in mock_ctx.send.call_args[0][0]
+
+        await task_handler.set_reminder(mock_ctx, str(task_id), "2001-01-01")
+        assert "уже прошло" in mock_ctx.send.call_args[0][0]
+        await task_handler.set_reminder(mock_ctx, str(task_id), "someday")
+        assert "Не удалось разобрать" in mock_ctx.send.call_args[0][0]
+
+        await task_handler.set_due_date(mock_ctx, str(task_id), "off")
+        assert "снят" in mock_ctx.send.call_args[0][0]
+        assert await test_db.due_reminders(reminder.remind_at + 1, 10) == []
+        assert task_handler.on_reminder.call_count == 1
+
+    async def test_list_archived_tasks(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """!list --archived показывает архив, обычный список - только горячие задачи."""
+        await task_handler.list_archived_tasks(mock_ctx)
+        assert "В архиве нет задач" in mock_ctx.send.call_args[0][0]
+
+        ids = await test_db.add_tasks(mock_ctx.author.id, ["Old report", "Current work"])
+        await test_db.mark_task_done(mock_ctx.author.id, ids[0], True)
+        assert await test_db.archive_done_tasks(-60) == 1
+
+        await task_handler.list_archived_tasks(mock_ctx)
+        message = mock_ctx.send.call_args[0][0]
+        assert "Архив (Страница 1/1, всего 1)" in message
+        assert "Old report" in message and "Current work" not in message
+        await task_handler.list_tasks(mock_ctx)
+        assert "Old report" not in mock_ctx.send.call_args[0][0]
+        await task_handler.list_archived_tasks(mock_ctx, page=2)
+        assert "не существует" in mock_ctx.send.call_args[0][0]
+
+    async def test_archive_resets_page_cursors(self, task_handler: TaskCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """Перенос в архив сбрасывает запомненные границы страниц пользователя."""
+        test_db.add_archive_listener(task_handler.invalidate_user)
+        ids = await test_db.add_tasks(mock_ctx.author.id, [f"Task {i+1}" for i in range(25)])
+        await test_db.set_status_many(mock_ctx.author.id, ids[:5], True)
+        await task_handler.list_tasks(mock_ctx, page=1)
+        await task_handler.list_tasks(mock_ctx, page=2)
+        assert mock_ctx.author.id in task_handler._page_cursors
+
+        assert await test_db.archive_done_tasks(-60) == 5
+        assert mock_ctx.author.id not in task_handler._page_cursors
+        await task_handler.list_tasks(mock_ctx, page=2)
+        second_page = mock_ctx.send.call_args[0][0]
+        assert f"#{ids[15]}: Task 16" in second_page
+        assert f"#{ids[24]}: Task 25" in second_page
+
+class TestStatsCommand:
+    """Тесты команды статистики."""
+
+    @pytest.fixture
+    def stats_handler(self, test_db: SQLiteDatabaseManager) -> StatsCommandHandler:
+        return StatsCommandHandler(test_db, MagicMock())
+
+    async def test_user_and_global_stats(self, stats_handler: StatsCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """Статистика пользователя и общая читаются из агрегатов."""
+        ids = await test_db.add_tasks(mock_ctx.author.id, ["a", "b", "c"])
+        await test_db.mark_task_done(mock_ctx.author.id, ids[0], True)
+        await test_db.add_task(1, "other")
+
+        await stats_handler.show_user_stats(mock_ctx)
+        message = mock_ctx.send.call_args[0][0]
+        assert "Задач: 3, выполнено: 1 (33%)" in message
+        assert "За 7 дн. создано: 3, выполнено: 1" in message
+        assert "Пользователей" not in message
+
+        await stats_handler.show_global_stats(mock_ctx)
+        message = mock_ctx.send.call_args[0][0]
+        assert "Пользователей с задачами: 2" in message
+        assert "Задач: 4, выполнено: 1 (25%)" in message
+
+        test_db.get_user_stats = MagicMock(side_effect=DatabaseError("locked"))
+        await stats_handler.show_user_stats(mock_ctx)
+        assert "Ошибка базы данных" in mock_ctx.send.call_args[0][0]
+
+    async def test_format_by_day_and_week(self):
+        """Разбивка по дням и неделям отсчитывается от текущих суток."""
+        stats = TaskStats(10, 6, [(80, 2, 1), (95, 0, 2), (99, 1, 1), (100, 3, 2)])
+        text = format_stats("📊", stats, today=100, days=3, weeks=3)
+        assert "За 3 дн. создано: 4, выполнено: 3" in text
+        assert "По дням: 09.04: 0 · 10.04: 1 · 11.04: 2" in text
+        assert "По неделям: 22.03–28.03: 1 · 29.03–04.04: 0 · 05.04–11.04: 5" in text
+
+class TestBoardCommand:
+    """Тесты команды общей доски."""
+
+    @pytest.fixture
+    def board_handler(self, test_db: SQLiteDatabaseManager) -> BoardCommandHandler:
+        return BoardCommandHandler(test_db, MagicMock())
+
+    async def test_members_share_board(self, board_handler: BoardCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """Задачи доски видят и меняют все участники канала."""
+        await board_handler.run(mock_ctx, 500, "add Release notes")
+        assert "ID #1" in mock_ctx.send.call_args[0][0]
+        mock_ctx.user_id = 42
+        await board_handler.run(mock_ctx, 500, "done 1")
+        assert "помечена как выполнена" in mock_ctx.send.call_args[0][0]
+        await board_handler.run(mock_ctx, 500, "edit 1 Release notes v2")
+        await board_handler.run(mock_ctx, 500, "")
+        message = mock_ctx.send.call_args[0][0]
+        assert "Доска канала (Страница 1/1, всего 1)" in message
+        assert "#1: Release notes v2 (✓)" in message
+        assert (await test_db.get_board_task(500, 1)).updated_by == 42
+
+        await board_handler.run(mock_ctx, 500, "delete 1")
+        assert "удалена с доски" in mock_ctx.send.call_args[0][0]
+        await board_handler.run(mock_ctx, 500, "done 1")
+        assert "не найдена" in mock_ctx.send.call_args[0][0]
+        await board_handler.run(mock_ctx, 500, "move 1")
+        assert "!board add" in mock_ctx.send.call_args[0][0]
+
+    async def test_conflicting_writes(self, board_handler: BoardCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """Отметка повторяется после чужой записи, правка поверх чужой правки отклоняется."""
+        task_id = await test_db.add_board_task(500, 1, "Draft")
+        update = test_db.update_board_task
+
+        async def concurrent_update(board_id, task_id, version, user_id, description=None, status=None):
+            # Другой участник успевает записать между чтением и записью
+            test_db.update_board_task = update
+            await update(board_id, task_id, version, 7, description=f"Draft v{version + 1}")
+            return await update(board_id, task_id, version, user_id, description, status)
+
+        test_db.update_board_task = concurrent_update
+        await board_handler.set_status(mock_ctx, 500, str(task_id), True)
+        assert "помечена как выполнена" in mock_ctx.send.call_args[0][0]
+        assert await test_db.get_board_task(500, task_id) == (task_id, 500, "Draft v2", True, 3, 1, mock_ctx.user_id)
+
+        test_db.update_board_task = concurrent_update
+        await board_handler.edit_task(mock_ctx, 500, str(task_id), "My edit")
+        assert "только что изменил другой участник" in mock_ctx.send.call_args[0][0]
+        assert (await test_db.get_board_task(500, task_id)).description == "Draft v4"
+
 class TestHelpCommand:
     """Тесты команды помощи."""
     
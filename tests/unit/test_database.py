@@ -0,0 +1,990 @@
+import pytest
+import asyncio
+import time
+from typing import AsyncGenerator
+from unittest.mock import patch
+
+from datetime import datetime
+
+from bot.database.base import DatabaseError
+from bot.database.cached import CachedDatabaseManager
+from bot.database.memory import InMemoryDatabaseManager
+from bot.database.migrations import CompactTasksLayout, MigrationRunner, schema_version
+from bot.database.models import SECONDS_PER_DAY, BoardTask, Task, TaskStats
+from bot.database.sharded import ShardedSQLiteDatabaseManager, shard_for_user, shard_paths, split_database
+from bot.database.sqlite import SQLiteDatabaseManager
+from bot.utils.cache import LRUCache
+
+pytestmark = pytest.mark.asyncio
+
+class TestTaskModel:
+    """Тесты модели задачи."""
+
+    async def test_from_row_parses_created_at_lazily(self):
+        """created_at разбирается только при первом обращении."""
+        task = Task.from_row((1, 2, "Task", 1, "2025-01-02 03:04:05"))
+        assert task._created_at == "2025-01-02 03:04:05"
+        assert task.created_at == datetime(2025, 1, 2, 3, 4, 5)
+        assert task._created_at is task.created_at
+        assert task.status is True
+        assert not hasattr(task, '__dict__')
+        assert task == Task.from_db_row({
+            'id': 1, 'user_id': 2, 'description': "Task", 'status': 1, 'created_at': "2025-01-02T03:04:05"
+        })
+        assert task.to_dict()['created_at'] == "2025-01-02T03:04:05"
+
+@pytest.fixture
+async def group_db(tmp_path) -> AsyncGenerator[SQLiteDatabaseManager, None]:
+    """База данных в режиме группового коммита."""
+    db = SQLiteDatabaseManager(db_path=str(tmp_path / "group.db"), group_commit=True, group_commit_window=0.01)
+    await db.init()
+    yield db
+    await db.close()
+
+class TestGroupCommit:
+    """Тесты группового коммита записей."""
+
+    async def test_concurrent_writes_get_own_results(self, group_db: SQLiteDatabaseManager):
+        """Каждый вызов получает свой lastrowid/rowcount."""
+        ids = await asyncio.gather(*(group_db.add_task(1, f"Task {i}") for i in range(20)))
+        assert len(set(ids)) == 20
+
+        results = await asyncio.gather(
+            group_db.mark_task_done(1, ids[0], True),
+            group_db.mark_task_done(1, 999999, True),
+            group_db.delete_task(1, ids[1]),
+        )
+        assert results == [True, False, True]
+        assert await group_db.count_tasks(1) == 19
+        assert await group_db.count_tasks(1, True) == 1
+
+    async def test_failed_write_does_not_break_batch(self, group_db: SQLiteDatabaseManager):
+        """Ошибка одной записи не откатывает остальные записи пачки."""
+        async def failing(db):
+            await db.execute("INSERT INTO tasks (id, user_id, description) VALUES (?, ?, ?)", (10**9, 1, "Rolled back"))
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            group_db.add_task(1, "Kept"),
+            group_db._write(failing),
+            group_db.add_task(1, "Also kept"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], RuntimeError)
+        tasks = await group_db.get_tasks(1)
+        assert [task.description for task in tasks] == ["Kept", "Also kept"]
+
+    async def test_reads_wait_for_open_batch(self, group_db: SQLiteDatabaseManager):
+        """Без WAL чтение не видит незафиксированную пачку и ждет ее коммита."""
+        release = asyncio.Event()
+
+        async def slow_insert(db):
+            await db.execute("INSERT INTO tasks (id, user_id, description) VALUES (?, ?, ?)", (10**9, 1, "Pending"))
+            await release.wait()
+
+        writing = asyncio.create_task(group_db._write(slow_insert))
+        await asyncio.sleep(0.05)
+        reading = asyncio.create_task(group_db.get_tasks(1))
+        await asyncio.sleep(0.05)
+        assert not reading.done()
+        release.set()
+        await writing
+        assert [task.description for task in await reading] == ["Pending"]
+
+    async def test_stopped_writer_fails_queued_writes(self, group_db: SQLiteDatabaseManager):
+        """Записи из очереди остановленной задачи коммита завершаются ошибкой, а не зависают."""
+        orphaned = asyncio.create_task(group_db.add_task(1, "Orphaned"))
+        await asyncio.sleep(0)
+        # Задача коммита остановлена до того, как взяла запись из очереди
+        group_db._flusher.cancel()
+        await asyncio.sleep(0)
+        assert await group_db.add_task(1, "Kept")
+        with pytest.raises(DatabaseError):
+            await asyncio.wait_for(orphaned, timeout=1)
+        assert [task.description for task in await group_db.get_tasks(1)] == ["Kept"]
+
+    async def test_writes_are_durable_after_close(self, tmp_path):
+        """Все поставленные в очередь записи фиксируются до закрытия."""
+        path = str(tmp_path / "durable.db")
+        db = SQLiteDatabaseManager(db_path=path, group_commit=True)
+        await db.init()
+        await asyncio.gather(*(db.add_task(2, f"Task {i}") for i in range(10)))
+        await db.close()
+
+        reopened = SQLiteDatabaseManager(db_path=path)
+        await reopened.init()
+        assert await reopened.count_tasks(2) == 10
+        await reopened.close()
+
+    async def test_invalid_batch_size(self):
+        """Размер пачки должен быть положительным."""
+        with pytest.raises(ValueError):
+            SQLiteDatabaseManager(group_commit=True, group_commit_max_batch=0)
+
+@pytest.fixture
+async def wal_db(tmp_path) -> AsyncGenerator[SQLiteDatabaseManager, None]:
+    """База данных в WAL-режиме с пулом соединений для чтения."""
+    db = SQLiteDatabaseManager(db_path=str(tmp_path / "wal.db"), wal=True, read_pool_size=2)
+    await db.init()
+    yield db
+    await db.close()
+
+class TestWalReaderPool:
+    """Тесты WAL-режима и пула соединений для чтения."""
+
+    async def test_journal_mode_is_wal(self, wal_db: SQLiteDatabaseManager):
+        """Соединение для записи работает в WAL-режиме."""
+        async with wal_db.get_db() as db:
+            cursor = await db.execute("PRAGMA journal_mode")
+            assert (await cursor.fetchone())[0] == "wal"
+
+    async def test_reads_do_not_block_behind_long_write(self, wal_db: SQLiteDatabaseManager):
+        """Чтения выполняются, пока открыта долгая транзакция записи."""
+        await wal_db.add_task(1, "Committed")
+        write_started = asyncio.Event()
+        release_write = asyncio.Event()
+
+        async def long_write(db):
+            task_id = await wal_db._allocate_task_ids(db, 1)
+            await db.execute("INSERT INTO tasks (id, user_id, description) VALUES (?, ?, ?)", (task_id, 1, "Pending"))
+            write_started.set()
+            await release_write.wait()
+
+        writer = asyncio.create_task(wal_db._write(long_write))
+        await write_started.wait()
+
+        tasks, total = await asyncio.wait_for(
+            asyncio.gather(wal_db.get_tasks(1), wal_db.count_tasks(1)),
+            timeout=2,
+        )
+        assert not writer.done()
+        assert [task.description for task in tasks] == ["Committed"]
+        assert total == 1
+
+        release_write.set()
+        await writer
+        assert await wal_db.count_tasks(1) == 2
+
+    async def test_reader_pool_is_bounded(self, wal_db: SQLiteDatabaseManager):
+        """Число соединений для чтения не превышает размер пула."""
+        await wal_db.add_task(1, "Task")
+        await asyncio.gather(*(wal_db.get_tasks(1) for _ in range(10)))
+        assert len(wal_db._all_readers) <= 2
+
+    async def test_invalid_checkpoint_mode(self):
+        """Неизвестный режим checkpoint отклоняется."""
+        with pytest.raises(ValueError):
+            SQLiteDatabaseManager(wal=True, checkpoint_mode="SOMETIMES")
+
+class TestTaskCounters:
+    """Тесты счетчиков задач пользователей."""
+
+    async def test_counters_follow_writes(self, test_db: SQLiteDatabaseManager):
+        """Счетчики меняются вместе с добавлением, статусом и удалением."""
+        first = await test_db.add_task(1, "First")
+        second = await test_db.add_task(1, "Second")
+        await test_db.add_task(2, "Other user")
+        await test_db.mark_task_done(1, first, True)
+        await test_db.mark_task_done(1, first, True)
+
+        assert await test_db.count_tasks(1) == 2
+        assert await test_db.count_tasks(1, True) == 1
+        assert await test_db.count_tasks(1, False) == 1
+
+        await test_db.delete_task(1, first)
+        await test_db.mark_task_done(1, second, False)
+        assert await test_db.count_tasks(1) == 1
+        assert await test_db.count_tasks(1, True) == 0
+        assert await test_db.count_tasks(3) == 0
+        assert await test_db.verify_counters() == []
+
+    async def test_verify_and_rebuild(self, test_db: SQLiteDatabaseManager):
+        """Проверка находит расхождения, а пересчет их устраняет."""
+        await test_db.add_task(1, "Task")
+        async with test_db.get_db() as db:
+            await db.execute("UPDATE user_task_counts SET total = 5 WHERE user_id = 1")
+            await db.commit()
+
+        assert await test_db.verify_counters() == [(1, 1, 0, 5, 0)]
+        await test_db.rebuild_counters()
+        assert await test_db.verify_counters() == []
+        assert await test_db.count_tasks(1) == 1
+
+    async def test_init_backfills_existing_database(self, tmp_path):
+        """Для базы без таблицы счетчиков они рассчитываются при инициализации."""
+        import sqlite3
+        path = str(tmp_path / "legacy.db")
+        connection = sqlite3.connect(path)
+        connection.execute('''CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, description TEXT, status BOOLEAN DEFAULT 0)''')
+        connection.executemany(
+            "INSERT INTO tasks (user_id, description, status) VALUES (?, ?, ?)",
+            [(1, "a", 0), (1, "b", 1), (2, "c", 1)],
+        )
+        connection.commit()
+        connection.close()
+
+        db = SQLiteDatabaseManager(db_path=path)
+        await db.init()
+        assert await db.count_tasks(1) == 2
+        assert await db.count_tasks(1, True) == 1
+        assert await db.count_tasks(2, False) == 0
+        await db.close()
+
+class TestSearchIndex:
+    """Тесты полнотекстового индекса SQLite."""
+
+    async def test_init_backfills_search_index(self, tmp_path):
+        """Задачи, добавленные до появления индекса, находятся поиском."""
+        import sqlite3
+        path = str(tmp_path / "legacy.db")
+        connection = sqlite3.connect(path)
+        connection.execute('''CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, description TEXT, status BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        connection.executemany(
+            "INSERT INTO tasks (user_id, description) VALUES (?, ?)", [(1, "Prepare release notes"), (1, "Fix bug")]
+        )
+        connection.commit()
+        connection.close()
+
+        db = SQLiteDatabaseManager(db_path=path)
+        await db.init()
+        try:
+            assert [task.description for task in await db.search_tasks(1, "release")] == ["Prepare release notes"]
+            await db.rebuild_search_index()
+            assert len(await db.search_tasks(1, "fix")) == 1
+        finally:
+            await db.close()
+
+class TestArchive:
+    """Тесты переноса выполненных задач в архив."""
+
+    async def age_completed(self, db: SQLiteDatabaseManager, days: float) -> None:
+        """Сдвиг времени выполнения всех выполненных задач в прошлое."""
+        async with db.get_db() as conn:
+            await conn.execute("UPDATE tasks SET completed_at = completed_at - ?", (int(days * 86400),))
+            await conn.commit()
+
+    async def test_old_done_tasks_move_in_batches(self, tmp_path):
+        """Старые выполненные задачи уходят в архив пачками, открытые остаются."""
+        db = SQLiteDatabaseManager(db_path=str(tmp_path / "tasks.db"), archive_batch_size=2, archive_batch_pause=0)
+        await db.init()
+        changed = []
+        db.add_archive_listener(changed.append)
+        try:
+            ids = await db.add_tasks(1, [f"Task {i}" for i in range(6)])
+            other = await db.add_task(2, "Other")
+            await db.set_status_many(1, ids[:5], True)
+            await db.mark_task_done(2, other, True)
+            await self.age_completed(db, 40)
+            # Выполнена только что - еще горячая
+            await db.mark_task_done(1, ids[4], False)
+            await db.mark_task_done(1, ids[4], True)
+
+            with patch.object(db, '_copy_to_archive', wraps=db._copy_to_archive) as copy:
+                assert await db.archive_done_tasks(30 * 86400) == 5
+            assert copy.call_count == 3
+            assert sorted(set(changed)) == [1, 2]
+
+            assert [task.id for task in await db.get_tasks(1)] == ids[4:]
+            assert [task.id for task in await db.get_archived_tasks(1)] == ids[:4]
+            assert all(task.status for task in await db.get_archived_tasks(1))
+            assert await db.count_archived_tasks(1) == 4
+            assert await db.count_tasks(1) == 2
+            assert await db.verify_counters() == []
+            # Экспорт по-прежнему видит все задачи
+            exported = [task.id for chunk in [chunk async for chunk in db.iter_tasks(1)] for task in chunk]
+            assert exported == ids
+            assert await db.archive_done_tasks(30 * 86400) == 0
+        finally:
+            await db.close()
+
+    async def test_interrupted_move_is_finished_later(self, test_db: SQLiteDatabaseManager):
+        """Сбой между копированием и удалением не дублирует и не теряет задачи."""
+        ids = await test_db.add_tasks(1, ["a", "b"])
+        await test_db.set_status_many(1, ids, True)
+        await self.age_completed(test_db, 40)
+        cutoff = int(time.time())
+        assert await test_db._write(lambda db: test_db._copy_to_archive(db, cutoff)) == ids
+
+        exported = [task.id for chunk in [chunk async for chunk in test_db.iter_tasks(1)] for task in chunk]
+        assert exported == ids
+        # Задача снова открыта до следующего прохода
+        await test_db.mark_task_done(1, ids[1], False)
+        assert await test_db.archive_done_tasks(30 * 86400) == 1
+        assert [task.id for task in await test_db.get_tasks(1)] == [ids[1]]
+        assert [task.id for task in await test_db.get_archived_tasks(1)] == [ids[0]]
+
+    async def test_incremental_vacuum_shrinks_file(self, tmp_path):
+        """После переноса свободные страницы основной базы возвращаются."""
+        path = tmp_path / "tasks.db"
+        db = SQLiteDatabaseManager(db_path=str(path), archive_batch_pause=0)
+        await db.init()
+        try:
+            async with db.read_db() as conn:
+                cursor = await conn.execute("PRAGMA auto_vacuum")
+                assert (await cursor.fetchone())[0] == 2
+            ids = await db.add_tasks(1, ["x" * 400] * 2000)
+            await db.set_status_many(1, ids, True)
+            await self.age_completed(db, 40)
+            await db.checkpoint()
+            size = path.stat().st_size
+
+            assert await db.archive_done_tasks(30 * 86400) == 2000
+            await db.checkpoint()
+            assert path.stat().st_size < size / 2
+        finally:
+            await db.close()
+
+    async def test_vacuum_converts_legacy_database(self, tmp_path):
+        """Старая база: выполненным задачам ставится время, vacuum включает incremental."""
+        import sqlite3
+        path = str(tmp_path / "legacy.db")
+        connection = sqlite3.connect(path)
+        connection.execute('''CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, description TEXT, status BOOLEAN DEFAULT 0)''')
+        connection.executemany("INSERT INTO tasks (user_id, description, status) VALUES (?, ?, ?)", [(1, "a", 1), (1, "b", 0)])
+        connection.commit()
+        connection.close()
+
+        db = SQLiteDatabaseManager(db_path=path)
+        await db.init()
+        try:
+            async with db.get_db() as conn:
+                cursor = await conn.execute("SELECT completed_at IS NOT NULL FROM tasks ORDER BY id")
+                assert [row[0] for row in await cursor.fetchall()] == [1, 0]
+                cursor = await conn.execute("PRAGMA auto_vacuum")
+                assert (await cursor.fetchone())[0] == 0
+            await db.vacuum()
+            async with db.get_db() as conn:
+                cursor = await conn.execute("PRAGMA auto_vacuum")
+                assert (await cursor.fetchone())[0] == 2
+            # Возраст старых задач отсчитывается от первого запуска
+            assert await db.archive_done_tasks(30 * 86400) == 0
+        finally:
+            await db.close()
+
+    async def test_archive_invalidates_cache_and_survives_split(self, tmp_path):
+        """Перенос сбрасывает кэш пользователя; при разделении на шарды архив сохраняется."""
+        source_path = str(tmp_path / "tasks.db")
+        source = SQLiteDatabaseManager(db_path=source_path, archive_batch_pause=0)
+        cached = CachedDatabaseManager(source)
+        source.add_archive_listener(cached.invalidate_user)
+        await cached.init()
+        expected = {}
+        for user_id in range(1, 9):
+            ids = await cached.add_tasks(user_id, ["a", "b"])
+            await cached.mark_task_done(user_id, ids[0], True)
+            expected[user_id] = ids
+        await self.age_completed(source, 40)
+        assert len(await cached.get_tasks(1)) == 2
+        assert await cached.archive_done_tasks(30 * 86400) == 8
+        assert [task.id for task in await cached.get_tasks(1)] == expected[1][1:]
+        await cached.close()
+
+        paths = shard_paths(source_path, 2)
+        await split_database(source_path, paths)
+        db = ShardedSQLiteDatabaseManager(paths)
+        await db.init()
+        try:
+            for user_id, ids in expected.items():
+                assert [task.id for task in await db.get_archived_tasks(user_id)] == ids[:1]
+                assert [task.id for task in await db.get_tasks(user_id)] == ids[1:]
+            assert await db.add_task(99, "new") > expected[8][1]
+        finally:
+            await db.close()
+
+class TestMigrations:
+    """Тесты версионных миграций схемы."""
+
+    def legacy_database(self, path: str, rows: int) -> None:
+        """База исходной схемы (версия 0) с rows задачами двух пользователей."""
+        import sqlite3
+        connection = sqlite3.connect(path)
+        connection.execute('''CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, description TEXT, status BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        connection.executemany(
+            "INSERT INTO tasks (user_id, description, status, created_at) VALUES (?, ?, ?, ?)",
+            [(i % 2, f"Task {i}", i % 3 == 0, "2025-01-02 03:04:05") for i in range(rows)],
+        )
+        connection.commit()
+        connection.close()
+
+    async def snapshot(self, db: SQLiteDatabaseManager) -> list:
+        """Все задачи обоих пользователей в виде кортежей."""
+        tasks = await db.get_tasks(0, limit=1000) + await db.get_tasks(1, limit=1000)
+        return sorted((task.id, task.user_id, task.description, task.status, task.created_at) for task in tasks)
+
+    async def test_legacy_database_is_migrated(self, tmp_path):
+        """База версии 0 переводится на компактную схему без потери данных."""
+        path = str(tmp_path / "legacy.db")
+        self.legacy_database(path, 25)
+        db = SQLiteDatabaseManager(db_path=path, migrate_on_start=False)
+        await db.init()
+        try:
+            before = await self.snapshot(db)
+            assert await db.migrate() == [1]
+            assert await db.migrate() == []
+            async with db.get_db() as conn:
+                assert await schema_version(conn) == 1
+                cursor = await conn.execute("SELECT strict, wr FROM pragma_table_list WHERE name = 'tasks'")
+                assert await cursor.fetchone() == (1, 1)
+                cursor = await conn.execute("SELECT DISTINCT typeof(created_at), typeof(status) FROM tasks")
+                assert await cursor.fetchall() == [("integer", "integer")]
+            assert await self.snapshot(db) == before
+            assert before[0][4] == datetime(2025, 1, 2, 3, 4, 5)
+            assert await db.count_tasks(0, True) == 5
+            assert await db.add_task(1, "After migration") == 26
+            assert [task.description for task in await db.search_tasks(1, "migration")] == ["After migration"]
+        finally:
+            await db.close()
+
+    async def test_writes_during_copy_are_mirrored(self, tmp_path):
+        """Записи, сделанные между пачками копирования, попадают в новую таблицу."""
+        path = str(tmp_path / "legacy.db")
+        self.legacy_database(path, 20)
+        db = SQLiteDatabaseManager(db_path=path, migrate_on_start=False)
+        await db.init()
+        try:
+            layout = CompactTasksLayout()
+            await db._write(layout.prepare)
+            assert await db._write(lambda conn: layout.copy_batch(conn, 5)) == 5
+
+            new_id = await db.add_task(0, "Added during copy")
+            assert await db.mark_task_done(1, 2, True)  # уже скопирована
+            assert await db.mark_task_done(1, 16, True)  # еще не скопирована
+            assert await db.delete_task(1, 4)
+            assert await db.delete_task(0, 15)
+            before = await self.snapshot(db)
+
+            await MigrationRunner(db, [layout], batch_size=5, batch_pause=0).run()
+            after = await self.snapshot(db)
+            assert after == before
+            assert new_id in [task[0] for task in after]
+            assert {task[0] for task in after if task[3]} >= {2, 16}
+            assert await db.count_tasks(0) + await db.count_tasks(1) == 19
+        finally:
+            await db.close()
+
+    async def test_interrupted_migration_resumes(self, tmp_path):
+        """После перезапуска копирование продолжается с сохраненного места."""
+        class CountingLayout(CompactTasksLayout):
+            copied = 0
+
+            async def copy_batch(self, db, limit):
+                count = await super().copy_batch(db, limit)
+                self.copied += count
+                return count
+
+        path = str(tmp_path / "legacy.db")
+        self.legacy_database(path, 50)
+        db = SQLiteDatabaseManager(db_path=path, migrate_on_start=False)
+        await db.init()
+        before = await self.snapshot(db)
+        layout = CompactTasksLayout()
+        await db._write(layout.prepare)
+        for _ in range(2):
+            await db._write(lambda conn: layout.copy_batch(conn, 10))
+        await db.close()
+
+        db = SQLiteDatabaseManager(db_path=path, migrate_on_start=False)
+        await db.init()
+        try:
+            async with db.get_db() as conn:
+                cursor = await conn.execute("SELECT last_id FROM schema_migration_progress WHERE version = 1")
+                assert await cursor.fetchone() == (20,)
+            resumed = CountingLayout()
+            assert await MigrationRunner(db, [resumed], batch_size=10, batch_pause=0).run() == [1]
+            assert resumed.copied == 30
+            assert await self.snapshot(db) == before
+            async with db.get_db() as conn:
+                cursor = await conn.execute("SELECT COUNT(*), COUNT(DISTINCT id) FROM tasks")
+                assert await cursor.fetchone() == (50, 50)
+                cursor = await conn.execute("SELECT COUNT(*) FROM schema_migration_progress")
+                assert (await cursor.fetchone())[0] == 0
+        finally:
+            await db.close()
+
+    async def test_finish_rejects_row_count_mismatch(self, tmp_path):
+        """Если копия неполная, переключение отменяется и старая схема остается."""
+        path = str(tmp_path / "legacy.db")
+        self.legacy_database(path, 10)
+        db = SQLiteDatabaseManager(db_path=path, migrate_on_start=False)
+        await db.init()
+        try:
+            layout = CompactTasksLayout()
+            await db._write(layout.prepare)
+            while await db._write(lambda conn: layout.copy_batch(conn, 100)):
+                pass
+
+            async def lose_row(conn):
+                await conn.execute("DELETE FROM tasks_compact WHERE id = 3")
+            await db._write(lose_row)
+
+            with pytest.raises(DatabaseError):
+                await db._write(lambda conn: layout.finish(conn, db))
+            with pytest.raises(DatabaseError):
+                await db.migrate()
+            async with db.get_db() as conn:
+                assert await schema_version(conn) == 0
+            assert await db.count_tasks(0) + await db.count_tasks(1) == 10
+        finally:
+            await db.close()
+
+    async def test_concurrent_runners(self, tmp_path):
+        """Два процесса, мигрирующие одну базу, ждут друг друга, а не падают."""
+        path = str(tmp_path / "legacy.db")
+        self.legacy_database(path, 60)
+        managers = [SQLiteDatabaseManager(db_path=path, wal=True, migrate_on_start=False) for _ in range(2)]
+        for db in managers:
+            await db.init()
+        try:
+            before = await self.snapshot(managers[0])
+            await asyncio.gather(*(
+                MigrationRunner(db, batch_size=5, batch_pause=0).run() for db in managers
+            ))
+            for db in managers:
+                async with db.get_db() as conn:
+                    assert await schema_version(conn) == 1
+                assert await self.snapshot(db) == before
+        finally:
+            for db in managers:
+                await db.close()
+
+class TestTaskStats:
+    """Тесты агрегатов статистики задач."""
+
+    async def run_writes(self, db) -> int:
+        """Одинаковые записи для всех хранилищ; возвращает текущие сутки."""
+        ids = await db.add_tasks(1, ["a", "b", "c", "d"])
+        await db.add_tasks(2, ["imported", "open"], [True, False])
+        await db.mark_task_done(1, ids[0], True)
+        await db.set_status_many(1, ids[1:3], True)
+        await db.mark_task_done(1, ids[2], False)
+        await db.delete_task(1, ids[1])
+        await db.delete_task(1, ids[3])
+        return int(time.time()) // SECONDS_PER_DAY
+
+    @pytest.mark.parametrize("backend", ["sqlite", "memory", "sharded"])
+    async def test_stats_follow_writes(self, backend, tmp_path):
+        """Итоги и суточные счетчики меняются вместе с записями во всех хранилищах."""
+        if backend == "sqlite":
+            db = SQLiteDatabaseManager(db_path=str(tmp_path / "tasks.db"))
+        elif backend == "memory":
+            db = InMemoryDatabaseManager(log_path=str(tmp_path / "tasks.oplog"))
+        else:
+            db = ShardedSQLiteDatabaseManager(shard_paths(str(tmp_path / "tasks.db"), 3))
+        await db.init()
+        try:
+            today = await self.run_writes(db)
+            # Удаление не меняет историю, снятая отметка вычитается
+            assert await db.get_user_stats(1, today) == TaskStats(2, 1, [(today, 4, 2)])
+            assert await db.get_user_stats(2, today) == TaskStats(2, 1, [(today, 2, 1)])
+            assert await db.get_user_stats(3, today) == TaskStats(0, 0, [])
+            assert await db.get_user_stats(1, today + 1) == TaskStats(2, 1, [])
+            assert await db.get_global_stats(today) == TaskStats(4, 2, [(today, 6, 3)], 2)
+            await db.delete_many(2, [task.id for task in await db.get_tasks(2)])
+            assert (await db.get_global_stats(today)).users == 1
+        finally:
+            await db.close()
+
+    async def test_unmark_counts_against_completion_day(self, test_db: SQLiteDatabaseManager):
+        """Снятие отметки уменьшает счетчик тех суток, когда задача была выполнена."""
+        task_id = await test_db.add_task(1, "a")
+        await test_db.mark_task_done(1, task_id, True)
+        async with test_db.get_db() as db:
+            await db.execute("UPDATE tasks SET completed_at = completed_at - ?", (3 * SECONDS_PER_DAY,))
+            await db.commit()
+        await test_db.mark_task_done(1, task_id, False)
+        today = int(time.time()) // SECONDS_PER_DAY
+        assert (await test_db.get_user_stats(1, today - 7)).daily == [(today - 3, 0, -1), (today, 1, 1)]
+
+    async def test_backfill_matches_incremental_stats(self, tmp_path):
+        """Пересчет по задачам и архиву совпадает с накопленными триггерами агрегатами."""
+        db = SQLiteDatabaseManager(db_path=str(tmp_path / "tasks.db"))
+        await db.init()
+        try:
+            ids = await db.add_tasks(1, ["a", "b", "c"])
+            await db.add_task(2, "d")
+            await db.set_status_many(1, ids[:2], True)
+            assert await db.archive_done_tasks(-60) == 2
+            today = int(time.time()) // SECONDS_PER_DAY
+            incremental = (await db.get_user_stats(1, 0), await db.get_global_stats(0))
+            assert incremental[0] == TaskStats(1, 0, [(today, 3, 2)])
+
+            await db.rebuild_stats()
+            assert (await db.get_user_stats(1, 0), await db.get_global_stats(0)) == incremental
+        finally:
+            await db.close()
+
+    async def test_init_backfills_existing_database(self, tmp_path):
+        """База без таблиц статистики заполняет их при первом открытии."""
+        import sqlite3
+        path = str(tmp_path / "legacy.db")
+        connection = sqlite3.connect(path)
+        connection.execute('''CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, description TEXT, status BOOLEAN DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        connection.executemany(
+            "INSERT INTO tasks (user_id, description, status, created_at) VALUES (?, ?, ?, ?)",
+            [(1, "a", 1, "1970-01-03 10:00:00"), (1, "b", 0, "1970-01-03 11:00:00"), (2, "c", 0, "1970-01-05 00:00:00")],
+        )
+        connection.commit()
+        connection.close()
+
+        db = SQLiteDatabaseManager(db_path=path, migrate_on_start=False)
+        await db.init()
+        try:
+            today = int(time.time()) // SECONDS_PER_DAY
+            # Время выполнения старых задач неизвестно и отсчитывается от открытия базы
+            assert await db.get_user_stats(1, 0) == TaskStats(2, 1, [(2, 2, 0), (today, 0, 1)])
+            assert await db.get_global_stats(0) == TaskStats(3, 1, [(2, 2, 0), (4, 1, 0), (today, 0, 1)], 2)
+        finally:
+            await db.close()
+
+def board_backend(backend: str, tmp_path):
+    """Хранилище для тестов общих досок."""
+    if backend == "sqlite":
+        return SQLiteDatabaseManager(db_path=str(tmp_path / "tasks.db"), group_commit=True, wal=True)
+    if backend == "memory":
+        return InMemoryDatabaseManager(log_path=str(tmp_path / "tasks.oplog"))
+    if backend == "sharded":
+        return ShardedSQLiteDatabaseManager(shard_paths(str(tmp_path / "tasks.db"), 3))
+    return CachedDatabaseManager(SQLiteDatabaseManager(db_path=str(tmp_path / "tasks.db")))
+
+class TestBoards:
+    """Тесты общих досок с версиями строк."""
+
+    @pytest.mark.parametrize("backend", ["sqlite", "memory", "sharded", "cached"])
+    async def test_writes_compare_versions(self, backend, tmp_path):
+        """Запись с устаревшей версией отклоняется, ID задач доски не переиспользуются."""
+        db = board_backend(backend, tmp_path)
+        await db.init()
+        try:
+            first = await db.add_board_task(500, 1, "Shared")
+            second = await db.add_board_task(500, 2, "Second")
+            assert await db.add_board_task(600, 1, "Other board") == 1
+            assert await db.get_board_task(500, first) == BoardTask(first, 500, "Shared", False, 1, 1, 1)
+
+            assert await db.update_board_task(500, first, 1, 2, status=True) == 2
+            # Второй участник прочитал версию 1 до первой записи
+            assert await db.update_board_task(500, first, 1, 3, description="Lost edit") is None
+            assert await db.update_board_task(500, first, 2, 3, description="Edited") == 3
+            assert await db.get_board_task(500, first) == BoardTask(first, 500, "Edited", True, 3, 1, 3)
+
+            assert not await db.delete_board_task(500, second, 2)
+            assert await db.delete_board_task(500, second, 1)
+            assert await db.update_board_task(500, second, 1, 1, status=True) is None
+            assert [task.id for task in await db.get_board_tasks(500)] == [first]
+            assert await db.count_board_tasks(500) == 1
+            assert await db.count_board_tasks(700) == 0
+            assert await db.add_board_task(500, 1, "Third") == second + 1
+        finally:
+            await db.close()
+
+    @pytest.mark.parametrize("backend", ["sqlite", "memory"])
+    async def test_concurrent_editors_lose_no_updates(self, backend, tmp_path):
+        """Каждое успешное сравнение версии видит результат предыдущего."""
+        db = board_backend(backend, tmp_path)
+        await db.init()
+        try:
+            task_id = await db.add_board_task(500, 1, "0")
+            conflicts = 0
+
+            async def editor(user_id: int) -> None:
+                nonlocal conflicts
+                for _ in range(5):
+                    while True:
+                        task = await db.get_board_task(500, task_id)
+                        if await db.update_board_task(500, task_id, task.version, user_id,
+                                                      description=str(int(task.description) + 1)):
+                            break
+                        conflicts += 1
+
+            await asyncio.gather(*(editor(user_id) for user_id in range(1, 21)))
+            task = await db.get_board_task(500, task_id)
+            assert (task.description, task.version) == ("100", 101)
+            if backend == "sqlite":
+                # Чтения из пула идут параллельно с пачками записи
+                assert conflicts > 0
+        finally:
+            await db.close()
+
+    async def test_boards_survive_restart_and_split(self, tmp_path):
+        """Доски восстанавливаются из журнала и переносятся в шарды."""
+        log_path = str(tmp_path / "tasks.oplog")
+        memory = InMemoryDatabaseManager(log_path=log_path, snapshot_every=2)
+        await memory.init()
+        task_id = await memory.add_board_task(500, 1, "a")
+        await memory.update_board_task(500, task_id, 1, 2, status=True)
+        await memory.delete_board_task(500, await memory.add_board_task(500, 1, "b"), 1)
+        await asyncio.sleep(0)
+        await memory.close()
+        restored = InMemoryDatabaseManager(log_path=log_path)
+        await restored.init()
+        assert await restored.get_board_tasks(500) == [BoardTask(task_id, 500, "a", True, 2, 1, 2)]
+        assert await restored.add_board_task(500, 1, "c") == 3
+        await restored.close()
+
+        source_path = str(tmp_path / "tasks.db")
+        source = SQLiteDatabaseManager(db_path=source_path)
+        await source.init()
+        for board_id in range(500, 520):
+            await source.add_board_task(board_id, 1, f"Board {board_id}")
+        await source.close()
+        paths = shard_paths(source_path, 3)
+        await split_database(source_path, paths)
+        db = ShardedSQLiteDatabaseManager(paths)
+        await db.init()
+        try:
+            for board_id in range(500, 520):
+                assert [task.description for task in await db.get_board_tasks(board_id)] == [f"Board {board_id}"]
+                assert await db.count_board_tasks(board_id) == 1
+                assert await db.add_board_task(board_id, 1, "next") == 2
+        finally:
+            await db.close()
+
+class TestCachedDatabaseManager:
+    """Тесты кэширующей обертки над базой данных."""
+
+    @pytest.fixture
+    def cached_db(self, test_db: SQLiteDatabaseManager) -> CachedDatabaseManager:
+        """Кэш поверх тестовой базы данных."""
+        return CachedDatabaseManager(test_db, max_entries=100, max_bytes=1024 * 1024)
+
+    async def test_repeated_reads_hit_cache(self, cached_db: CachedDatabaseManager):
+        """Повторное чтение страницы и счетчика не обращается к базе."""
+        await cached_db.add_task(1, "Task")
+        first = await cached_db.get_tasks(1)
+        assert await cached_db.count_tasks(1) == 1
+        assert await cached_db.get_tasks(1) is first
+        assert await cached_db.count_tasks(1) == 1
+        assert cached_db.stats.hits == 2
+        assert cached_db.stats.misses == 2
+
+    async def test_writes_invalidate_only_their_user(self, cached_db: CachedDatabaseManager):
+        """Запись сбрасывает кэш только своего пользователя."""
+        task_id = await cached_db.add_task(1, "Mine")
+        await cached_db.add_task(2, "Other")
+        await cached_db.get_tasks(1)
+        await cached_db.get_tasks(2)
+
+        await cached_db.mark_task_done(1, task_id, True)
+        assert (await cached_db.get_tasks(1))[0].status
+        await cached_db.get_tasks(2)
+        assert cached_db.stats.hits == 1
+
+        assert not await cached_db.delete_task(1, 999999)
+        await cached_db.get_tasks(1)
+        assert cached_db.stats.hits == 2
+
+    async def test_read_started_before_write_is_not_cached(self, cached_db: CachedDatabaseManager):
+        """Результат чтения, пересекшегося с записью, не сохраняется."""
+        release = asyncio.Event()
+        original = cached_db.db.count_tasks
+
+        async def slow_count(user_id, status=None):
+            result = await original(user_id, status)
+            await release.wait()
+            return result
+
+        cached_db.db.count_tasks = slow_count
+        reader = asyncio.create_task(cached_db.count_tasks(1))
+        await asyncio.sleep(0.01)
+        await cached_db.add_task(1, "Task")
+        release.set()
+        assert await reader == 0
+        del cached_db.db.count_tasks
+        assert await cached_db.count_tasks(1) == 1
+
+    async def test_lru_bounds(self):
+        """Кэш соблюдает ограничения по числу записей и размеру."""
+        cache = LRUCache(max_entries=2, max_bytes=100, sizeof=lambda value: value)
+        cache.set("a", 10, tag=1)
+        cache.set("b", 10, tag=1)
+        cache.get("a")
+        cache.set("c", 10, tag=2)
+        assert cache.get("b") is None
+        assert cache.stats.evictions == 1
+
+        cache.set("d", 95)
+        assert len(cache) == 1 and cache.stats.size_bytes == 95
+        cache.set("e", 500)
+        assert cache.get("e") is None
+
+        cache.set("f", 1, tag=3)
+        assert cache.invalidate_tag(3) == 1
+        assert cache.get("f") is None
+
+class TestShardedDatabase:
+    """Тесты менеджера базы данных с шардированием по user_id."""
+
+    async def test_users_are_routed_to_their_shard(self, tmp_path):
+        """Задачи пользователя хранятся и читаются из одного шарда."""
+        paths = [str(tmp_path / f"shard{index}.db") for index in range(3)]
+        db = ShardedSQLiteDatabaseManager(paths)
+        await db.init()
+        try:
+            user_ids = list(range(1000, 1030))
+            for user_id in user_ids:
+                await db.add_tasks(user_id, [f"Task of {user_id}", "Second"])
+            assert [await db.count_tasks(user_id) for user_id in user_ids] == [2] * len(user_ids)
+            assert len({shard_for_user(user_id, 3) for user_id in user_ids}) == 3
+
+            shard = db.shard(user_ids[0])
+            assert [task.description for task in await shard.get_tasks(user_ids[0])] == [f"Task of {user_ids[0]}", "Second"]
+            assert await db.verify_counters() == []
+
+            # Напоминания всех шардов сливаются по времени
+            for offset, user_id in enumerate(user_ids):
+                task_id = (await db.get_tasks(user_id, 1))[0].id
+                await db.set_reminder(user_id, task_id, 5000 - offset, channel_id=1)
+            reminders = await db.due_reminders(10000, 5)
+            assert [reminder.remind_at for reminder in reminders] == [4971, 4972, 4973, 4974, 4975]
+            assert await db.claim_reminder(reminders[0], 6000) == (f"Task of {user_ids[-1]}", False)
+        finally:
+            await db.close()
+
+    async def test_split_existing_database(self, tmp_path):
+        """Разделение базы сохраняет задачи, их ID и счетчики."""
+        source_path = str(tmp_path / "tasks.db")
+        source = SQLiteDatabaseManager(db_path=source_path)
+        await source.init()
+        expected = {}
+        for user_id in range(1, 21):
+            ids = await source.add_tasks(user_id, ["a", "b"])
+            await source.mark_task_done(user_id, ids[0], True)
+            expected[user_id] = ids
+        last_id = await source.add_task(99, "deleted later")
+        await source.delete_task(99, last_id)
+        await source.close()
+
+        paths = shard_paths(source_path, 4)
+        counts = await split_database(source_path, paths)
+        assert sum(counts) == 40
+
+        db = ShardedSQLiteDatabaseManager(paths)
+        await db.init()
+        try:
+            for user_id, ids in expected.items():
+                tasks = await db.get_tasks(user_id)
+                assert [task.id for task in tasks] == ids
+                assert await db.count_tasks(user_id, True) == 1
+            assert await db.add_task(99, "new") > last_id
+        finally:
+            await db.close()
+
+        with pytest.raises(DatabaseError):
+            await split_database(source_path, paths)
+
+class TestInMemoryDatabase:
+    """Тесты хранилища в памяти с журналом операций."""
+
+    async def test_state_survives_restart(self, tmp_path):
+        """Журнал и снимок восстанавливают состояние после перезапуска."""
+        log_path = str(tmp_path / "tasks.oplog")
+        db = InMemoryDatabaseManager(log_path=log_path, snapshot_every=3)
+        await db.init()
+        ids = await db.add_tasks(1, ["a", "b", "c"])
+        await db.mark_task_done(1, ids[0], True)
+        await db.delete_task(1, ids[1])
+        await db.add_task(2, "other")
+        await db.set_status_many(2, [999], True)
+        await db.add_tasks(3, ["imported", "done"], [False, True])
+        stats = (await db.get_user_stats(1, 0), await db.get_global_stats(0))
+        await asyncio.sleep(0)
+        await db.close()
+
+        restored = InMemoryDatabaseManager(log_path=log_path, snapshot_every=3)
+        await restored.init()
+        tasks = await restored.get_tasks(1)
+        assert [(task.id, task.description, task.status) for task in tasks] == [(ids[0], "a", True), (ids[2], "c", False)]
+        assert await restored.count_tasks(1, True) == 1
+        assert await restored.count_tasks(2) == 1
+        assert await restored.count_tasks(3, True) == 1
+        assert (await restored.get_user_stats(1, 0), await restored.get_global_stats(0)) == stats
+        assert await restored.add_task(1, "d") > ids[-1]
+        await restored.close()
+
+    async def test_replay_without_snapshot_ignores_truncated_record(self, tmp_path):
+        """Недописанная строка в конце журнала пропускается."""
+        log_path = str(tmp_path / "tasks.oplog")
+        db = InMemoryDatabaseManager(log_path=log_path, snapshot_every=1000)
+        await db.init()
+        await db.add_tasks(1, ["a", "b"])
+        await db._sync(db._seq)
+        db._log.close()
+        db._log = None
+        with open(log_path, "a", encoding="utf-8") as log:
+            log.write('{"op":"delete","user":1,')
+
+        restored = InMemoryDatabaseManager(log_path=log_path)
+        await restored.init()
+        assert await restored.count_tasks(1) == 2
+        # Хвост обрезан: запись после восстановления не склеивается с ним
+        await restored.add_task(1, "c")
+        restored._log.close()
+        restored._log = None
+
+        crashed_again = InMemoryDatabaseManager(log_path=log_path)
+        await crashed_again.init()
+        assert [task.description for task in await crashed_again.get_tasks(1)] == ["a", "b", "c"]
+        await crashed_again.close()
+
+    async def test_changes_are_visible_only_after_fsync(self, tmp_path):
+        """Изменение применяется к состоянию только после fsync журнала."""
+        db = InMemoryDatabaseManager(log_path=str(tmp_path / "tasks.oplog"), fsync_interval=0)
+        await db.init()
+        release = asyncio.Event()
+        fsync = db._fsync
+
+        async def slow_fsync():
+            await release.wait()
+            await fsync()
+
+        with patch.object(db, "_fsync", slow_fsync):
+            adding = asyncio.create_task(db.add_tasks(1, ["a", "b"]))
+            other = asyncio.create_task(db.add_task(2, "c"))
+            await asyncio.sleep(0.01)
+            assert await db.count_tasks(1) == 0
+            release.set()
+            ids = await adding
+        assert await other not in ids
+        assert [task.id for task in await db.get_tasks(1)] == ids
+        await db.close()
+
+    async def test_failed_fsync_does_not_apply_change(self, tmp_path):
+        """Запись, для которой fsync не удался, не применяется ни сейчас, ни после перезапуска."""
+        log_path = str(tmp_path / "tasks.oplog")
+        db = InMemoryDatabaseManager(log_path=log_path, fsync_interval=0)
+        await db.init()
+        await db.add_task(1, "kept")
+
+        def failing_fsync(fd):
+            raise OSError(5, "Input/output error")
+
+        with patch("os.fsync", failing_fsync):
+            with pytest.raises(DatabaseError):
+                await db.add_task(1, "first")
+        assert [task.description for task in await db.get_tasks(1)] == ["kept"]
+        await db.add_task(1, "second")
+        assert [task.description for task in await db.get_tasks(1)] == ["kept", "second"]
+        db._log.close()
+        db._log = None
+
+        restored = InMemoryDatabaseManager(log_path=log_path)
+        await restored.init()
+        assert [task.description for task in await restored.get_tasks(1)] == ["kept", "second"]
+        await restored.close()
+
+    async def test_returned_tasks_are_copies(self):
+        """Изменение возвращенной задачи не меняет хранилище."""
+        db = InMemoryDatabaseManager(log_path=None)
+        await db.init()
+        task_id = await db.add_task(1, "a")
+        (await db.get_tasks(1))[0].status = True
+        assert await db.count_tasks(1, True) == 0
+        assert (await db.get_tasks_after(1, 0))[0].id == task_id
+        await db.close()
@@ -0,0 +1,127 @@
+import pytest
+import asyncio
+import logging
+import time
+from unittest.mock import MagicMock
+
+import discord
+
+from bot.commands.base import CommandContext
+from bot.core.dispatcher import OutboundDispatcher
+from bot.utils.metrics import OUTBOUND_MESSAGES
+
+pytestmark = pytest.mark.asyncio
+
+class FakeChannel:
+    """Канал, запоминающий отправленные сообщения."""
+
+    def __init__(self, channel_id: int = 1, delay: float = 0, failures=()):
+        self.id = channel_id
+        self.delay = delay
+        self.failures = list(failures)
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((time.monotonic(), content, kwargs))
+        return f"message-{len(self.sent)}"
+
+def http_error(status: int) -> discord.HTTPException:
+    response = MagicMock(status=status, reason="error")
+    return discord.HTTPException(response, "error")
+
+@pytest.fixture
+async def dispatcher():
+    dispatcher = OutboundDispatcher(logging.getLogger('test'), channel_rate=5, channel_per=0.2)
+    yield dispatcher
+    await dispatcher.close(timeout=1)
+
+class TestOutboundDispatcher:
+    """Тесты очереди исходящих сообщений."""
+
+    async def test_send_returns_before_delivery(self, dispatcher):
+        """Обработчик не ждет отправки, а deliver() дожидается сообщения."""
+        channel = FakeChannel(delay=0.05)
+        ctx = CommandContext(1, channel, dispatcher.sender(channel), logging.getLogger('test'))
+
+        await ctx.reply("first")
+        assert channel.sent == []
+        assert await ctx.deliver("second") == "message-1"
+        assert [content for _, content, _ in channel.sent] == ["first\nsecond"]
+
+    async def test_coalesces_only_plain_messages(self, dispatcher):
+        """Текстовые ответы склеиваются, сообщения с embed отправляются отдельно."""
+        channel = FakeChannel(delay=0.01)
+        embed = discord.Embed(title="Tasks")
+        futures = [
+            dispatcher.send(channel, "one"),
+            dispatcher.send(channel, "two"),
+            dispatcher.send(channel, "three"),
+            dispatcher.send(channel, embed=embed),
+            dispatcher.send(channel, "x" * 1999),
+        ]
+        await asyncio.gather(*futures)
+        contents = [content for _, content, _ in channel.sent]
+        assert contents == ["one\ntwo\nthree", None, "x" * 1999]
+        assert channel.sent[1][2] == {'embed': embed}
+        assert await futures[0] is await futures[2]
+
+    async def test_respects_channel_rate(self):
+        """Сверх лимита канала отправки ждут освобождения окна."""
+        dispatcher = OutboundDispatcher(logging.getLogger('test'), channel_rate=2, channel_per=0.2, coalesce=False)
+        channel = FakeChannel()
+        started = time.monotonic()
+        await asyncio.gather(*(dispatcher.send(channel, f"reply {i}") for i in range(3)))
+        times = [sent_at for sent_at, _, _ in channel.sent]
+        assert times[1] - started < 0.1
+        assert times[2] - started >= 0.19
+        await dispatcher.close()
+
+    async def test_retries_and_failures(self, dispatcher):
+        """5xx повторяются, прочие ошибки отдаются в Future и учитываются."""
+        channel = FakeChannel(failures=[http_error(500)])
+        assert await dispatcher.send(channel, "retried") == "message-1"
+
+        failed = OUTBOUND_MESSAGES.value('failed')
+        channel.failures.append(http_error(403))
+        with pytest.raises(discord.HTTPException):
+            await dispatcher.send(channel, "forbidden")
+        assert OUTBOUND_MESSAGES.value('failed') == failed + 1
+
+    async def test_retry_rewinds_attachments(self, dispatcher, tmp_path):
+        """Повтор отправляет вложение целиком, а не дочитанный файл."""
+        import io
+
+        class ReadingChannel(FakeChannel):
+            async def send(self, content=None, **kwargs):
+                data = kwargs['file'].fp.read()
+                if self.failures:
+                    raise self.failures.pop(0)
+                self.sent.append(data)
+                return "message"
+
+        channel = ReadingChannel(failures=[http_error(503)])
+        attachment = discord.File(io.BytesIO(b"id,description\n"), filename="tasks.csv")
+        assert await dispatcher.send(channel, "export", file=attachment) == "message"
+        assert channel.sent == [b"id,description\n"]
+
+        # Файл, открытый discord.File по пути, закрывается после запроса - повтора нет
+        path = tmp_path / "tasks.csv"
+        path.write_bytes(b"data")
+        closed = discord.File(str(path))
+        closed.close()
+        with pytest.raises(discord.HTTPException):
+            await dispatcher.send(FakeChannel(failures=[http_error(503)]), "export", file=closed)
+
+    async def test_close_flushes_pending(self):
+        """Закрытие дожидается отправки очереди."""
+        dispatcher = OutboundDispatcher(logging.getLogger('test'), coalesce=False)
+        channel = FakeChannel(delay=0.01)
+        for i in range(3):
+            dispatcher.send(channel, f"reply {i}")
+        await dispatcher.close(timeout=1)
+        assert len(channel.sent) == 3
+        with pytest.raises(RuntimeError):
+            await dispatcher.send(channel, "late")
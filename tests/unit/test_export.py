@@ -0,0 +1,64 @@
+import pytest
+import csv
+import io
+import json
+from unittest.mock import MagicMock
+
+from bot.commands.export import ExportCommandHandler
+from bot.database.sqlite import SQLiteDatabaseManager
+
+pytestmark = pytest.mark.asyncio
+
+class TestExportCommand:
+    """Тесты команды экспорта задач."""
+
+    @pytest.fixture
+    def export_handler(self, test_db: SQLiteDatabaseManager) -> ExportCommandHandler:
+        return ExportCommandHandler(test_db, MagicMock())
+
+    @staticmethod
+    def capture_attachments(mock_ctx: MagicMock) -> list:
+        """Содержимое вложений в момент отправки (после нее файл закрывается)."""
+        attachments = []
+
+        async def send(message=None, file=None, **kwargs):
+            if file is not None:
+                attachments.append((file.filename, file.fp.read().decode('utf-8')))
+        mock_ctx.send.side_effect = send
+        return attachments
+
+    async def test_export_csv(self, export_handler: ExportCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """CSV содержит заголовок и все задачи, включая запятые и кавычки."""
+        ids = await test_db.add_tasks(mock_ctx.author.id, [f"Task {i}" for i in range(1200)] + ['Say "hi", then leave'])
+        await test_db.mark_task_done(mock_ctx.author.id, ids[0], True)
+
+        attachments = self.capture_attachments(mock_ctx)
+        await export_handler.export_tasks(mock_ctx, 'csv')
+        assert "Экспортировано задач: 1201" in mock_ctx.send.call_args[0][0]
+        [(filename, content)] = attachments
+        assert filename == f"tasks_{mock_ctx.author.id}.csv"
+        rows = list(csv.reader(io.StringIO(content)))
+        assert rows[0] == ['id', 'description', 'status', 'created_at']
+        assert len(rows) == 1202
+        assert rows[1][:3] == [str(ids[0]), "Task 0", "1"]
+        assert rows[-1][1] == 'Say "hi", then leave'
+
+    async def test_export_json(self, export_handler: ExportCommandHandler, mock_ctx: MagicMock, test_db: SQLiteDatabaseManager):
+        """JSON-экспорт - корректный массив задач."""
+        await test_db.add_tasks(mock_ctx.author.id, ["Первая", "Вторая"])
+
+        attachments = self.capture_attachments(mock_ctx)
+        await export_handler.export_tasks(mock_ctx, 'json')
+        [(filename, content)] = attachments
+        assert filename.endswith(".json")
+        tasks = json.loads(content)
+        assert [task['description'] for task in tasks] == ["Первая", "Вторая"]
+        assert tasks[0]['status'] is False
+
+    async def test_export_empty_and_unknown_format(self, export_handler: ExportCommandHandler, mock_ctx: MagicMock):
+        """Пустой список и неизвестный формат дают сообщение без файла."""
+        await export_handler.export_tasks(mock_ctx, 'json')
+        assert "нет задач" in mock_ctx.send.call_args[0][0]
+
+        await export_handler.export_tasks(mock_ctx, 'xml')
+        assert "Неизвестный формат" in mock_ctx.send.call_args[0][0]
@@ -0,0 +1,85 @@
+import pytest
+import io
+from typing import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.commands.importer import ImportCommandHandler, iter_csv_rows, iter_json_rows, iter_text_rows
+from bot.database.sqlite import SQLiteDatabaseManager
+
+pytestmark = pytest.mark.asyncio
+
+async def blocks_of(data: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+class TestImportParsers:
+    """Тесты потокового разбора файлов импорта."""
+
+    async def test_text_rows(self):
+        """Маркеры списков снимаются, [x] означает выполненную задачу."""
+        rows = list(iter_text_rows(io.StringIO("- [ ] Buy milk\n- [x] Call mom\n\nPay rent\n")))
+        assert rows == [("Buy milk", False), ("Call mom", True), ("", False), ("Pay rent", False)]
+
+    async def test_csv_rows(self):
+        """CSV с заголовком (как у !export) и без него."""
+        exported = 'id,description,status,created_at\n1,"Say ""hi"", then leave",1,\n2,Second,0,\n'
+        assert list(iter_csv_rows(io.StringIO(exported))) == [('Say "hi", then leave', True), ("Second", False)]
+        assert list(iter_csv_rows(io.StringIO("First\nSecond\n"))) == [("First", False), ("Second", False)]
+
+    async def test_json_rows_across_block_boundaries(self):
+        """JSON-массив разбирается поэлементно, даже если элементы разрезаны блоками."""
+        data = '[\n{"id": 1, "description": "Первая", "status": true},\n"Вторая" , {"description": "Третья"}\n]'
+        with patch('bot.commands.importer.READ_BLOCK', 5):
+            rows = list(iter_json_rows(io.StringIO(data)))
+        assert rows == [("Первая", True), ("Вторая", False), ("Третья", False)]
+        with pytest.raises(ValueError):
+            list(iter_json_rows(io.StringIO('{"description": "x"}')))
+        with pytest.raises(ValueError):
+            list(iter_json_rows(io.StringIO('["a" "b"]')))
+
+class TestImportCommand:
+    """Тесты команды импорта."""
+
+    @pytest.fixture
+    def import_handler(self, test_db: SQLiteDatabaseManager) -> ImportCommandHandler:
+        return ImportCommandHandler(test_db, MagicMock())
+
+    @pytest.fixture
+    def progress(self, mock_ctx: MagicMock) -> MagicMock:
+        message = MagicMock()
+        message.edit = AsyncMock()
+        mock_ctx.send.return_value = message
+        return message
+
+    async def test_import_in_chunks(self, import_handler: ImportCommandHandler, mock_ctx: MagicMock,
+                                    progress: MagicMock, test_db: SQLiteDatabaseManager):
+        """Задачи вставляются пачками, длинные пропускаются, итог - в том же сообщении."""
+        lines = [f"Task {i}" for i in range(1203)] + ["x" * 501, "[x] Done already"]
+        data = "\n".join(lines).encode()
+        with patch.object(test_db, 'add_tasks', wraps=test_db.add_tasks) as add_tasks, \
+                patch.object(test_db, 'set_status_many', side_effect=AssertionError("status is set on insert")):
+            await import_handler.import_tasks(mock_ctx, "tasks.txt", len(data), blocks_of(data, 1000))
+
+        assert [len(call.args[1]) for call in add_tasks.call_args_list] == [500, 500, 204]
+        assert await test_db.count_tasks(mock_ctx.author.id) == 1204
+        assert await test_db.count_tasks(mock_ctx.author.id, True) == 1
+        mock_ctx.send.assert_called_once()
+        summary = progress.edit.call_args.kwargs['content']
+        assert "добавлено задач: 1204" in summary
+        assert "слишком длинных" in summary
+
+    async def test_quota_and_errors(self, import_handler: ImportCommandHandler, mock_ctx: MagicMock,
+                                    progress: MagicMock, test_db: SQLiteDatabaseManager):
+        """Импорт останавливается на квоте, ошибка формата сообщается."""
+        data = b"a\nb\nc\nd\n"
+        with patch('bot.config.settings.CommandConstants.MAX_TASKS_PER_USER', 3):
+            await import_handler.import_tasks(mock_ctx, "tasks.txt", len(data), blocks_of(data))
+        assert await test_db.count_tasks(mock_ctx.author.id) == 3
+        assert "лимит задач" in progress.edit.call_args.kwargs['content']
+
+        data = b'["ok", {broken'
+        await import_handler.import_tasks(mock_ctx, "tasks.json", len(data), blocks_of(data))
+        assert "Ошибка в файле" in progress.edit.call_args.kwargs['content']
+
+        await import_handler.import_attachment(mock_ctx, None)
+        assert "Прикрепите" in mock_ctx.send.call_args[0][0]
@@ -0,0 +1,51 @@
+import pytest
+import asyncio
+import logging
+import sys
+
+from bot.config.settings import parse_shard_ids
+from bot.core.launcher import ClusterLauncher, cluster_shard_ids
+
+pytestmark = pytest.mark.asyncio
+
+class TestClusterLauncher:
+    """Тесты запуска кластеров шардов."""
+
+    async def test_cluster_shard_ids(self):
+        """Шарды делятся на непрерывные диапазоны без пропусков."""
+        assert cluster_shard_ids(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+        assert cluster_shard_ids(2, 2) == [[0], [1]]
+        with pytest.raises(ValueError):
+            cluster_shard_ids(2, 3)
+
+    async def test_parse_shard_ids(self):
+        """Списки шардов принимают перечисления и диапазоны."""
+        assert parse_shard_ids("0-3,8") == [0, 1, 2, 3, 8]
+        with pytest.raises(ValueError):
+            parse_shard_ids("a-b")
+
+    async def test_environment(self):
+        """Каждый кластер получает свой диапазон шардов."""
+        launcher = ClusterLauncher(4, 2, logging.getLogger('test'))
+        env = launcher.environment(1)
+        assert env['SHARD_COUNT'] == '4'
+        assert env['SHARD_IDS'] == '2,3'
+        assert env['CLUSTER_ID'] == '1'
+
+    async def test_restarts_crashed_cluster(self):
+        """Упавший кластер перезапускается, завершившийся нормально - нет."""
+        script = "import os, sys; sys.exit(0 if os.environ['CLUSTER_ID'] == '0' else 1)"
+        launcher = ClusterLauncher(
+            2, 2, logging.getLogger('test'),
+            restart_delay=0.01, max_restart_delay=0.01,
+            command=[sys.executable, '-c', script]
+        )
+        supervisor = asyncio.create_task(launcher.run())
+        for _ in range(500):
+            if launcher.restarts[1] >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await launcher.stop()
+        await asyncio.wait_for(supervisor, timeout=10)
+        assert launcher.restarts[0] == 0
+        assert launcher.restarts[1] >= 2
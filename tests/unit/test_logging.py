@@ -0,0 +1,42 @@
+import json
+import logging
+import queue
+
+from bot.config.settings import BotConfig
+from bot.core.logging import BoundedQueueHandler, JsonFormatter, LoggingManager
+
+def make_record(message: str) -> logging.LogRecord:
+    return logging.LogRecord('discord_bot', logging.INFO, __file__, 1, message, None, None)
+
+class TestLogging:
+    """Тесты конвейера логирования."""
+
+    def test_json_formatter(self):
+        """JSON-формат содержит уровень, логгер и текст сообщения."""
+        entry = json.loads(JsonFormatter().format(make_record("Задача добавлена")))
+        assert entry['level'] == 'INFO'
+        assert entry['logger'] == 'discord_bot'
+        assert entry['message'] == "Задача добавлена"
+
+    def test_full_queue_drops_records(self):
+        """При переполнении очереди записи отбрасываются и учитываются."""
+        handler = BoundedQueueHandler(queue.Queue(2))
+        for i in range(5):
+            handler.handle(make_record(f"record {i}"))
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_records_written_by_listener(self, tmp_path):
+        """Записи доходят до файла через фоновый поток."""
+        log_file = tmp_path / "bot.log"
+        config = BotConfig(
+            token="token", prefix="!", log_level=logging.INFO,
+            log_format="%(message)s", log_file=str(log_file), log_json=True
+        )
+        logger = LoggingManager.setup(config)
+        try:
+            logger.info("queued message")
+        finally:
+            LoggingManager.shutdown()
+        lines = log_file.read_text(encoding='utf-8').splitlines()
+        assert json.loads(lines[-1])['message'] == "queued message"
@@ -0,0 +1,37 @@
+import pytest
+from dataclasses import replace
+from types import SimpleNamespace
+
+import discord
+
+from bot.core.bot import BotManager
+from bot.utils.memory import format_memory_report, memory_report, resident_memory_bytes
+
+pytestmark = pytest.mark.asyncio
+
+class TestMemoryReport:
+    """Тесты отчета о памяти и режима с минимальным кэшем."""
+
+    async def test_memory_report(self):
+        """Отчет учитывает кэши клиента и память на 1000 гильдий."""
+        guilds = [SimpleNamespace(members=[object()] * 3) for _ in range(4)]
+        client = SimpleNamespace(guilds=guilds, users=[object()] * 5, cached_messages=[])
+        report = memory_report(client)
+        assert report['guilds'] == 4
+        assert report['members'] == 12
+        assert report['users'] == 5
+        assert report['messages'] == 0
+        assert resident_memory_bytes() > 0
+        assert report['rss_per_1k_guilds'] == report['rss_bytes'] * 250
+        assert "4 guilds" in format_memory_report(report)
+
+    async def test_lean_cache_mode(self, bot_config):
+        """В облегченном режиме отключены лишние интенты и кэши."""
+        manager = BotManager(replace(bot_config, lean_cache=True))
+        await manager.initialize()
+        intents = manager.bot.intents
+        assert intents.message_content and intents.guild_messages
+        assert not intents.members and not intents.presences and not intents.typing
+        assert manager.bot._connection.max_messages is None
+        assert manager.bot._connection.member_cache_flags.value == discord.MemberCacheFlags.none().value
+        await manager.cleanup()
@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+
+from bot.database.base import DatabaseError
+from bot.database.metered import MeteredDatabaseManager
+from bot.database.sqlite import SQLiteDatabaseManager
+from bot.utils.metrics import DB_ERRORS, DB_LATENCY, MetricsRegistry, MetricsServer
+
+pytestmark = pytest.mark.asyncio
+
+class TestMetricsRegistry:
+    """Тесты реестра метрик."""
+
+    async def test_counter_and_histogram_render(self):
+        """Счетчики и гистограммы выводятся в формате Prometheus."""
+        registry = MetricsRegistry()
+        errors = registry.counter('test_errors_total', 'Errors', ('command',))
+        latency = registry.histogram('test_duration_seconds', 'Latency', ('command',), buckets=(0.1, 1.0))
+
+        errors.inc('add')
+        errors.inc('add', amount=2)
+        latency.observe(0.05, 'list')
+        latency.observe(0.5, 'list')
+        latency.observe(5, 'list')
+
+        text = registry.render()
+        assert '# TYPE test_errors_total counter' in text
+        assert 'test_errors_total{command="add"} 3' in text
+        assert '# TYPE test_duration_seconds histogram' in text
+        assert 'test_duration_seconds_bucket{command="list",le="0.1"} 1' in text
+        assert 'test_duration_seconds_bucket{command="list",le="1.0"} 2' in text
+        assert 'test_duration_seconds_bucket{command="list",le="+Inf"} 3' in text
+        assert 'test_duration_seconds_count{command="list"} 3' in text
+        assert registry.counter('test_errors_total', 'Errors', ('command',)) is errors
+
+    async def test_callback_metric(self):
+        """Вычисляемые метрики читаются в момент вывода."""
+        registry = MetricsRegistry()
+        value = [1]
+        registry.callback('test_entries', 'Entries', lambda: value[0])
+        value[0] = 7
+        assert 'test_entries 7' in registry.render()
+
+    async def test_http_endpoint(self):
+        """Эндпоинт /metrics отдает текст реестра, остальные пути - 404."""
+        registry = MetricsRegistry()
+        registry.counter('test_requests_total', 'Requests').inc()
+        server = MetricsServer(registry, port=0)
+        await server.start()
+        try:
+            async def fetch(path):
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                return response.decode()
+
+            response = await fetch('/metrics')
+            assert response.startswith('HTTP/1.1 200 OK')
+            assert 'test_requests_total 1' in response
+            assert (await fetch('/')).startswith('HTTP/1.1 404')
+        finally:
+            await server.stop()
+
+class TestMeteredDatabaseManager:
+    """Тесты обертки с учетом времени операций."""
+
+    async def test_records_operations_and_errors(self, tmp_path):
+        """Операции попадают в гистограмму, ошибки - в счетчик."""
+        db = MeteredDatabaseManager(SQLiteDatabaseManager(str(tmp_path / "metered.db")))
+        await db.init()
+        try:
+            before = DB_LATENCY.count('add_task')
+            await db.add_task(1, "Task")
+            assert DB_LATENCY.count('add_task') == before + 1
+            assert len(await db.get_tasks(1)) == 1
+
+            errors = DB_ERRORS.value('get_tasks', 'DatabaseError')
+            async with db.get_db() as conn:
+                await conn.execute("DROP TABLE tasks")
+            with pytest.raises(DatabaseError):
+                await db.get_tasks(1)
+            assert DB_ERRORS.value('get_tasks', 'DatabaseError') == errors + 1
+        finally:
+            await db.close()
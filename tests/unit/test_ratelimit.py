@@ -0,0 +1,46 @@
+import pytest
+
+from bot.utils.ratelimit import RateLimiter
+
+class TestRateLimiter:
+    """Тесты общего ограничителя частоты команд."""
+
+    def test_weights_share_user_budget(self):
+        """Команды тратят общий бюджет пользователя по своим весам."""
+        limiter = RateLimiter(3, 1, weights={'help': 0.5, 'import': 2})
+        assert limiter.check(1, 'import', now=0) == 0
+        assert limiter.check(1, 'help', now=0) == 0
+        assert limiter.check(1, 'add', now=0) == pytest.approx(0.5)
+        assert limiter.check(2, 'add', now=0) == 0
+        assert limiter.rejections == 1
+
+    def test_rejection_does_not_consume(self):
+        """Отклоненная команда не тратит токены, бюджет восстанавливается."""
+        limiter = RateLimiter(1, 0.5)
+        assert limiter.check(1, 'add', now=0) == 0
+        assert limiter.check(1, 'add', now=1) == pytest.approx(1)
+        assert limiter.check(1, 'add', now=2) == 0
+
+    def test_idle_buckets_are_evicted(self):
+        """Восстановившиеся ведра удаляются, число ведер ограничено."""
+        limiter = RateLimiter(2, 1, max_buckets=3)
+        for user_id in range(3):
+            limiter.check(user_id, 'add', now=0)
+        assert len(limiter) == 3
+        limiter.check(10, 'add', now=0.5)
+        assert len(limiter) == 3
+        limiter.check(11, 'add', now=5)
+        assert len(limiter) == 1
+
+    def test_save_and_load(self, tmp_path):
+        """Состояние ведер переживает перезапуск."""
+        path = str(tmp_path / "ratelimit.json")
+        limiter = RateLimiter(2, 0.001)
+        limiter.check(1, 'add')
+        limiter.check(1, 'add')
+        assert limiter.save(path) == 1
+
+        restored = RateLimiter(2, 0.001)
+        assert restored.load(path) == 1
+        assert restored.check(1, 'add') > 0
+        assert RateLimiter(2, 1).load(str(tmp_path / "missing.json")) == 0
@@ -0,0 +1,174 @@
+import pytest
+import asyncio
+import sqlite3
+from datetime import datetime, timezone
+from typing import List, Tuple
+from unittest.mock import MagicMock
+
+from bot.core.scheduler import ReminderScheduler
+from bot.database.models import Reminder
+from bot.database.sqlite import SQLiteDatabaseManager
+from bot.utils.timeparse import parse_when
+
+pytestmark = pytest.mark.asyncio
+
+class Clock:
+    """Управляемые тестом часы."""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    """Ожидание условия, пока планировщик работает в фоне."""
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+class TestParseWhen:
+    """Тесты разбора времени из команд."""
+
+    async def test_relative_and_absolute(self):
+        now = 1_000_000
+        assert parse_when("30m", now) == now + 1800
+        assert parse_when("1d12h", now) == now + 86400 + 43200
+        assert parse_when("2ч 30м", now) == now + 9000
+        expected = int(datetime(2025, 12, 31, 18, 0, tzinfo=timezone.utc).timestamp())
+        assert parse_when("2025-12-31 18:00", now) == expected
+        assert parse_when("2025-12-31", now) == expected - 9 * 3600
+        assert parse_when("tomorrow", now) is None
+        assert parse_when("", now) is None
+
+class TestReminderScheduler:
+    """Тесты планировщика напоминаний."""
+
+    @pytest.fixture
+    def sent(self) -> List[Tuple[int, str]]:
+        return []
+
+    def make_scheduler(self, db: SQLiteDatabaseManager, clock: Clock, sent: List[Tuple[int, str]], **options) -> ReminderScheduler:
+        async def send(reminder: Reminder, description: str) -> None:
+            sent.append((reminder.task_id, description))
+        options.setdefault('window', 100)
+        return ReminderScheduler(db, send, MagicMock(), clock=clock, **options)
+
+    async def test_window_is_bounded(self, test_db: SQLiteDatabaseManager, sent):
+        """В куче только ближайшие напоминания окна, не больше max_pending."""
+        ids = await test_db.add_tasks(1, ["a", "b", "c", "d"])
+        for offset, task_id in zip((10, 20, 30, 500), ids):
+            await test_db.set_reminder(1, task_id, 1000 + offset, channel_id=5)
+        scheduler = self.make_scheduler(test_db, Clock(1000), sent, max_pending=2)
+
+        await scheduler._refill(1000)
+        assert len(scheduler) == 2
+        assert scheduler._horizon == 1020
+        # Дальше окна - только в базе
+        scheduler.schedule(Reminder(1025, 1, ids[2], 5))
+        assert len(scheduler) == 2
+
+        scheduler.max_pending = 10
+        await scheduler._refill(1000)
+        assert [reminder.task_id for _, _, reminder in sorted(scheduler._heap)] == ids[:3]
+
+    async def test_fires_due_reminders_once(self, test_db: SQLiteDatabaseManager, sent):
+        """Наступившие напоминания отправляются один раз даже двумя планировщиками."""
+        ids = await test_db.add_tasks(1, ["a", "b", "c"])
+        for offset, task_id in zip((-50, 10, 20), ids):
+            await test_db.set_reminder(1, task_id, 1000 + offset, channel_id=5)
+        await test_db.mark_task_done(1, ids[2], True)
+        clock = Clock(1030)
+        first = self.make_scheduler(test_db, clock, sent)
+        second = self.make_scheduler(test_db, clock, sent)
+        first.start()
+        second.start()
+        try:
+            await wait_for(lambda: len(sent) == 2 and not first._deliveries and not second._deliveries)
+            await asyncio.sleep(0.05)
+        finally:
+            await first.close()
+            await second.close()
+
+        # Выполненная задача пропускается, все напоминания сняты
+        assert sorted(sent) == [(ids[0], "a"), (ids[1], "b")]
+        assert await test_db.due_reminders(10**10, 10) == []
+
+    async def test_new_reminder_wakes_scheduler(self, test_db: SQLiteDatabaseManager, sent):
+        """schedule() будит ожидающий планировщик."""
+        clock = Clock(1000)
+        scheduler = self.make_scheduler(test_db, clock, sent)
+        scheduler.start()
+        try:
+            await wait_for(lambda: scheduler._horizon > 0)
+            task_id = await test_db.add_task(1, "soon")
+            await test_db.set_reminder(1, task_id, 1005, channel_id=5)
+            clock.now = 1005
+            scheduler.schedule(Reminder(1005, 1, task_id, 5))
+            await wait_for(lambda: sent == [(task_id, "soon")])
+        finally:
+            await scheduler.close()
+
+    async def test_unconfirmed_reminder_is_retried_after_restart(self, tmp_path, sent):
+        """Захваченное, но не подтвержденное напоминание повторяется после lease."""
+        path = str(tmp_path / "tasks.db")
+        db = SQLiteDatabaseManager(db_path=path)
+        await db.init()
+        task_id = await db.add_task(1, "a")
+        await db.set_reminder(1, task_id, 1000, channel_id=5)
+        # Процесс захватил напоминание и упал до подтверждения
+        assert await db.claim_reminder(Reminder(1000, 1, task_id, 5), 1060) is not None
+        await db.close()
+
+        db = SQLiteDatabaseManager(db_path=path)
+        await db.init()
+        clock = Clock(1010)
+        scheduler = self.make_scheduler(db, clock, sent, lease=30)
+        await scheduler._refill(clock.now)
+        assert scheduler._heap[0][0] == 1060
+
+        clock.now = 1060
+        scheduler.start()
+        try:
+            await wait_for(lambda: sent == [(task_id, "a")])
+        finally:
+            await scheduler.close()
+            await db.close()
+
+    async def test_failed_delivery_keeps_reminder(self, test_db: SQLiteDatabaseManager):
+        """Ошибка отправки не теряет напоминание: оно переносится на lease."""
+        task_id = await test_db.add_task(1, "a")
+        await test_db.set_reminder(1, task_id, 1000, channel_id=5)
+
+        async def failing_send(reminder: Reminder, description: str) -> None:
+            raise RuntimeError("Discord is down")
+
+        scheduler = ReminderScheduler(test_db, failing_send, MagicMock(), window=100, lease=30, clock=Clock(1000))
+        scheduler.start()
+        try:
+            await wait_for(lambda: scheduler.logger.warning.called)
+        finally:
+            await scheduler.close()
+        assert [reminder.remind_at for reminder in await test_db.due_reminders(10**10, 10)] == [1030]
+
+    async def test_legacy_table_gets_schedule_columns(self, tmp_path):
+        """В старую таблицу tasks добавляются столбцы сроков и напоминаний."""
+        path = str(tmp_path / "legacy.db")
+        connection = sqlite3.connect(path)
+        connection.execute('''CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, description TEXT,
+            status BOOLEAN DEFAULT 0, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        connection.execute("INSERT INTO tasks (user_id, description) VALUES (1, 'old')")
+        connection.commit()
+        connection.close()
+
+        db = SQLiteDatabaseManager(db_path=path)
+        await db.init()
+        try:
+            assert await db.set_due_date(1, 1, 2000, channel_id=5)
+            assert (await db.get_tasks(1))[0].due_at == 2000
+            assert await db.due_reminders(3000, 10) == [Reminder(2000, 1, 1, 5)]
+        finally:
+            await db.close()
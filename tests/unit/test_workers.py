@@ -0,0 +1,153 @@
+import pytest
+import asyncio
+import json
+import logging
+import re
+import sys
+from unittest.mock import AsyncMock
+
+import discord
+
+from bot.commands.base import CommandContext
+from bot.commands.task import TaskCommandHandler
+from bot.core.workers import CommandWorker, WorkerError, WorkerPool
+from bot.database.sqlite import SQLiteDatabaseManager
+from bot.utils.metrics import WORKER_JOBS
+
+pytestmark = pytest.mark.asyncio
+
+def gateway_ctx(user_id: int, channel_id: int = 77) -> CommandContext:
+    """Контекст команды в процессе шлюза."""
+    return CommandContext(user_id, discord.Object(id=channel_id), AsyncMock(), logging.getLogger('test'))
+
+def replies(ctx: CommandContext) -> list:
+    return [call.args[0] for call in ctx.send.call_args_list]
+
+class SlowHandler:
+    """Обработчик, который держит задания, пока тест их не отпустит."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.started = []
+
+    async def wait(self, ctx: CommandContext, label: str) -> None:
+        self.started.append(label)
+        await self.release.wait()
+        await ctx.send(f"done {label}")
+
+class TestWorkerPool:
+    """Тесты выполнения команд в процессах-обработчиках."""
+
+    async def test_runs_commands_in_workers(self, tmp_path, test_db: SQLiteDatabaseManager):
+        """Ответы и напоминания возвращаются шлюзу, команды пользователя идут по порядку."""
+        logger = logging.getLogger('test')
+        socket_path = str(tmp_path / "workers.sock")
+        pool = WorkerPool(2, socket_path, logger)
+        await pool.start()
+        workers = [
+            asyncio.create_task(CommandWorker(index, {'task': TaskCommandHandler(test_db, logger)}, logger).run(socket_path))
+            for index in range(2)
+        ]
+        task_handler = pool.handler('task')
+        reminders = []
+        task_handler.on_reminder = reminders.append
+        try:
+            first, second = gateway_ctx(1001), gateway_ctx(2002)
+            # Команды отправляются, не дожидаясь ответов на предыдущие
+            await asyncio.gather(*(
+                task_handler.add_task(ctx, f"Task {number}") for number in range(10) for ctx in (first, second)
+            ))
+            for ctx in (first, second):
+                added = [re.match(r"✅ Задача добавлена с ID #(\d+): (.+)", reply).groups() for reply in replies(ctx)]
+                assert [description for _, description in added] == [f"Task {number}" for number in range(10)]
+                assert [int(task_id) for task_id, _ in added] == sorted(int(task_id) for task_id, _ in added)
+
+            await task_handler.list_tasks(first, 1)
+            assert "Task 9" in replies(first)[-1]
+            task_id = added[0][0]
+            await task_handler.set_reminder(second, task_id, "10m")
+            assert [(reminder.user_id, reminder.task_id, reminder.channel_id) for reminder in reminders] == [(2002, int(task_id), 77)]
+
+            with pytest.raises(WorkerError):
+                await task_handler.no_such_command(first)
+            assert pool.pending() == 0
+        finally:
+            await pool.close()
+        # Закрытый шлюзом обработчик завершается сам
+        await asyncio.wait_for(asyncio.gather(*workers), timeout=5)
+
+    async def test_backpressure_and_user_order(self, tmp_path):
+        """Процессу уходит не больше max_in_flight заданий, переполненная очередь отклоняет команды."""
+        logger = logging.getLogger('test')
+        socket_path = str(tmp_path / "workers.sock")
+        pool = WorkerPool(1, socket_path, logger, max_in_flight=2, max_pending=2)
+        await pool.start()
+        handler = SlowHandler()
+        remote = pool.handler('slow')
+        try:
+            ctx = gateway_ctx(1001)
+            rejected = WORKER_JOBS.value('rejected')
+            calls = [asyncio.create_task(remote.wait(ctx, label)) for label in "abcd"]
+            # Обработчик еще не подключился: два задания ждут отправки,
+            # два отклонены сразу
+            await asyncio.gather(calls[2], calls[3])
+            assert WORKER_JOBS.value('rejected') == rejected + 2
+            assert replies(ctx) == ["⏳ Сейчас слишком много команд, попробуйте через несколько секунд."] * 2
+
+            worker = asyncio.create_task(CommandWorker(0, {'slow': handler}, logger).run(socket_path))
+            for _ in range(100):
+                if handler.started:
+                    break
+                await asyncio.sleep(0.01)
+            # Задания одного пользователя выполняются по очереди
+            assert handler.started == ["a"]
+            handler.release.set()
+            await asyncio.wait_for(asyncio.gather(calls[0], calls[1]), timeout=5)
+            assert handler.started == ["a", "b"]
+            assert replies(ctx)[2:] == ["done a", "done b"]
+        finally:
+            await pool.close()
+        await asyncio.wait_for(worker, timeout=5)
+
+    async def test_worker_exit_fails_sent_jobs(self, tmp_path, test_db: SQLiteDatabaseManager):
+        """Отправленное упавшему процессу задание не повторяется, ожидающее уходит новому процессу."""
+        logger = logging.getLogger('test')
+        socket_path = str(tmp_path / "workers.sock")
+        pool = WorkerPool(1, socket_path, logger, max_in_flight=1)
+        await pool.start()
+        task_handler = pool.handler('task')
+        try:
+            ctx = gateway_ctx(1001)
+            lost = asyncio.create_task(task_handler.add_task(ctx, "Lost"))
+            kept = asyncio.create_task(task_handler.add_task(ctx, "Kept"))
+
+            reader, writer = await asyncio.open_unix_connection(socket_path)
+            writer.write(json.dumps({'worker': 0}).encode() + b'\n')
+            frame = json.loads(await reader.readline())
+            assert (frame['method'], frame['args']) == ('add_task', ["Lost"])
+            writer.close()
+            with pytest.raises(WorkerError):
+                await asyncio.wait_for(lost, timeout=5)
+
+            worker = asyncio.create_task(CommandWorker(0, {'task': TaskCommandHandler(test_db, logger)}, logger).run(socket_path))
+            await asyncio.wait_for(kept, timeout=5)
+            assert replies(ctx) == ["✅ Задача добавлена с ID #1: Kept"]
+        finally:
+            await pool.close()
+        await asyncio.wait_for(worker, timeout=5)
+
+    async def test_restarts_crashed_worker(self, tmp_path):
+        """Упавший процесс-обработчик перезапускается."""
+        pool = WorkerPool(
+            1, str(tmp_path / "workers.sock"), logging.getLogger('test'),
+            restart_delay=0.01, max_restart_delay=0.01,
+            command=[sys.executable, '-c', "import sys; sys.exit(1)"]
+        )
+        await pool.start()
+        pool.launch()
+        for _ in range(500):
+            if pool.restarts[0] >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await pool.close()
+        assert pool.restarts[0] >= 2